@@ -9,16 +9,16 @@ from collections import defaultdict
 from typing import Dict, List, Optional, Any
 
 from flask import Blueprint, render_template, request, jsonify, session, redirect, url_for
-from sqlalchemy import func, desc, and_
+from sqlalchemy import func, desc, and_, select
 from werkzeug.security import check_password_hash, generate_password_hash
 
 from main import db, Conversation, ConversationEntry, limiter, csrf
 from models import Payment, PaymentStatus
 from stripe_manager import StripeManager
-from utils.validators import SecurityValidator
+from utils.validators import SecurityValidator, InputValidator
 from config import Config
 from notifications import notification_manager, system_monitor, NotificationLevel
-from database_utils import DatabaseManager
+from database_utils import DatabaseManager, conversation_to_dict
 
 # Create admin blueprint
 admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
@@ -26,6 +26,52 @@ admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
 # Admin authentication
 ADMIN_PASSWORD_HASH = generate_password_hash(os.environ.get('ADMIN_PASSWORD', 'admin123'))
 
+# Column-only statements for the list endpoints, built once so their compiled SQL is cached;
+# rows are read as plain mappings without ORM instance hydration
+CONVERSATION_LIST_STMT = select(
+    Conversation.id,
+    Conversation.initial_preview,
+    Conversation.created_at,
+    Conversation.updated_at,
+    Conversation.is_complete,
+    Conversation.entry_count,
+    Conversation.current_agent_index
+)
+# Only the columns the payments list renders; this select is the one place that field list lives
+PAYMENT_LIST_STMT = select(
+    Payment.id,
+    Payment.project_name,
+    Payment.client_name,
+    Payment.client_email,
+    Payment.amount,
+    Payment.status,
+    Payment.payment_type,
+    Payment.payment_url,
+    Payment.description,
+    Payment.due_date,
+    Payment.created_at,
+    Payment.paid_at
+)
+
+def paginate_rows(stmt, page: int, per_page: int):
+    """Execute one page of a column-only select, returning (rows, pagination dict)"""
+    page = max(page, 1)
+    total = db.session.execute(
+        select(func.count()).select_from(stmt.order_by(None).subquery())
+    ).scalar()
+    rows = db.session.execute(
+        stmt.limit(per_page).offset((page - 1) * per_page)
+    ).mappings().all()
+    pages = (total + per_page - 1) // per_page if per_page else 0
+    return rows, {
+        'page': page,
+        'per_page': per_page,
+        'total': total,
+        'pages': pages,
+        'has_next': page < pages,
+        'has_prev': page > 1
+    }
+
 class AdminMetrics:
     """Class for calculating admin dashboard metrics"""
     
@@ -79,7 +125,7 @@ class AdminMetrics:
             ConversationEntry.agent_name,
             ConversationEntry.agent_role,
             func.count(ConversationEntry.id).label('response_count'),
-            func.avg(func.length(ConversationEntry.response_text)).label('avg_response_length'),
+            func.avg(ConversationEntry.response_length).label('avg_response_length'),
             func.count(func.distinct(ConversationEntry.conversation_id)).label('conversations_handled'),
             func.min(ConversationEntry.created_at).label('first_response'),
             func.max(ConversationEntry.created_at).label('last_response'),
@@ -416,26 +462,24 @@ def api_conversations():
         per_page = min(int(request.args.get('per_page', 20)), 100)
         status = request.args.get('status', 'all')
         
-        query = Conversation.query
+        query = CONVERSATION_LIST_STMT
         
         if status == 'complete':
-            query = query.filter(Conversation.is_complete == True)
+            query = query.where(Conversation.is_complete == True)
         elif status == 'incomplete':
-            query = query.filter(Conversation.is_complete == False)
+            query = query.where(Conversation.is_complete == False)
         elif status == 'stale':
-            query = query.filter(
+            query = query.where(
                 and_(
                     Conversation.is_complete == False,
                     Conversation.updated_at < datetime.utcnow() - timedelta(hours=1)
                 )
             )
         
-        conversations = query.order_by(
-            Conversation.created_at.desc()
-        ).paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False
+        rows, pagination = paginate_rows(
+            query.order_by(Conversation.created_at.desc()),
+            page,
+            per_page
         )
         
         return jsonify({
@@ -443,24 +487,17 @@ def api_conversations():
             'data': {
                 'conversations': [
                     {
-                        'id': conv.id,
-                        'initial_input': conv.initial_input[:100] + '...' if len(conv.initial_input) > 100 else conv.initial_input,
-                        'created_at': conv.created_at.isoformat(),
-                        'updated_at': conv.updated_at.isoformat(),
-                        'is_complete': conv.is_complete,
-                        'entry_count': conv.entries.count(),
-                        'current_agent_index': conv.current_agent_index
+                        'id': row['id'],
+                        'initial_input': row['initial_preview'],
+                        'created_at': row['created_at'],
+                        'updated_at': row['updated_at'],
+                        'is_complete': row['is_complete'],
+                        'entry_count': row['entry_count'],
+                        'current_agent_index': row['current_agent_index']
                     }
-                    for conv in conversations.items
+                    for row in rows
                 ],
-                'pagination': {
-                    'page': page,
-                    'per_page': per_page,
-                    'total': conversations.total,
-                    'pages': conversations.pages,
-                    'has_next': conversations.has_next,
-                    'has_prev': conversations.has_prev
-                }
+                'pagination': pagination
             }
         })
         
@@ -477,16 +514,22 @@ def api_conversations():
 def api_conversation_detail(conversation_id):
     """API endpoint for detailed conversation view"""
     try:
-        conversation = Conversation.query.get_or_404(conversation_id)
-        entries = ConversationEntry.query.filter_by(
-            conversation_id=conversation_id
-        ).order_by(ConversationEntry.created_at).all()
+        # Reject malformed ids before they reach the uuid-typed column
+        is_valid, _ = InputValidator.validate_conversation_id(conversation_id)
+        if not is_valid:
+            return jsonify({
+                'success': False,
+                'error': 'Conversation not found'
+            }), 404
+        
+        conversation = db.get_or_404(Conversation, conversation_id)
+        conversation_data = conversation_to_dict(conversation)
         
         return jsonify({
             'success': True,
             'data': {
-                'conversation': conversation.to_dict(),
-                'entries': [entry.to_dict() for entry in entries]
+                'conversation': conversation_data,
+                'entries': conversation_data['entries']
             }
         })
         
@@ -800,16 +843,16 @@ def api_get_payments():
         search_query = request.args.get('search', '').strip()
         
         # Build query
-        query = Payment.query
+        query = PAYMENT_LIST_STMT
         
         # Apply status filter
         if status_filter and status_filter in [PaymentStatus.PENDING, PaymentStatus.PAID, PaymentStatus.FAILED, PaymentStatus.CANCELLED]:
-            query = query.filter(Payment.status == status_filter)
+            query = query.where(Payment.status == status_filter)
         
         # Apply search filter
         if search_query:
             search_pattern = f'%{search_query}%'
-            query = query.filter(
+            query = query.where(
                 db.or_(
                     Payment.project_name.ilike(search_pattern),
                     Payment.client_name.ilike(search_pattern),
@@ -818,28 +861,18 @@ def api_get_payments():
                 )
             )
         
-        # Order by most recent first
-        query = query.order_by(Payment.created_at.desc())
-        
-        # Paginate
-        payments = query.paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False
+        # Order by most recent first, then read one page of plain rows
+        rows, pagination = paginate_rows(
+            query.order_by(Payment.created_at.desc()),
+            page,
+            per_page
         )
         
         return jsonify({
             'success': True,
             'data': {
-                'payments': [payment.to_dict() for payment in payments.items],
-                'pagination': {
-                    'page': page,
-                    'per_page': per_page,
-                    'total': payments.total,
-                    'pages': payments.pages,
-                    'has_next': payments.has_next,
-                    'has_prev': payments.has_prev
-                }
+                'payments': [dict(row) for row in rows],
+                'pagination': pagination
             }
         })
         
@@ -878,7 +911,7 @@ def api_payment_stats():
 def api_get_payment_detail(payment_id):
     """Get detailed payment information"""
     try:
-        payment = Payment.query.get_or_404(payment_id)
+        payment = db.get_or_404(Payment, payment_id)
         
         return jsonify({
             'success': True,
@@ -50,7 +50,7 @@ class ClarityFeedbackManager:
                     raise ValueError("Ratings must be between 1 and 5")
             
             # Get the conversation entry
-            entry = ConversationEntry.query.get(entry_id)
+            entry = db.session.get(ConversationEntry, entry_id)
             if not entry:
                 raise ValueError(f"Entry {entry_id} not found")
             
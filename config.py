@@ -1,7 +1,25 @@
 import os
+import queue
+import atexit
 import logging
+from logging.handlers import QueueHandler, QueueListener
 from datetime import timedelta
 
+def build_engine_options(pool_size, max_overflow):
+    """Build SQLAlchemy engine options for a single Gunicorn worker process"""
+    if os.environ.get('DB_EXTERNAL_POOLER', 'False').lower() == 'true':
+        # pgbouncer (or similar) owns pooling; don't stack a second pool on top
+        from sqlalchemy.pool import NullPool
+        return {"poolclass": NullPool, "pool_pre_ping": True}
+    
+    return {
+        "pool_size": int(os.environ.get('DB_POOL_SIZE', pool_size)),
+        "max_overflow": int(os.environ.get('DB_MAX_OVERFLOW', max_overflow)),
+        "pool_recycle": int(os.environ.get('DB_POOL_RECYCLE', '1800')),
+        "pool_pre_ping": True,
+        "pool_timeout": int(os.environ.get('DB_POOL_TIMEOUT', '5'))
+    }
+
 class Config:
     """Base configuration class"""
     
@@ -10,14 +28,11 @@ class Config:
     
     # Database Configuration
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL')
-    SQLALCHEMY_ENGINE_OPTIONS = {
-        "pool_size": 10,
-        "pool_recycle": 300,
-        "pool_pre_ping": True,
-        "pool_timeout": 20,
-        "max_overflow": 20
-    }
+    # Each worker process gets its own pool; size it to the worker's thread count
+    SQLALCHEMY_ENGINE_OPTIONS = build_engine_options(pool_size=10, max_overflow=20)
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Raise on un-eager-loaded relationship access in list queries (enable in CI/dev to catch N+1)
+    SQLALCHEMY_RAISELOAD = os.environ.get('SQLALCHEMY_RAISELOAD', 'false').lower() == 'true'
     
     # Multi-API Configuration
     DEFAULT_API_PROVIDER = os.environ.get('DEFAULT_API_PROVIDER', 'openai')
@@ -43,8 +58,21 @@ class Config:
     # Rate Limiting Configuration
     RATELIMIT_STORAGE_URL = os.environ.get('REDIS_URL', 'memory://')
     RATELIMIT_DEFAULT = os.environ.get('RATELIMIT_DEFAULT', '10 per minute')
+    RATELIMIT_STRATEGY = os.environ.get('RATELIMIT_STRATEGY', 'moving-window')
+    # Fail open if Redis is unreachable instead of returning 500s
+    RATELIMIT_SWALLOW_ERRORS = True
+    RATELIMIT_IN_MEMORY_FALLBACK_ENABLED = True
     
     # Session Configuration
+    # Session state lives server-side (Redis when available, otherwise the
+    # application database); the cookie only carries the session id.
+    REDIS_URL = os.environ.get('REDIS_URL')
+    SESSION_TYPE = os.environ.get('SESSION_TYPE', 'redis' if REDIS_URL else 'sqlalchemy')
+    SESSION_KEY_PREFIX = 'operatoros:session:'
+    SESSION_SQLALCHEMY_TABLE = 'flask_sessions'
+    # The SQL store has no TTL, so expired rows are deleted on average every N requests
+    SESSION_CLEANUP_N_REQUESTS = int(os.environ.get('SESSION_CLEANUP_N_REQUESTS', '1000'))
+    SESSION_PERMANENT = True
     PERMANENT_SESSION_LIFETIME = timedelta(hours=24)
     SESSION_COOKIE_SECURE = os.environ.get('SESSION_COOKIE_SECURE', 'False').lower() == 'true'
     SESSION_COOKIE_HTTPONLY = True
@@ -56,6 +84,7 @@ class Config:
     
     # Security Configuration
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max request size
+    MAX_JSON_CONTENT_LENGTH = 256 * 1024  # 256KB max JSON body (uploads keep the 16MB limit)
     WTF_CSRF_ENABLED = True
     WTF_CSRF_TIME_LIMIT = 3600  # 1 hour
     
@@ -91,13 +120,25 @@ class Config:
         """Setup application logging"""
         log_level = getattr(logging, Config.LOG_LEVEL.upper(), logging.INFO)
         
+        formatter = logging.Formatter(Config.LOG_FORMAT)
+        handlers = [logging.StreamHandler()]
+        if os.environ.get('LOG_TO_FILE'):
+            handlers.append(logging.FileHandler('app.log'))
+        for handler in handlers:
+            handler.setFormatter(formatter)
+        
+        # Request threads only enqueue records; a background listener does the blocking writes
+        log_queue = queue.Queue(-1)
+        listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)
+        
+        # prepare() merges the message into the record; the listener's handlers apply LOG_FORMAT once
+        queue_handler = QueueHandler(log_queue)
+        queue_handler.setFormatter(logging.Formatter('%(message)s'))
         logging.basicConfig(
             level=log_level,
-            format=Config.LOG_FORMAT,
-            handlers=[
-                logging.StreamHandler(),
-                logging.FileHandler('app.log') if os.environ.get('LOG_TO_FILE') else logging.NullHandler()
-            ]
+            handlers=[queue_handler]
         )
         
         # Suppress noisy third-party logs
@@ -109,6 +150,7 @@ class DevelopmentConfig(Config):
     """Development configuration"""
     DEBUG = True
     SESSION_COOKIE_SECURE = False
+    SQLALCHEMY_RECORD_QUERIES = True
 
 class ProductionConfig(Config):
     """Production configuration"""
@@ -116,11 +158,7 @@ class ProductionConfig(Config):
     SESSION_COOKIE_SECURE = True
     
     # Production-specific overrides
-    SQLALCHEMY_ENGINE_OPTIONS = {
-        **Config.SQLALCHEMY_ENGINE_OPTIONS,
-        "pool_size": 20,
-        "max_overflow": 30
-    }
+    SQLALCHEMY_ENGINE_OPTIONS = build_engine_options(pool_size=20, max_overflow=30)
 
 # Configuration selector
 config = {
@@ -2,16 +2,318 @@
 Database utilities for enhanced conversation persistence and management
 """
 
-from models import db, Conversation, ConversationEntry
+from models import db, Conversation, ConversationEntry, FlowSession, DailyPattern, Payment
 from datetime import datetime, timedelta
-from sqlalchemy import func, and_, or_, desc, asc
+from sqlalchemy import func, and_, or_, desc, asc, inspect, text, cast, select, delete, table, column, Date, Enum, String, Uuid
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Session, defer, raiseload, selectinload
+from sqlalchemy.schema import CreateIndex
+from flask import current_app
+from collections import OrderedDict
+import atexit
 import logging
+import queue
+import threading
+import time
 from typing import List, Dict, Optional, Tuple
 
 
+def list_loader_options(*options):
+    """
+    Loader options for list queries
+
+    Appends raiseload('*') when SQLALCHEMY_RAISELOAD is set, so any relationship
+    a serializer touches without eager-loading it raises instead of issuing N+1 queries.
+    """
+    if current_app.config.get('SQLALCHEMY_RAISELOAD'):
+        return (*options, raiseload('*'))
+    return options
+
+
+# Per-user, per-day flow roll-up: sessions aggregated by day, joined to that day's self-reported patterns
+_flow_days = select(
+    FlowSession.user_id,
+    func.date(FlowSession.created_at, type_=Date).label('date'),
+    func.count().label('session_count'),
+    func.coalesce(func.sum(FlowSession.tokens_used), 0).label('tokens_used'),
+    func.avg(FlowSession.processing_time).label('avg_processing_time')
+).group_by(FlowSession.user_id, func.date(FlowSession.created_at)).subquery('flow_days')
+
+_pattern_days = select(
+    DailyPattern.user_id,
+    DailyPattern.date,
+    func.avg(DailyPattern.satisfaction_score).label('avg_satisfaction'),
+    func.avg(DailyPattern.flow_quality).label('avg_flow_quality')
+).group_by(DailyPattern.user_id, DailyPattern.date).subquery('pattern_days')
+
+USER_DAILY_STATS_QUERY = select(
+    _flow_days.c.user_id,
+    _flow_days.c.date,
+    _flow_days.c.session_count,
+    _flow_days.c.tokens_used,
+    _flow_days.c.avg_processing_time,
+    _pattern_days.c.avg_satisfaction,
+    _pattern_days.c.avg_flow_quality
+).select_from(
+    _flow_days.outerjoin(
+        _pattern_days,
+        and_(_pattern_days.c.user_id == _flow_days.c.user_id, _pattern_days.c.date == _flow_days.c.date)
+    )
+)
+
+# The same roll-up materialized on PostgreSQL and refreshed hourly
+USER_DAILY_STATS_VIEW = table(
+    'mv_user_daily_stats',
+    *[column(selected.name, selected.type) for selected in USER_DAILY_STATS_QUERY.selected_columns]
+)
+
+# Completed conversations serialized per worker: id -> (updated_at, approximate size, dict), least recent first.
+# Bounded by the size of their text rather than by count, since one conversation holds every agent response.
+CONVERSATION_CACHE_MAX_CHARS = 8 * 1024 * 1024
+_conversation_cache: "OrderedDict[str, Tuple[datetime, int, Dict]]" = OrderedDict()
+_conversation_cache_chars = 0
+_conversation_cache_lock = threading.Lock()
+
+def _conversation_text_size(data: Dict) -> int:
+    """Characters of free text in a serialized conversation, which dominate its memory"""
+    return len(data['initial_input'] or '') + sum(
+        len(entry['input_text'] or '') + len(entry['response_text'] or '') + len(entry['error_message'] or '')
+        for entry in data['entries']
+    )
+
+def _copy_conversation_dict(data: Dict) -> Dict:
+    """Copy a cached conversation dict down to its entry dicts; the values themselves are immutable"""
+    return {**data, 'entries': [dict(entry) for entry in data['entries']]}
+
+def conversation_to_dict(conversation: Conversation) -> Dict:
+    """
+    Conversation.to_dict(), cached per worker once the conversation is complete
+
+    Entries bump the conversation's updated_at when edited, so a changed updated_at
+    invalidates the cached copy. Callers get their own copy and may mutate it.
+    """
+    global _conversation_cache_chars
+    if not conversation.is_complete:
+        return conversation.to_dict()
+    
+    with _conversation_cache_lock:
+        cached = _conversation_cache.get(conversation.id)
+        if cached and cached[0] == conversation.updated_at:
+            _conversation_cache.move_to_end(conversation.id)
+            return _copy_conversation_dict(cached[2])
+    
+    data = conversation.to_dict()
+    size = _conversation_text_size(data)
+    if size <= CONVERSATION_CACHE_MAX_CHARS:
+        with _conversation_cache_lock:
+            previous = _conversation_cache.pop(conversation.id, None)
+            if previous:
+                _conversation_cache_chars -= previous[1]
+            _conversation_cache[conversation.id] = (conversation.updated_at, size, data)
+            _conversation_cache_chars += size
+            while _conversation_cache_chars > CONVERSATION_CACHE_MAX_CHARS:
+                _, (_, evicted_size, _) = _conversation_cache.popitem(last=False)
+                _conversation_cache_chars -= evicted_size
+    return _copy_conversation_dict(data)
+
+
 class DatabaseManager:
     """Enhanced database operations for conversation persistence"""
     
+    # JSON columns stored as JSONB on PostgreSQL
+    JSONB_COLUMNS = (
+        ('flow_sessions', 'input_data'),
+        ('flow_sessions', 'output_data'),
+        ('user_preferences', 'energy_patterns'),
+        ('user_preferences', 'project_history'),
+        ('user_preferences', 'notification_settings'),
+        ('projects', 'strategy_output'),
+    )
+    
+    # Indexes replaced by newer definitions on the models
+    RETIRED_INDEXES = (
+        'idx_conversation_status_time',
+        # Prefixes of idx_entry_conversation_time / idx_entry_agent_time
+        'ix_conversation_entries_conversation_id',
+        'ix_conversation_entries_agent_name',
+        # Replaced by idx_entry_created_brin
+        'ix_conversation_entries_created_at',
+    )
+    
+    @staticmethod
+    def upgrade_schema() -> None:
+        """Apply additive schema changes that create_all() cannot make to existing tables"""
+        with db.engine.begin() as connection:
+            if connection.dialect.name == 'postgresql':
+                # Every worker runs this at start-up; the lock lets one migrate at a time, and the schema
+                # is inspected only once it is held so later workers see the changes and skip them
+                connection.execute(text("SELECT pg_advisory_xact_lock(hashtext('upgrade_schema'))"))
+            inspector = inspect(connection)
+            conversation_columns = {column['name'] for column in inspector.get_columns('conversations')}
+            entry_columns = {column['name']: column for column in inspector.get_columns('conversation_entries')}
+            
+            if 'entry_count' not in conversation_columns:
+                DatabaseManager._add_column(connection, 'conversations', 'entry_count INTEGER NOT NULL DEFAULT 0')
+                connection.execute(text(
+                    "UPDATE conversations SET entry_count = ("
+                    "SELECT COUNT(*) FROM conversation_entries "
+                    "WHERE conversation_entries.conversation_id = conversations.id)"
+                ))
+            
+            if 'initial_preview' not in conversation_columns:
+                DatabaseManager._add_column(connection, 'conversations', "initial_preview VARCHAR(103) NOT NULL DEFAULT ''")
+                connection.execute(text(
+                    "UPDATE conversations SET initial_preview = CASE "
+                    "WHEN LENGTH(initial_input) > 100 THEN SUBSTR(initial_input, 1, 100) || '...' "
+                    "ELSE initial_input END"
+                ))
+            
+            # Checked under the lock: a STORED rebuild rewrites the whole table, so it must run once
+            if 'computed' not in entry_columns.get('response_length', {}):
+                # Recreate response_length as a generated column; SQLite can only add VIRTUAL ones
+                storage = 'STORED' if connection.dialect.name == 'postgresql' else 'VIRTUAL'
+                if 'response_length' in entry_columns:
+                    connection.execute(text("ALTER TABLE conversation_entries DROP COLUMN response_length"))
+                DatabaseManager._add_column(
+                    connection, 'conversation_entries',
+                    f"response_length INTEGER GENERATED ALWAYS AS (length(response_text)) {storage}"
+                )
+            
+            if connection.dialect.name == 'postgresql':
+                DatabaseManager._convert_json_to_jsonb(connection, inspector)
+                DatabaseManager._convert_ids_to_uuid(connection, inspector)
+                DatabaseManager._convert_payment_status_to_enum(connection, inspector)
+            
+            for index_name in DatabaseManager.RETIRED_INDEXES:
+                connection.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+            
+            if connection.dialect.name == 'postgresql':
+                DatabaseManager._create_user_daily_stats_view(connection)
+            
+            DatabaseManager.ensure_indexes(connection)
+    
+    @staticmethod
+    def _add_column(connection, table_name: str, column_ddl: str) -> None:
+        """Add a column, tolerating another worker having added it first (PostgreSQL)"""
+        if_not_exists = 'IF NOT EXISTS ' if connection.dialect.name == 'postgresql' else ''
+        connection.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {if_not_exists}{column_ddl}"))
+    
+    @staticmethod
+    def _convert_json_to_jsonb(connection, inspector) -> None:
+        """Rewrite json columns created before the JSONB switch"""
+        for table_name, column_name in DatabaseManager.JSONB_COLUMNS:
+            if not inspector.has_table(table_name):
+                continue
+            column_types = {column['name']: column['type'] for column in inspector.get_columns(table_name)}
+            if column_name in column_types and not isinstance(column_types[column_name], JSONB):
+                connection.execute(text(
+                    f"ALTER TABLE {table_name} ALTER COLUMN {column_name} TYPE JSONB USING {column_name}::jsonb"
+                ))
+    
+    @staticmethod
+    def _convert_ids_to_uuid(connection, inspector) -> None:
+        """Rewrite varchar UUID keys created before the native uuid switch"""
+        conversation_id_type = {column['name']: column['type'] for column in inspector.get_columns('conversations')}['id']
+        if not isinstance(conversation_id_type, Uuid):
+            # The foreign key has to be dropped while both sides change type
+            entry_fks = [
+                fk for fk in inspector.get_foreign_keys('conversation_entries')
+                if fk['referred_table'] == 'conversations'
+            ]
+            for fk in entry_fks:
+                connection.execute(text(f"ALTER TABLE conversation_entries DROP CONSTRAINT {fk['name']}"))
+            connection.execute(text("ALTER TABLE conversations ALTER COLUMN id TYPE UUID USING id::uuid"))
+            connection.execute(text(
+                "ALTER TABLE conversation_entries ALTER COLUMN conversation_id TYPE UUID USING conversation_id::uuid"
+            ))
+            for fk in entry_fks:
+                connection.execute(text(
+                    f"ALTER TABLE conversation_entries ADD CONSTRAINT {fk['name']} "
+                    "FOREIGN KEY (conversation_id) REFERENCES conversations (id)"
+                ))
+        
+        if inspector.has_table('flow_sessions'):
+            flow_id_type = {column['name']: column['type'] for column in inspector.get_columns('flow_sessions')}['id']
+            if not isinstance(flow_id_type, Uuid):
+                connection.execute(text("ALTER TABLE flow_sessions ALTER COLUMN id TYPE UUID USING id::uuid"))
+    
+    @staticmethod
+    def _convert_payment_status_to_enum(connection, inspector) -> None:
+        """Rewrite the varchar payments.status column as the payment_status enum"""
+        if not inspector.has_table('payments'):
+            return
+        status_type = {column['name']: column['type'] for column in inspector.get_columns('payments')}['status']
+        if isinstance(status_type, Enum):
+            return
+        Payment.__table__.c.status.type.create(connection, checkfirst=True)
+        connection.execute(text(
+            "ALTER TABLE payments ALTER COLUMN status TYPE payment_status USING status::payment_status"
+        ))
+    
+    @staticmethod
+    def _create_user_daily_stats_view(connection) -> None:
+        """Create mv_user_daily_stats with the unique index REFRESH ... CONCURRENTLY requires"""
+        view_sql = USER_DAILY_STATS_QUERY.compile(dialect=connection.dialect, compile_kwargs={'literal_binds': True})
+        connection.execute(text(f"CREATE MATERIALIZED VIEW IF NOT EXISTS mv_user_daily_stats AS {view_sql}"))
+        connection.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_user_daily_stats ON mv_user_daily_stats (user_id, date)"
+        ))
+    
+    @staticmethod
+    def refresh_user_daily_stats() -> None:
+        """Refresh mv_user_daily_stats without blocking readers (PostgreSQL only)"""
+        if db.engine.dialect.name != 'postgresql':
+            return
+        with db.engine.begin() as connection:
+            # Every worker schedules a refresh; the advisory lock lets only one of them run it
+            if connection.execute(text("SELECT pg_try_advisory_xact_lock(hashtext('mv_user_daily_stats'))")).scalar():
+                connection.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY mv_user_daily_stats"))
+    
+    @staticmethod
+    def get_user_daily_stats(user_id: str, days: int = 30) -> List[Dict]:
+        """Get per-day flow statistics for a user, newest first"""
+        cutoff_date = (datetime.utcnow() - timedelta(days=days)).date()
+        
+        try:
+            # PostgreSQL reads the materialized view; other databases aggregate on the fly
+            if db.engine.dialect.name == 'postgresql':
+                source = USER_DAILY_STATS_VIEW
+            else:
+                source = USER_DAILY_STATS_QUERY.subquery()
+            
+            rows = db.session.execute(
+                select(source).where(
+                    and_(source.c.user_id == user_id, source.c.date >= cutoff_date)
+                ).order_by(source.c.date.desc())
+            ).mappings().all()
+            
+            return [
+                {
+                    'date': row['date'],
+                    'session_count': row['session_count'],
+                    'tokens_used': int(row['tokens_used']),
+                    'avg_processing_time': round(float(row['avg_processing_time'] or 0), 2),
+                    'avg_satisfaction': float(row['avg_satisfaction']) if row['avg_satisfaction'] is not None else None,
+                    'avg_flow_quality': float(row['avg_flow_quality']) if row['avg_flow_quality'] is not None else None
+                }
+                for row in rows
+            ]
+            
+        except Exception as e:
+            logging.error(f"Error getting daily stats for user {user_id}: {str(e)}")
+            return []
+    
+    @staticmethod
+    def ensure_indexes(connection) -> None:
+        """Create indexes declared on models that are missing from existing tables"""
+        # create_all() only creates missing tables, so indexes added to a model later never reach the DB
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                # GIN indexes are PostgreSQL-only (create_all skips them via ddl_if)
+                if index.dialect_kwargs.get('postgresql_using') == 'gin' and connection.dialect.name != 'postgresql':
+                    continue
+                connection.execute(CreateIndex(index, if_not_exists=True))
+    
     @staticmethod
     def get_conversation_stats(days: int = 30) -> Dict:
         """Get comprehensive conversation statistics"""
@@ -19,45 +321,53 @@ class DatabaseManager:
         
         try:
             # Basic conversation stats
-            total_conversations = Conversation.query.filter(
-                Conversation.created_at >= cutoff_date
-            ).count()
-            
-            completed_conversations = Conversation.query.filter(
-                and_(
-                    Conversation.created_at >= cutoff_date,
-                    Conversation.is_complete == True
+            total_conversations = db.session.scalar(
+                select(func.count()).select_from(Conversation).where(
+                    Conversation.created_at >= cutoff_date
                 )
-            ).count()
+            )
             
-            # Average completion time
-            avg_completion_time = db.session.query(
-                func.avg(
-                    func.extract('epoch', Conversation.completion_time - Conversation.created_at)
+            completed_conversations = db.session.scalar(
+                select(func.count()).select_from(Conversation).where(
+                    and_(
+                        Conversation.created_at >= cutoff_date,
+                        Conversation.is_complete == True
+                    )
                 )
-            ).filter(
-                and_(
-                    Conversation.created_at >= cutoff_date,
-                    Conversation.completion_time.isnot(None)
+            )
+            
+            # Average completion time
+            avg_completion_time = db.session.scalar(
+                select(
+                    func.avg(
+                        func.extract('epoch', Conversation.completion_time - Conversation.created_at)
+                    )
+                ).where(
+                    and_(
+                        Conversation.created_at >= cutoff_date,
+                        Conversation.completion_time.isnot(None)
+                    )
                 )
-            ).scalar() or 0
+            ) or 0
             
             # Token usage stats
-            total_tokens = db.session.query(
-                func.sum(Conversation.total_tokens_used)
-            ).filter(
-                Conversation.created_at >= cutoff_date
-            ).scalar() or 0
+            total_tokens = db.session.scalar(
+                select(func.sum(Conversation.total_tokens_used)).where(
+                    Conversation.created_at >= cutoff_date
+                )
+            ) or 0
             
             avg_tokens_per_conversation = total_tokens / total_conversations if total_conversations > 0 else 0
             
             # Error statistics
-            conversations_with_errors = Conversation.query.filter(
-                and_(
-                    Conversation.created_at >= cutoff_date,
-                    Conversation.error_count > 0
+            conversations_with_errors = db.session.scalar(
+                select(func.count()).select_from(Conversation).where(
+                    and_(
+                        Conversation.created_at >= cutoff_date,
+                        Conversation.error_count > 0
+                    )
                 )
-            ).count()
+            )
             
             error_rate = (conversations_with_errors / total_conversations * 100) if total_conversations > 0 else 0
             
@@ -93,23 +403,26 @@ class DatabaseManager:
                              completed_only: bool = False) -> Tuple[List[Dict], int]:
         """Get paginated conversation list with search and filtering"""
         try:
-            query = Conversation.query.order_by(desc(Conversation.created_at))
+            query = select(Conversation).options(
+                defer(Conversation.initial_input), *list_loader_options()
+            ).order_by(desc(Conversation.created_at))
             
             # Apply filters
             if completed_only:
-                query = query.filter(Conversation.is_complete == True)
+                query = query.where(Conversation.is_complete == True)
             
             if search_query:
                 search_pattern = f"%{search_query}%"
-                query = query.filter(
+                query = query.where(
                     or_(
                         Conversation.initial_input.ilike(search_pattern),
-                        Conversation.id.ilike(search_pattern)
+                        cast(Conversation.id, String).ilike(search_pattern)
                     )
                 )
             
             # Get paginated results
-            paginated = query.paginate(
+            paginated = db.paginate(
+                query,
                 page=page,
                 per_page=per_page,
                 error_out=False
@@ -128,11 +441,14 @@ class DatabaseManager:
     def get_conversation_with_entries(conversation_id: str) -> Optional[Dict]:
         """Get complete conversation with all entries"""
         try:
-            conversation = Conversation.query.get(conversation_id)
+            conversation = db.session.get(
+                Conversation, conversation_id,
+                options=list_loader_options(selectinload(Conversation.entries))
+            )
             if not conversation:
                 return None
             
-            return conversation.to_dict()
+            return conversation_to_dict(conversation)
             
         except Exception as e:
             logging.error(f"Error getting conversation {conversation_id}: {str(e)}")
@@ -142,12 +458,14 @@ class DatabaseManager:
     def delete_conversation(conversation_id: str) -> bool:
         """Delete a conversation and all its entries"""
         try:
-            conversation = Conversation.query.get(conversation_id)
+            conversation = db.session.get(Conversation, conversation_id)
             if not conversation:
                 return False
             
             # Delete all entries first (cascade should handle this, but being explicit)
-            ConversationEntry.query.filter_by(conversation_id=conversation_id).delete()
+            db.session.execute(
+                delete(ConversationEntry).where(ConversationEntry.conversation_id == conversation_id)
+            )
             
             # Delete the conversation
             db.session.delete(conversation)
@@ -167,10 +485,14 @@ class DatabaseManager:
         try:
             cutoff_time = datetime.utcnow() - timedelta(hours=hours)
             
-            stale_conversations = Conversation.query.filter(
-                and_(
-                    Conversation.updated_at < cutoff_time,
-                    Conversation.is_complete == False
+            stale_conversations = db.session.scalars(
+                select(Conversation).options(
+                    defer(Conversation.initial_input), *list_loader_options()
+                ).where(
+                    and_(
+                        Conversation.updated_at < cutoff_time,
+                        Conversation.is_complete == False
+                    )
                 )
             ).all()
             
@@ -187,14 +509,16 @@ class DatabaseManager:
             cutoff_date = datetime.utcnow() - timedelta(days=days)
             
             # Count conversations to be deleted
-            count = Conversation.query.filter(
-                Conversation.created_at < cutoff_date
-            ).count()
+            count = db.session.scalar(
+                select(func.count()).select_from(Conversation).where(
+                    Conversation.created_at < cutoff_date
+                )
+            )
             
             # Delete old conversations (cascade will handle entries)
-            Conversation.query.filter(
-                Conversation.created_at < cutoff_date
-            ).delete()
+            db.session.execute(
+                delete(Conversation).where(Conversation.created_at < cutoff_date)
+            )
             
             db.session.commit()
             logging.info(f"Cleaned up {count} old conversations")
@@ -209,9 +533,13 @@ class DatabaseManager:
     def get_session_conversations(session_id: str) -> List[Dict]:
         """Get all conversations for a specific session"""
         try:
-            conversations = Conversation.query.filter_by(
-                session_id=session_id
-            ).order_by(desc(Conversation.created_at)).all()
+            conversations = db.session.scalars(
+                select(Conversation).options(
+                    defer(Conversation.initial_input), *list_loader_options()
+                ).where(
+                    Conversation.session_id == session_id
+                ).order_by(desc(Conversation.created_at))
+            ).all()
             
             return [conv.get_summary() for conv in conversations]
             
@@ -226,19 +554,21 @@ class DatabaseManager:
             cutoff_date = datetime.utcnow() - timedelta(days=days)
             
             # Get processing times by agent
-            agent_times = db.session.query(
-                ConversationEntry.agent_name,
-                func.avg(ConversationEntry.processing_time_seconds).label('avg_time'),
-                func.min(ConversationEntry.processing_time_seconds).label('min_time'),
-                func.max(ConversationEntry.processing_time_seconds).label('max_time'),
-                func.count(ConversationEntry.id).label('response_count')
-            ).filter(
-                and_(
-                    ConversationEntry.created_at >= cutoff_date,
-                    ConversationEntry.error_occurred == False,
-                    ConversationEntry.processing_time_seconds > 0
-                )
-            ).group_by(ConversationEntry.agent_name).all()
+            agent_times = db.session.execute(
+                select(
+                    ConversationEntry.agent_name,
+                    func.avg(ConversationEntry.processing_time_seconds).label('avg_time'),
+                    func.min(ConversationEntry.processing_time_seconds).label('min_time'),
+                    func.max(ConversationEntry.processing_time_seconds).label('max_time'),
+                    func.count(ConversationEntry.id).label('response_count')
+                ).where(
+                    and_(
+                        ConversationEntry.created_at >= cutoff_date,
+                        ConversationEntry.error_occurred == False,
+                        ConversationEntry.processing_time_seconds > 0
+                    )
+                ).group_by(ConversationEntry.agent_name)
+            ).all()
             
             return {
                 'agent_times': [
@@ -265,12 +595,14 @@ class DatabaseManager:
             cutoff_date = datetime.utcnow() - timedelta(days=days)
             
             # Get error entries
-            error_entries = ConversationEntry.query.filter(
-                and_(
-                    ConversationEntry.created_at >= cutoff_date,
-                    ConversationEntry.error_occurred == True
-                )
-            ).order_by(desc(ConversationEntry.created_at)).limit(50).all()
+            error_entries = db.session.scalars(
+                select(ConversationEntry).where(
+                    and_(
+                        ConversationEntry.created_at >= cutoff_date,
+                        ConversationEntry.error_occurred == True
+                    )
+                ).order_by(desc(ConversationEntry.created_at)).limit(50)
+            ).all()
             
             # Group errors by agent
             errors_by_agent = {}
@@ -314,12 +646,12 @@ class DatabaseManager:
     def backup_conversation_data(conversation_id: str) -> Optional[Dict]:
         """Create a backup of conversation data"""
         try:
-            conversation = Conversation.query.get(conversation_id)
+            conversation = db.session.get(Conversation, conversation_id)
             if not conversation:
                 return None
             
             backup_data = {
-                'conversation': conversation.to_dict(),
+                'conversation': conversation_to_dict(conversation),
                 'backup_timestamp': datetime.utcnow().isoformat(),
                 'version': '1.0'
             }
@@ -341,13 +673,15 @@ class DatabaseManager:
                 raise Exception("Database connectivity test failed")
             
             # Get table sizes
-            conversation_count = Conversation.query.count()
-            entry_count = ConversationEntry.query.count()
+            conversation_count = db.session.scalar(select(func.count()).select_from(Conversation))
+            entry_count = db.session.scalar(select(func.count()).select_from(ConversationEntry))
             
             # Get recent activity
-            recent_conversations = Conversation.query.filter(
-                Conversation.created_at >= datetime.utcnow() - timedelta(hours=24)
-            ).count()
+            recent_conversations = db.session.scalar(
+                select(func.count()).select_from(Conversation).where(
+                    Conversation.created_at >= datetime.utcnow() - timedelta(hours=24)
+                )
+            )
             
             # Check for long-running queries or locks (simplified)
             database_size = db.session.execute(
@@ -370,4 +704,98 @@ class DatabaseManager:
                 'healthy': False,
                 'error': str(e),
                 'last_checked': datetime.utcnow().isoformat()
-            }
\ No newline at end of file
+            }
+
+
+class BackgroundWriter:
+    """
+    Write-behind queue for fire-and-forget inserts (analytics/telemetry rows)
+    
+    Rows are committed in batches by a background thread so the request path
+    never waits on the INSERT. Queued rows can be lost if the process crashes,
+    so only use this for data the user does not need for correctness.
+    """
+    
+    def __init__(self, batch_size: int = 50, flush_interval: float = 1.0, max_queue_size: int = 10000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=max_queue_size)
+        self._app = None
+        self._thread = None
+        self._lock = threading.Lock()
+        atexit.register(self._drain)
+    
+    def submit(self, obj) -> None:
+        """Queue a new model instance for insert; must be called inside an app context"""
+        self._ensure_started()
+        try:
+            self.queue.put_nowait(obj)
+        except queue.Full:
+            # Backpressure: write synchronously rather than drop the row, in a separate session
+            # so the caller's own pending changes are not committed along with it
+            logging.warning("Background write queue full, writing synchronously")
+            with Session(db.engine, expire_on_commit=False) as session:
+                session.add(obj)
+                session.commit()
+    
+    def _ensure_started(self):
+        """Start the writer thread in this process (threads don't survive a Gunicorn fork)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._app = current_app._get_current_object()
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+    
+    def _run(self):
+        """Collect up to batch_size rows or flush_interval seconds' worth, then commit"""
+        while True:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._commit(batch)
+    
+    def _commit(self, batch):
+        """Insert a batch of rows in a single transaction, retrying row by row if it fails"""
+        with self._app.app_context():
+            try:
+                db.session.add_all(batch)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                logging.warning("Error writing %d background rows, retrying individually: %s", len(batch), e)
+                # Rollback expunged the pending rows, so each can be re-added; only failing rows are lost
+                for obj in batch:
+                    try:
+                        db.session.add(obj)
+                        db.session.commit()
+                    except Exception as row_error:
+                        db.session.rollback()
+                        logging.error("Dropping background row %r: %s", obj, row_error)
+            finally:
+                db.session.remove()
+    
+    def _drain(self):
+        """Flush whatever is still queued when the process exits"""
+        if self._app is None:
+            return
+        batch = []
+        while True:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            self._commit(batch)
+
+
+# Shared writer for analytics rows such as FlowSession
+analytics_writer = BackgroundWriter()
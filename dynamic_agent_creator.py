@@ -4,6 +4,7 @@ Allows users to create custom AI agents with specific functions on-demand
 """
 import re
 import logging
+import threading
 from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime
 from openai import OpenAI
@@ -296,7 +297,7 @@ Remember: Your goal is to help the user achieve complete life autonomy and finan
     def increment_agent_usage(self, agent_id: int):
         """Increment usage count for an agent"""
         try:
-            agent = DynamicAgent.query.get(agent_id)
+            agent = db.session.get(DynamicAgent, agent_id)
             if agent:
                 agent.usage_count += 1
                 db.session.commit()
@@ -393,4 +394,17 @@ Remember: Your goal is to help the user achieve complete life autonomy and finan
             return {
                 'success': False,
                 'error': f'Failed to generate response: {str(e)}'
-            }
\ No newline at end of file
+            }
+
+# Shared creator instance (holds an OpenAI client, so build it once per process)
+_agent_creator = None
+_agent_creator_lock = threading.Lock()
+
+def get_agent_creator() -> DynamicAgentCreator:
+    """Return the process-wide DynamicAgentCreator, creating it on first use"""
+    global _agent_creator
+    if _agent_creator is None:
+        with _agent_creator_lock:
+            if _agent_creator is None:
+                _agent_creator = DynamicAgentCreator()
+    return _agent_creator
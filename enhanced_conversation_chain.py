@@ -4,14 +4,30 @@ Implements: Analyst → Researcher → Writer → CSA → COO → CTO → CFO 
 Enhanced with OperatorOS Production Memory Foundation Layer
 """
 
+import os
 import logging
+import threading
 import time
-import uuid
 from datetime import datetime
 from typing import Dict, List, Any, Optional
-from models import db, Conversation, ConversationEntry
+from models import db, Conversation, bulk_insert_entries
 from business_package_generator import business_package_generator
 from operatoros_memory import OperatorOSMemory
+from utils.ids import new_uuid
+
+# Shared OpenAI client reused by every chain so agent calls share one connection pool
+_openai_client = None
+_openai_client_lock = threading.Lock()
+
+def _get_openai_client():
+    """Return the shared OpenAI client, creating it on first use"""
+    global _openai_client
+    if _openai_client is None:
+        with _openai_client_lock:
+            if _openai_client is None:
+                from openai import OpenAI
+                _openai_client = OpenAI(api_key=os.environ.get('OPENAI_API_KEY'))
+    return _openai_client
 
 class Enhanced11AgentChain:
     """
@@ -21,7 +37,7 @@ class Enhanced11AgentChain:
     
     def __init__(self, conversation_id: str = None):
         if conversation_id:
-            self.conversation = Conversation.query.get(conversation_id)
+            self.conversation = db.session.get(Conversation, conversation_id)
             if not self.conversation:
                 raise ValueError(f"Conversation {conversation_id} not found")
         else:
@@ -43,17 +59,18 @@ class Enhanced11AgentChain:
         ]
         
         self.agent_results = {}
+        self.pending_entries = []
         self.processing_start_time = None
         self.business_package = None
     
     @classmethod
     def create_new(cls, initial_input: str, session_id: str = None, user_ip: str = None) -> 'Enhanced11AgentChain':
         """Create new conversation chain with guaranteed business package generation"""
-        conversation_id = str(uuid.uuid4())
+        conversation_id = new_uuid()
         
         conversation = Conversation(
             id=conversation_id,
-            session_id=session_id or str(uuid.uuid4()),
+            session_id=session_id or new_uuid(),
             initial_input=initial_input,
             user_ip=user_ip or "127.0.0.1",
             is_complete=False,
@@ -74,8 +91,20 @@ class Enhanced11AgentChain:
         Returns:
             Dict with complete results including downloadable business package
         """
+        for event_type, payload in self.stream_pipeline(input_text):
+            if event_type == "result":
+                return payload
+    
+    def stream_pipeline(self, input_text: str):
+        """
+        Execute the 11-agent pipeline, yielding progress as each agent finishes
+        
+        Yields:
+            ("agent", dict) after every agent, then a final ("result", dict) with the
+            same shape execute_complete_pipeline returns
+        """
         try:
-            self.processing_start_time = time.time()
+            self.processing_start_time = time.perf_counter()
             logging.info(f"Starting Enhanced 11-Agent pipeline for: {self.conversation.id}")
             
             # Execute all 11 agents in sequence
@@ -91,7 +120,7 @@ class Enhanced11AgentChain:
                     # Store result
                     self.agent_results[agent_name.lower()] = agent_result["response"]
                     
-                    # Create conversation entry
+                    # Buffer conversation entry (written in bulk when the pipeline ends)
                     self._create_conversation_entry(
                         agent_name=agent_name,
                         input_text=current_input,
@@ -104,17 +133,23 @@ class Enhanced11AgentChain:
                     
                     # Update conversation progress
                     self.conversation.current_agent_index = i + 1
-                    db.session.commit()
                     
                 except Exception as e:
                     logging.error(f"Error in agent {agent_name}: {str(e)}")
                     # Continue with next agent to ensure pipeline completion
                     self.agent_results[agent_name.lower()] = f"Agent processing error: {str(e)}"
+                
+                yield "agent", {
+                    "agent": agent_name,
+                    "index": i + 1,
+                    "total": len(self.agent_pipeline),
+                    "response": self.agent_results[agent_name.lower()]
+                }
             
-            # Mark conversation as complete
+            # Mark conversation as complete and write all entries in one transaction
             self.conversation.is_complete = True
             self.conversation.completion_time = datetime.utcnow()
-            db.session.commit()
+            self._commit_entries()
             
             # Generate universal business package
             self.business_package = business_package_generator.generate_universal_package(
@@ -122,11 +157,11 @@ class Enhanced11AgentChain:
                 self.agent_results
             )
             
-            processing_time = time.time() - self.processing_start_time
+            processing_time = time.perf_counter() - self.processing_start_time
             
             logging.info(f"Enhanced 11-Agent pipeline completed in {processing_time:.2f}s")
             
-            return {
+            yield "result", {
                 "success": True,
                 "conversation_id": self.conversation.id,
                 "agents_completed": len(self.agent_pipeline),
@@ -138,7 +173,8 @@ class Enhanced11AgentChain:
             
         except Exception as e:
             logging.error(f"Error in Enhanced 11-Agent pipeline: {str(e)}")
-            return {
+            self._save_partial_progress()
+            yield "result", {
                 "success": False,
                 "error": f"Pipeline execution failed: {str(e)}",
                 "conversation_id": self.conversation.id if self.conversation else None
@@ -147,16 +183,13 @@ class Enhanced11AgentChain:
     def _execute_agent(self, agent_name: str, input_text: str) -> Dict[str, Any]:
         """Execute individual agent with specialized prompts"""
         try:
-            from openai import OpenAI
-            import os
-            
-            client = OpenAI(api_key=os.environ.get('OPENAI_API_KEY'))
+            client = _get_openai_client()
             
             # Get agent-specific system prompt
             system_prompt = self._get_agent_system_prompt(agent_name)
             
             # Generate response
-            start_time = time.time()
+            start_time = time.perf_counter()
             response = client.chat.completions.create(
                 model="gpt-3.5-turbo",
                 messages=[
@@ -167,7 +200,7 @@ class Enhanced11AgentChain:
                 temperature=0.7
             )
             
-            processing_time = time.time() - start_time
+            processing_time = time.perf_counter() - start_time
             response_text = response.choices[0].message.content
             
             # Generate next question for pipeline continuation
@@ -250,22 +283,33 @@ class Enhanced11AgentChain:
             return f"How would you refine and synthesize these insights: {response[:200]}...?"
     
     def _create_conversation_entry(self, agent_name: str, input_text: str, response: str, processing_time: float):
-        """Create conversation entry with enhanced tracking"""
-        entry = ConversationEntry(
-            conversation_id=self.conversation.id,
-            agent_name=agent_name,
-            agent_role=f"C-Suite {agent_name}",
-            input_text=input_text,
-            response_text=response,
-            processing_time_seconds=processing_time,
-            tokens_used=0,  # Will be updated if available
-            model_used="gpt-3.5-turbo",
-            api_provider="openai",
-            response_length=len(response)
-        )
-        
-        db.session.add(entry)
+        """Buffer conversation entry with enhanced tracking"""
+        self.pending_entries.append({
+            "agent_name": agent_name,
+            "agent_role": f"C-Suite {agent_name}",
+            "input_text": input_text,
+            "response_text": response,
+            "processing_time_seconds": processing_time,
+            "tokens_used": 0,  # Will be updated if available
+            "model_used": "gpt-3.5-turbo",
+            "api_provider": "openai",
+            "created_at": datetime.utcnow()
+        })
+    
+    def _commit_entries(self):
+        """Write buffered entries with a single bulk insert and commit"""
+        bulk_insert_entries(self.conversation.id, self.pending_entries)
         db.session.commit()
+        self.pending_entries = []
+    
+    def _save_partial_progress(self):
+        """Persist whatever entries were produced before a pipeline failure"""
+        try:
+            db.session.rollback()
+            self._commit_entries()
+        except Exception as e:
+            logging.error(f"Error saving partial pipeline progress: {str(e)}")
+            db.session.rollback()
     
     def get_conversation_summary(self) -> Dict[str, Any]:
         """Get comprehensive conversation summary"""
@@ -41,7 +41,7 @@ class FulfillmentSystem:
         """Trigger automated fulfillment for AI Form Check Pro Report"""
         try:
             # Get payment details
-            payment = Payment.query.get(payment_id)
+            payment = db.session.get(Payment, payment_id)
             if not payment or payment.status != PaymentStatus.PAID:
                 return {"success": False, "error": "Payment not found or not paid"}
             
@@ -211,7 +211,7 @@ class HumanClarityEngine:
         """Log clarity analysis for monitoring and improvement"""
         try:
             # Store in conversation entry as JSON metadata
-            entry = ConversationEntry.query.get(entry_id)
+            entry = db.session.get(ConversationEntry, entry_id)
             if entry:
                 clarity_data = {
                     "clarity_score": metrics.clarity_score,
@@ -1,17 +1,23 @@
 import os
+import time
 import logging
-from flask import Flask, render_template, request, jsonify, session, g, send_file
+from flask import Flask, render_template, request, jsonify, session, g, send_file, Response, stream_with_context, abort
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
+from flask_session import Session
 from flask_wtf.csrf import CSRFProtect
-from flask_socketio import SocketIO
+from flask_socketio import SocketIO, join_room
 from openai import OpenAI
-import uuid
 from datetime import datetime
 from models import db, Conversation, ConversationEntry
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+from database_utils import DatabaseManager, analytics_writer, conversation_to_dict
 from config import config, Config
-from utils.validators import InputValidator, SecurityValidator
-from multi_llm_provider import multi_llm, LLMProvider
+from utils.validators import InputValidator, SecurityValidator, fast_strip
+from utils.json_provider import OrjsonProvider
+from utils.ids import new_uuid
+from multi_llm_provider import multi_llm, PROVIDER_BY_NAME
 
 # Initialize Flask app
 def create_app(config_name=None):
@@ -22,6 +28,9 @@ def create_app(config_name=None):
     config_name = config_name or os.environ.get('FLASK_ENV', 'development')
     app.config.from_object(config[config_name])
     
+    # Serialize all jsonify() responses with orjson
+    app.json = OrjsonProvider(app)
+    
     # Check for required environment variables and prompt if missing
     try:
         Config.validate_required_env_vars()
@@ -48,27 +57,49 @@ def create_app(config_name=None):
     # Initialize extensions
     db.init_app(app)
     
+    # Initialize server-side session store
+    if app.config['SESSION_TYPE'] == 'redis':
+        import redis
+        app.config['SESSION_REDIS'] = redis.from_url(app.config['REDIS_URL'])
+    else:
+        app.config['SESSION_SQLALCHEMY'] = db
+    Session(app)
+    
     # Initialize CSRF protection
     csrf = CSRFProtect(app)
     
     # Initialize SocketIO for real-time notifications
-    socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
+    # With Redis configured, emits are published once and fanned out across workers by the queue
+    socketio = SocketIO(
+        app,
+        cors_allowed_origins="*",
+        async_mode='threading',
+        message_queue=app.config['REDIS_URL'] or None
+    )
+    
+    # Initialize notification system with SocketIO
+    from notifications import init_notifications
+    init_notifications(app, socketio)
     
     # Initialize rate limiter
     limiter = Limiter(
         app=app,
         key_func=lambda: SecurityValidator.check_rate_limit_key(get_remote_address()),
         default_limits=[app.config['RATELIMIT_DEFAULT']],
-        storage_uri=app.config['RATELIMIT_STORAGE_URL']
+        storage_uri=app.config['RATELIMIT_STORAGE_URL'],
+        strategy=app.config['RATELIMIT_STRATEGY'],
+        swallow_errors=app.config['RATELIMIT_SWALLOW_ERRORS'],
+        in_memory_fallback_enabled=app.config['RATELIMIT_IN_MEMORY_FALLBACK_ENABLED']
     )
     
     # Create database tables
     with app.app_context():
         try:
             db.create_all()
+            DatabaseManager.upgrade_schema()
             logging.info("Database tables created successfully")
         except Exception as e:
-            logging.error(f"Error creating database tables: {str(e)}")
+            logging.error("Error creating database tables: %s", e)
             raise e
     
     return app, limiter, csrf, socketio
@@ -103,12 +134,18 @@ spreadsheet_transformer = SpreadsheetTransformer()
 from flow_agents import FlowAgentManager
 flow_agent_manager = FlowAgentManager()
 
-# Initialize OperatorOS Master Agent
-from operatoros_master import operatoros_master
+# OperatorOS Master Agent, created on first use
+from operatoros_master import get_master, AgentResult
+from dynamic_agent_creator import get_agent_creator
 
-# Initialize notification system with SocketIO
 from notifications import notification_manager, system_monitor
-notification_manager.socketio = socketio
+
+@socketio.on('connect', namespace='/admin')
+def admin_socket_connect():
+    """Admit only authenticated admin sessions and subscribe them to the notification room"""
+    if not session.get('admin_authenticated'):
+        return False
+    join_room('admin')
 
 # RefinerAgent will be defined inline to avoid circular imports
 
@@ -145,7 +182,7 @@ def handle_csuite_request_direct(input_text):
         system_prompt = role_prompts.get(agent_code, "You are a business advisor.")
         
         # Generate response using OpenAI
-        start_time = datetime.utcnow()
+        start_time = time.perf_counter()
         
         response = openai_client.chat.completions.create(
             model=app.config['OPENAI_MODEL'],
@@ -158,10 +195,10 @@ def handle_csuite_request_direct(input_text):
         )
         
         response_text = response.choices[0].message.content
-        processing_time = (datetime.utcnow() - start_time).total_seconds()
+        processing_time = time.perf_counter() - start_time
         
         # Create conversation record
-        conversation_id = str(uuid.uuid4())
+        conversation_id = new_uuid()
         conversation = Conversation(
             id=conversation_id,
             initial_input=input_text,
@@ -182,7 +219,6 @@ def handle_csuite_request_direct(input_text):
             tokens_used=response.usage.total_tokens if response.usage else len(response_text.split()) * 1.3,
             model_used=app.config['OPENAI_MODEL'],
             api_provider="openai",
-            response_length=len(response_text),
             error_occurred=False
         )
         db.session.add(entry)
@@ -223,22 +259,22 @@ def handle_csuite_request_direct(input_text):
         })
         
     except Exception as e:
-        logging.error(f"Error in C-Suite agent {agent_code}: {str(e)}")
+        logging.error("Error in C-Suite agent %s: %s", agent_code, e)
         return jsonify({"error": f"C-Suite agent error: {str(e)}"}), 500
 
 def handle_csuite_request(csuite_agent, clean_input, original_input):
     """Handle C-Suite agent requests"""
     try:
-        start_time = datetime.utcnow()
+        start_time = time.perf_counter()
         
         # Generate response from C-Suite agent
         response, api_used = csuite_agent.generate_response(clean_input)
         
         # Calculate processing time
-        processing_time = (datetime.utcnow() - start_time).total_seconds()
+        processing_time = time.perf_counter() - start_time
         
         # Create a conversation entry for the C-Suite response
-        conversation_id = str(uuid.uuid4())
+        conversation_id = new_uuid()
         conversation = Conversation(
             id=conversation_id,
             initial_input=original_input,
@@ -260,7 +296,6 @@ def handle_csuite_request(csuite_agent, clean_input, original_input):
             tokens_used=len(response.split()) * 1.3,  # Rough token estimate
             model_used=api_used,
             api_provider=api_used,
-            response_length=len(response),
             error_occurred=False
         )
         db.session.add(entry)
@@ -301,12 +336,11 @@ def handle_csuite_request(csuite_agent, clean_input, original_input):
         })
         
     except Exception as e:
-        logging.error(f"Error in C-Suite agent {csuite_agent.name}: {str(e)}")
+        logging.error("Error in C-Suite agent %s: %s", csuite_agent.name, e)
         return jsonify({"error": f"C-Suite agent error: {str(e)}"}), 500
 
 # Schedule periodic health checks
 import threading
-import time
 
 def periodic_health_check():
     """Run periodic system health checks"""
@@ -316,12 +350,25 @@ def periodic_health_check():
             with app.app_context():
                 system_monitor.check_system_health()
         except Exception as e:
-            logging.error(f"Error in periodic health check: {str(e)}")
+            logging.error("Error in periodic health check: %s", e)
 
 # Start background health check thread
 health_check_thread = threading.Thread(target=periodic_health_check, daemon=True)
 health_check_thread.start()
 
+def periodic_analytics_refresh():
+    """Refresh materialized analytics roll-ups"""
+    while True:
+        try:
+            time.sleep(3600)  # Refresh hourly
+            with app.app_context():
+                DatabaseManager.refresh_user_daily_stats()
+        except Exception as e:
+            logging.error("Error refreshing analytics views: %s", e)
+
+analytics_refresh_thread = threading.Thread(target=periodic_analytics_refresh, daemon=True)
+analytics_refresh_thread.start()
+
 # Multi-API client setup
 openai_client = OpenAI(api_key=app.config['OPENAI_API_KEY'])
 
@@ -368,7 +415,7 @@ class Agent:
             else:
                 return self._generate_openai_response(input_text, conversation_history)
         except Exception as e:
-            logging.warning(f"Primary API {api_to_use} failed for {self.name}: {str(e)}")
+            logging.warning("Primary API %s failed for %s: %s", api_to_use, self.name, e)
             
             # Fallback to other available APIs
             fallback_apis = ['openai', 'claude', 'gemini']
@@ -376,7 +423,7 @@ class Agent:
             
             for fallback_api in fallback_apis:
                 try:
-                    logging.info(f"Trying fallback API {fallback_api} for {self.name}")
+                    logging.info("Trying fallback API %s for %s", fallback_api, self.name)
                     if fallback_api == 'claude' and claude_client:
                         return self._generate_claude_response(input_text, conversation_history)
                     elif fallback_api == 'gemini' and gemini_model:
@@ -384,7 +431,7 @@ class Agent:
                     elif fallback_api == 'openai':
                         return self._generate_openai_response(input_text, conversation_history)
                 except Exception as fallback_error:
-                    logging.warning(f"Fallback API {fallback_api} also failed: {str(fallback_error)}")
+                    logging.warning("Fallback API %s also failed: %s", fallback_api, fallback_error)
                     continue
             
             # If all APIs fail, raise the original error
@@ -465,7 +512,7 @@ class Agent:
             else:
                 raise ValueError(f"Response from {self.name} does not contain 'NEXT AGENT QUESTION:' format")
         except Exception as e:
-            logging.error(f"Error extracting question from {self.name}: {str(e)}")
+            logging.error("Error extracting question from %s: %s", self.name, e)
             raise Exception(f"Failed to extract question from {self.name}: {str(e)}")
 
 class AnalystAgent(Agent):
@@ -623,29 +670,22 @@ class ConversationChain:
                 
                 if strategist and tech_advisor and financial_advisor:
                     self.extended_agents = [strategist, tech_advisor, financial_advisor]
-                    logging.info(f"🏢 EXTENDED MODE: Added {len(self.extended_agents)} agents to chain")
+                    logging.info("🏢 EXTENDED MODE: Added %s agents to chain", len(self.extended_agents))
                 
             except Exception as e:
-                logging.warning(f"Could not load agents for extended mode: {str(e)}")
+                logging.warning("Could not load agents for extended mode: %s", e)
         
         # Combine core + extended agents
         self.agents = self.core_agents + self.extended_agents
         
-        logging.info(f"👥 AGENT CHAIN INITIALIZED: {len(self.agents)} total agents")
-        logging.info(f"📋 Agent Sequence: {' → '.join([agent.name for agent in self.agents])}")
+        logging.info("👥 AGENT CHAIN INITIALIZED: %s total agents", len(self.agents))
+        logging.info("📋 Agent Sequence: %s", ' → '.join([agent.name for agent in self.agents]))
         
         if conversation_id:
-            # Load existing conversation from database
-            self.conversation = Conversation.query.get(conversation_id)
-            if not self.conversation:
-                raise ValueError(f"Conversation {conversation_id} not found")
-        else:
-            self.conversation = None
-        logging.info(f"📋 Agent Sequence: {' → '.join([agent.name for agent in self.agents])}")
-        
-        if conversation_id:
-            # Load existing conversation from database
-            self.conversation = Conversation.query.get(conversation_id)
+            # Load existing conversation and its entries once; history, context and counts reuse them
+            self.conversation = db.session.get(
+                Conversation, conversation_id, options=[selectinload(Conversation.entries)]
+            )
             if not self.conversation:
                 raise ValueError(f"Conversation {conversation_id} not found")
         else:
@@ -654,7 +694,7 @@ class ConversationChain:
     @classmethod
     def create_new(cls, initial_input, session_id=None, user_ip=None, extended_mode=False):
         """Create a new conversation chain with enhanced persistence"""
-        conversation_id = str(uuid.uuid4())
+        conversation_id = new_uuid()
         conversation = Conversation(
             id=conversation_id,
             initial_input=initial_input,
@@ -683,7 +723,7 @@ class ConversationChain:
         if self.conversation.is_complete:
             raise Exception("Conversation chain is already complete")
         
-        start_time = datetime.utcnow()
+        start_time = time.perf_counter()
         
         # Check for API prefix selection
         api_override = None
@@ -703,13 +743,12 @@ class ConversationChain:
             current_agent = self.agents[self.conversation.current_agent_index]
             
             # Log agent execution start
-            logging.info(f"🎯 AGENT EXECUTION: Starting {current_agent.name} (index {self.conversation.current_agent_index})")
+            logging.info("🎯 AGENT EXECUTION: Starting %s (index %s)", current_agent.name, self.conversation.current_agent_index)
             if api_override:
-                logging.info(f"🔀 API OVERRIDE: Using {api_override} for this request")
+                logging.info("🔀 API OVERRIDE: Using %s for this request", api_override)
             
-            # Get recent conversation history for context
-            recent_entries = self.conversation.entries.order_by(ConversationEntry.created_at.desc()).limit(3).all()
-            context_history = [entry.to_dict() for entry in reversed(recent_entries)]
+            # Get recent conversation history for context (entries are already loaded in order)
+            context_history = [entry.to_dict() for entry in self.conversation.entries[-3:]]
             
             # Generate response from current agent with timeout and retry
             response, api_used = self._generate_with_retry(current_agent, input_text, context_history, max_retries=3, timeout_seconds=15, api_override=api_override)
@@ -718,14 +757,15 @@ class ConversationChain:
             next_question = current_agent.extract_next_question(response)
             
             # Calculate processing time
-            processing_time = (datetime.utcnow() - start_time).total_seconds()
+            processing_time = time.perf_counter() - start_time
             
             # Log agent completion
-            logging.info(f"✅ AGENT COMPLETED: {current_agent.name} in {processing_time:.2f}s")
+            logging.info("✅ AGENT COMPLETED: %s in %.2fs", current_agent.name, processing_time)
             
             # Create and save conversation entry with enhanced tracking
+            # (attached through the relationship so the loaded entries list stays current)
             entry = ConversationEntry(
-                conversation_id=self.conversation.id,
+                conversation=self.conversation,
                 agent_name=current_agent.name,
                 agent_role=current_agent.role,
                 input_text=original_input,  # Store original input with prefix if any
@@ -746,7 +786,7 @@ class ConversationChain:
                 db.session.flush()  # Get the entry ID
                 clarity_engine.log_clarity_analysis(self.conversation.id, entry.id, clarity_metrics)
             except Exception as e:
-                logging.warning(f"Human-clarity analysis failed: {str(e)}")
+                logging.warning("Human-clarity analysis failed: %s", e)
 
             
             # Update conversation token usage (estimate)
@@ -764,9 +804,9 @@ class ConversationChain:
                 # **🚀 CRITICAL ADDITION: Auto-generate deliverable when loop completes**
                 try:
                     deliverable_result = self._generate_conversation_deliverable()
-                    logging.info(f"✅ DELIVERABLE GENERATED: {deliverable_result.get('filename', 'Unknown')} ({deliverable_result.get('file_size', 'Unknown size')})")
+                    logging.info("✅ DELIVERABLE GENERATED: %s (%s)", deliverable_result.get('filename', 'Unknown'), deliverable_result.get('file_size', 'Unknown size'))
                 except Exception as e:
-                    logging.error(f"❌ DELIVERABLE GENERATION FAILED: {str(e)}")
+                    logging.error("❌ DELIVERABLE GENERATION FAILED: %s", e)
                 
                 # Send completion notification
                 from notifications import notification_manager, NotificationLevel
@@ -790,7 +830,7 @@ class ConversationChain:
         except Exception as e:
             # Handle error and rollback
             db.session.rollback()
-            logging.error(f"Error processing input: {str(e)}")
+            logging.error("Error processing input: %s", e)
             
             # Record error in conversation
             self.conversation.error_count += 1
@@ -803,7 +843,7 @@ class ConversationChain:
                 input_text=input_text,
                 response_text=f"Error occurred: {str(e)}",
                 next_question=None,
-                processing_time_seconds=(datetime.utcnow() - start_time).total_seconds(),
+                processing_time_seconds=time.perf_counter() - start_time,
                 error_occurred=True,
                 error_message=str(e)
             )
@@ -821,7 +861,7 @@ class ConversationChain:
                     "conversation_id": self.conversation.id, 
                     "error": str(e), 
                     "agent": current_agent.name if 'current_agent' in locals() else 'Unknown',
-                    "processing_time": (datetime.utcnow() - start_time).total_seconds(),
+                    "processing_time": time.perf_counter() - start_time,
                     "agent_index": self.conversation.current_agent_index
                 },
                 send_email=True
@@ -845,9 +885,9 @@ class ConversationChain:
         from datetime import datetime
         
         for attempt in range(max_retries):
-            start_time = datetime.utcnow()
+            start_time = time.perf_counter()
             try:
-                logging.info(f"🔄 RETRY ATTEMPT: {attempt + 1}/{max_retries} for {agent.name}")
+                logging.info("🔄 RETRY ATTEMPT: %s/%s for %s", attempt + 1, max_retries, agent.name)
                 
                 # Set timeout alarm with longer duration for complex agents
                 def timeout_handler(signum, frame):
@@ -865,47 +905,47 @@ class ConversationChain:
                     if response and len(response.strip()) > 50:  # Require more substantial responses
                         # Check for proper question format for non-Writer agents
                         if agent.name != "Writer" and "NEXT AGENT QUESTION:" not in response:
-                            logging.warning(f"⚠️ FORMAT WARNING: {agent.name} response missing 'NEXT AGENT QUESTION:' format")
+                            logging.warning("⚠️ FORMAT WARNING: %s response missing 'NEXT AGENT QUESTION:' format", agent.name)
                             # Try to extract or generate a question anyway
                             if attempt < max_retries - 1:
                                 raise ValueError("Missing required NEXT AGENT QUESTION format")
                         
-                        processing_time = (datetime.utcnow() - start_time).total_seconds()
-                        logging.info(f"✅ RETRY SUCCESS: {agent.name} responded successfully in {processing_time:.2f}s using {api_used}")
+                        processing_time = time.perf_counter() - start_time
+                        logging.info("✅ RETRY SUCCESS: %s responded successfully in %.2fs using %s", agent.name, processing_time, api_used)
                         return response, api_used
                     else:
                         raise ValueError(f"Response too short ({len(response.strip()) if response else 0} chars) or empty")
                         
                 except TimeoutError:
                     signal.alarm(0)  # Cancel alarm
-                    processing_time = (datetime.utcnow() - start_time).total_seconds()
-                    logging.warning(f"⏱️ TIMEOUT: {agent.name} timed out on attempt {attempt + 1} after {processing_time:.2f}s")
+                    processing_time = time.perf_counter() - start_time
+                    logging.warning("⏱️ TIMEOUT: %s timed out on attempt %s after %.2fs", agent.name, attempt + 1, processing_time)
                     if attempt == max_retries - 1:
                         raise TimeoutError(f"Agent {agent.name} failed after {max_retries} timeout attempts")
                     time.sleep(3)  # Longer wait for timeout recovery
                     
             except Exception as e:
                 signal.alarm(0)  # Cancel alarm
-                processing_time = (datetime.utcnow() - start_time).total_seconds()
-                logging.error(f"❌ RETRY FAILED: {agent.name} attempt {attempt + 1} ({processing_time:.2f}s): {str(e)}")
+                processing_time = time.perf_counter() - start_time
+                logging.error("❌ RETRY FAILED: %s attempt %s (%.2fs): %s", agent.name, attempt + 1, processing_time, e)
                 
                 if attempt == max_retries - 1:
                     # Final attempt failed - log comprehensive error
-                    logging.critical(f"🚨 AGENT FAILURE: {agent.name} failed after {max_retries} attempts")
+                    logging.critical("🚨 AGENT FAILURE: %s failed after %s attempts", agent.name, max_retries)
                     raise Exception(f"Agent {agent.name} failed after {max_retries} attempts: {str(e)}")
                 
                 # Progressive backoff
                 wait_time = (attempt + 1) * 2  # 2s, 4s, 6s...
-                logging.info(f"⏳ WAITING: {wait_time}s before retry {attempt + 2}")
+                logging.info("⏳ WAITING: %ss before retry %s", wait_time, attempt + 2)
                 time.sleep(wait_time)
                 
         raise Exception(f"All retry attempts failed for {agent.name}")
     
     def execute_full_loop(self, initial_input):
         """Execute complete OperatorOS loop: Analyst → Researcher → Writer → Refiner → [All Available Agents]"""
-        logging.info(f"🚀 STARTING FULL OPERATOROS LOOP")
-        logging.info(f"📝 Initial Input: {initial_input}")
-        logging.info(f"👥 Total Available Agents: {len(self.agents)} ({[agent.name for agent in self.agents]})")
+        logging.info("🚀 STARTING FULL OPERATOROS LOOP")
+        logging.info("📝 Initial Input: %s", initial_input)
+        logging.info("👥 Total Available Agents: %s (%s)", len(self.agents), [agent.name for agent in self.agents])
         
         loop_results = []
         current_input = initial_input
@@ -916,32 +956,32 @@ class ConversationChain:
                 if step == 1:
                     # First agent gets the original input
                     agent_input = current_input
-                    logging.info(f"🔍 STEP {step}: EXECUTING {agent.name.upper()} AGENT")
-                    logging.info(f"📝 Input: {agent_input}")
+                    logging.info("🔍 STEP %s: EXECUTING %s AGENT", step, agent.name.upper())
+                    logging.info("📝 Input: %s", agent_input)
                 else:
                     # Subsequent agents get the next question from previous agent
                     previous_result = loop_results[-1]
                     if not previous_result.get('next_question'):
-                        logging.warning(f"⚠️ {loop_results[-1].get('agent_name', 'Previous agent')} failed to generate next question")
+                        logging.warning("⚠️ %s failed to generate next question", loop_results[-1].get('agent_name', 'Previous agent'))
                         # For the final agent (usually Writer), we allow this
                         if step == len(self.agents):
-                            logging.info(f"🎯 FINAL AGENT: {agent.name} - no next question required")
+                            logging.info("🎯 FINAL AGENT: %s - no next question required", agent.name)
                             break
                         else:
                             raise Exception(f"{loop_results[-1].get('agent_name', 'Previous agent')} failed to generate next question for {agent.name}")
                     
                     agent_input = previous_result['next_question']
-                    logging.info(f"🔄 STEP {step}: AUTO-TRIGGERING {agent.name.upper()} AGENT")
-                    logging.info(f"🔗 {agent.name} Input: {agent_input}")
+                    logging.info("🔄 STEP %s: AUTO-TRIGGERING %s AGENT", step, agent.name.upper())
+                    logging.info("🔗 %s Input: %s", agent.name, agent_input)
                 
                 # Execute current agent
                 agent_result = self.process_input(agent_input)
                 loop_results.append(agent_result)
-                logging.info(f"✅ STEP {step} COMPLETE: {agent.name} executed successfully")
+                logging.info("✅ STEP %s COMPLETE: %s executed successfully", step, agent.name)
                 
                 # Check if this is the last agent or conversation is marked complete
                 if self.conversation.current_agent_index >= len(self.agents) or self.conversation.is_complete:
-                    logging.info(f"🎯 LOOP COMPLETION: Reached agent {step}/{len(self.agents)} - {agent.name}")
+                    logging.info("🎯 LOOP COMPLETION: Reached agent %s/%s - %s", step, len(self.agents), agent.name)
                     break
             
             # Determine final status
@@ -949,13 +989,13 @@ class ConversationChain:
             is_fully_complete = (self.conversation.current_agent_index >= len(self.agents)) or (total_agents_executed >= len(self.agents))
             
             if is_fully_complete:
-                logging.info(f"🎯 LOOP COMPLETED: All {total_agents_executed} agents executed successfully")
+                logging.info("🎯 LOOP COMPLETED: All %s agents executed successfully", total_agents_executed)
                 loop_status = "completed"
                 
                 # **🚀 CRITICAL ADDITION: Auto-generate deliverable when loop completes**
                 try:
                     deliverable_result = self._generate_conversation_deliverable()
-                    logging.info(f"✅ DELIVERABLE GENERATED: {deliverable_result.get('filename', 'Unknown')} ({deliverable_result.get('file_size', 'Unknown size')})")
+                    logging.info("✅ DELIVERABLE GENERATED: %s (%s)", deliverable_result.get('filename', 'Unknown'), deliverable_result.get('file_size', 'Unknown size'))
                     
                     # Add deliverable info to loop results
                     loop_results.append({
@@ -967,14 +1007,14 @@ class ConversationChain:
                     })
                     
                 except Exception as e:
-                    logging.error(f"❌ DELIVERABLE GENERATION FAILED: {str(e)}")
+                    logging.error("❌ DELIVERABLE GENERATION FAILED: %s", e)
                     loop_results.append({
                         "agent_name": "DeliverableGenerator", 
                         "deliverable_created": False,
                         "error": str(e)
                     })
             else:
-                logging.warning(f"⚠️ LOOP INCOMPLETE: Only {total_agents_executed}/{len(self.agents)} agents executed")
+                logging.warning("⚠️ LOOP INCOMPLETE: Only %s/%s agents executed", total_agents_executed, len(self.agents))
                 loop_status = "incomplete"
                 
             # Send completion notification
@@ -1004,7 +1044,7 @@ class ConversationChain:
             }
             
         except Exception as e:
-            logging.error(f"💥 LOOP EXECUTION FAILED: {str(e)}")
+            logging.error("💥 LOOP EXECUTION FAILED: %s", e)
             
             # Send failure notification
             from notifications import notification_manager, NotificationLevel
@@ -1038,8 +1078,7 @@ class ConversationChain:
     
     def get_conversation_history(self):
         """Get all conversation entries for this conversation"""
-        entries = self.conversation.entries.order_by(ConversationEntry.created_at).all()
-        return [entry.to_dict() for entry in entries]
+        return [entry.to_dict() for entry in self.conversation.entries]
     
     @property
     def is_complete(self):
@@ -1083,12 +1122,12 @@ class ConversationChain:
             generator = DeliverableGenerator()
             result = generator.create_comprehensive_package(deliverable_data)
             
-            logging.info(f"📦 DELIVERABLE PACKAGE CREATED: {result.get('filename')} ({result.get('file_size')})")
+            logging.info("📦 DELIVERABLE PACKAGE CREATED: %s (%s)", result.get('filename'), result.get('file_size'))
             
             return result
             
         except Exception as e:
-            logging.error(f"Error generating conversation deliverable: {str(e)}")
+            logging.error("Error generating conversation deliverable: %s", e)
             raise
 
 @app.route('/test_drone_business.html')
@@ -1128,7 +1167,7 @@ def health_check():
         }), 200
     
     except Exception as e:
-        logging.error(f"Health check failed: {str(e)}")
+        logging.error("Health check failed: %s", e)
         return jsonify({
             "status": "unhealthy",
             "timestamp": datetime.utcnow().isoformat(),
@@ -1153,7 +1192,7 @@ def download_deliverable(filename):
         return send_file(str(file_path), as_attachment=True, download_name=filename)
         
     except Exception as e:
-        logging.error(f"Error downloading file {filename}: {str(e)}")
+        logging.error("Error downloading file %s: %s", filename, e)
         return "Download failed", 500
 
 @app.route('/start_conversation', methods=['POST'])
@@ -1176,7 +1215,7 @@ def start_conversation():
         
         # Initialize session if needed
         if 'session_id' not in session:
-            session['session_id'] = str(uuid.uuid4())
+            session['session_id'] = new_uuid()
             session['created_at'] = datetime.utcnow().isoformat()
             session['conversation_count'] = 0
         
@@ -1191,7 +1230,7 @@ def start_conversation():
         # Create new conversation chain with enhanced database storage
         chain = ConversationChain.create_new(
             input_text,
-            session_id=session.get('session_id', str(uuid.uuid4())),
+            session_id=session.get('session_id') or new_uuid(),
             user_ip=request.remote_addr
         )
         
@@ -1203,7 +1242,7 @@ def start_conversation():
         session['session_id'] = chain.conversation.session_id
         session.permanent = True
         
-        logging.info(f"New conversation started: {chain.conversation.id} by {request.remote_addr}")
+        logging.info("New conversation started: %s by %s", chain.conversation.id, request.remote_addr)
         
         return jsonify({
             "success": True,
@@ -1220,7 +1259,7 @@ def start_conversation():
         })
         
     except Exception as e:
-        logging.error(f"Error starting conversation: {str(e)}")
+        logging.error("Error starting conversation: %s", e)
         return jsonify({"error": "An internal error occurred. Please try again."}), 500
 
 @app.route('/csuite_agents', methods=['GET'])
@@ -1280,7 +1319,7 @@ def continue_conversation():
     try:
         # Initialize session if needed
         if 'session_id' not in session:
-            session['session_id'] = str(uuid.uuid4())
+            session['session_id'] = new_uuid()
             session['created_at'] = datetime.utcnow().isoformat()
             session['conversation_count'] = 0
         
@@ -1317,7 +1356,7 @@ def continue_conversation():
         # Process with next agent
         result = chain.process_input(next_question)
         
-        logging.info(f"Conversation continued: {conversation_id}, agent: {result['agent']}")
+        logging.info("Conversation continued: %s, agent: %s", conversation_id, result['agent'])
         
         return jsonify({
             "success": True,
@@ -1327,7 +1366,7 @@ def continue_conversation():
         })
         
     except Exception as e:
-        logging.error(f"Error continuing conversation: {str(e)}")
+        logging.error("Error continuing conversation: %s", e)
         return jsonify({"error": "An internal error occurred. Please try again."}), 500
 
 @app.route('/get_conversation_history')
@@ -1357,7 +1396,7 @@ def get_conversation_history():
         })
         
     except Exception as e:
-        logging.error(f"Error getting conversation history: {str(e)}")
+        logging.error("Error getting conversation history: %s", e)
         return jsonify({"error": str(e)}), 500
 
 @app.route('/submit_feedback', methods=['POST'])
@@ -1392,7 +1431,7 @@ def submit_feedback():
             return jsonify({'success': False, 'error': 'Failed to submit feedback'}), 500
             
     except Exception as e:
-        logging.error(f"Error submitting feedback: {str(e)}")
+        logging.error("Error submitting feedback: %s", e)
         return jsonify({'success': False, 'error': 'Internal server error'}), 500
 
 @app.route('/execute_full_loop', methods=['POST'])
@@ -1408,7 +1447,7 @@ def execute_full_loop():
         
         # Initialize session if needed
         if 'session_id' not in session:
-            session['session_id'] = str(uuid.uuid4())
+            session['session_id'] = new_uuid()
             session['created_at'] = datetime.utcnow().isoformat()
             session['conversation_count'] = 0
         
@@ -1450,7 +1489,7 @@ def execute_full_loop():
         })
         
     except Exception as e:
-        logging.error(f"Error executing full loop: {str(e)}")
+        logging.error("Error executing full loop: %s", e)
         return jsonify({"error": "An internal error occurred during loop execution"}), 500
 
 @app.route('/api/execute_full_loop', methods=['POST'])
@@ -1476,7 +1515,7 @@ def api_execute_full_loop():
         input_text = InputValidator.sanitize_html(input_text)
         
         # Create temporary session for API calls
-        temp_session_id = str(uuid.uuid4())
+        temp_session_id = new_uuid()
         
         # Create new conversation chain with extended mode support
         chain = ConversationChain.create_new(
@@ -1497,7 +1536,7 @@ def api_execute_full_loop():
         })
         
     except Exception as e:
-        logging.error(f"Error in API execute_full_loop: {str(e)}")
+        logging.error("Error in API execute_full_loop: %s", e)
         return jsonify({"error": f"Full loop execution failed: {str(e)}"}), 500
 
 @app.route('/reset_conversation', methods=['POST'])
@@ -1513,7 +1552,7 @@ def reset_conversation():
         return jsonify({"success": True, "message": "Conversation reset successfully"})
         
     except Exception as e:
-        logging.error(f"Error resetting conversation: {str(e)}")
+        logging.error("Error resetting conversation: %s", e)
         return jsonify({"error": str(e)}), 500
 
 # Stripe webhook endpoint
@@ -1533,11 +1572,11 @@ def stripe_webhook():
         if result['success']:
             return jsonify({'status': 'success'}), 200
         else:
-            logging.error(f"Webhook processing failed: {result.get('error')}")
+            logging.error("Webhook processing failed: %s", result.get('error'))
             return jsonify({'status': 'error', 'message': result.get('error')}), 400
             
     except Exception as e:
-        logging.error(f"Error processing Stripe webhook: {str(e)}")
+        logging.error("Error processing Stripe webhook: %s", e)
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
 @app.route('/list_conversations')
@@ -1553,30 +1592,35 @@ def list_conversations():
         # Get search query if provided
         search_query = request.args.get('search', '').strip()
         
-        # Build query
-        query = Conversation.query
+        # Read plain rows (no ORM hydration)
+        query = select(
+            Conversation.id,
+            Conversation.initial_preview,
+            Conversation.created_at,
+            Conversation.updated_at,
+            Conversation.is_complete,
+            Conversation.entry_count
+        )
         
         if search_query:
             # Search in initial_input field
             search_pattern = f"%{search_query}%"
-            query = query.filter(Conversation.initial_input.ilike(search_pattern))
+            query = query.where(Conversation.initial_input.ilike(search_pattern))
         
-        conversations = query.order_by(Conversation.created_at.desc()).limit(50).all()
+        rows = db.session.execute(query.order_by(Conversation.created_at.desc()).limit(50)).all()
         
         conversation_list = []
-        for conv in conversations:
-            # Safely truncate and sanitize initial input
-            initial_input = InputValidator.sanitize_html(conv.initial_input)
-            if len(initial_input) > 100:
-                initial_input = initial_input[:100] + "..."
+        for row in rows:
+            # Sanitize the stored (already truncated) preview
+            initial_input = InputValidator.sanitize_html(row.initial_preview)
             
             conversation_list.append({
-                "id": conv.id,
+                "id": row.id,
                 "initial_input": initial_input,
-                "created_at": conv.created_at.isoformat(),
-                "updated_at": conv.updated_at.isoformat(),
-                "is_complete": conv.is_complete,
-                "entry_count": conv.entries.count()
+                "created_at": row.created_at,
+                "updated_at": row.updated_at,
+                "is_complete": row.is_complete,
+                "entry_count": row.entry_count
             })
         
         return jsonify({
@@ -1586,7 +1630,7 @@ def list_conversations():
         })
         
     except Exception as e:
-        logging.error(f"Error listing conversations: {str(e)}")
+        logging.error("Error listing conversations: %s", e)
         return jsonify({"error": "Failed to load conversations"}), 500
 
 @app.route('/load_conversation/<conversation_id>')
@@ -1604,7 +1648,7 @@ def load_conversation(conversation_id):
             session.clear()
             return jsonify({"error": "Session data invalid, please refresh"}), 400
         
-        conversation = Conversation.query.get(conversation_id)
+        conversation = db.session.get(Conversation, conversation_id)
         if not conversation:
             return jsonify({"error": "Conversation not found"}), 404
         
@@ -1612,21 +1656,20 @@ def load_conversation(conversation_id):
         session['conversation_id'] = conversation_id
         session.permanent = True
         
-        # Get conversation history
-        chain = ConversationChain(conversation_id)
-        history = chain.get_conversation_history()
+        # Conversation history is the serialized entry list
+        conversation_data = conversation_to_dict(conversation)
         
-        logging.info(f"Conversation loaded: {conversation_id}")
+        logging.info("Conversation loaded: %s", conversation_id)
         
         return jsonify({
             "success": True,
-            "conversation": conversation.to_dict(),
-            "history": history,
-            "is_complete": chain.is_complete
+            "conversation": conversation_data,
+            "history": conversation_data['entries'],
+            "is_complete": conversation.is_complete
         })
         
     except Exception as e:
-        logging.error(f"Error loading conversation: {str(e)}")
+        logging.error("Error loading conversation: %s", e)
         return jsonify({"error": "Failed to load conversation"}), 500
 
 @app.route('/export_conversation/<conversation_id>')
@@ -1644,7 +1687,7 @@ def export_conversation(conversation_id):
             session.clear()
             return jsonify({"error": "Session data invalid, please refresh"}), 400
         
-        conversation = Conversation.query.get(conversation_id)
+        conversation = db.session.get(Conversation, conversation_id)
         if not conversation:
             return jsonify({"error": "Conversation not found"}), 404
         
@@ -1667,16 +1710,16 @@ Initial Input:
 """
         
         for i, entry in enumerate(history, 1):
-            export_content += f"""Step {i}: {entry['agent']} ({entry['role']})
-Time: {entry['timestamp']}
+            export_content += f"""Step {i}: {entry['agent_name']} ({entry['agent_role']})
+Time: {entry['created_at'].strftime('%Y-%m-%d %H:%M:%S UTC')}
 
 Input:
-{entry['input']}
+{entry['input_text']}
 
 Response:
-{entry['response']}
+{entry['response_text']}
 
-Next Question: {entry.get('next_question', 'N/A')}
+Next Question: {entry['next_question'] or 'N/A'}
 
 {'-'*60}
 
@@ -1694,19 +1737,23 @@ Next Question: {entry.get('next_question', 'N/A')}
             }
         )
         
-        logging.info(f"Conversation exported: {conversation_id}")
+        logging.info("Conversation exported: %s", conversation_id)
         
         return response
         
     except Exception as e:
-        logging.error(f"Error exporting conversation: {str(e)}")
+        logging.error("Error exporting conversation: %s", e)
         return jsonify({"error": "Failed to export conversation"}), 500
 
 # Security and error handling middleware
 @app.before_request
 def security_headers():
     """Add security headers to all responses"""
-    g.start_time = datetime.utcnow()
+    g.start_time = time.perf_counter()
+    
+    # Reject oversized JSON bodies before they are parsed
+    if request.is_json and (request.content_length or 0) > app.config['MAX_JSON_CONTENT_LENGTH']:
+        abort(413)
 
 @app.after_request
 def after_request(response):
@@ -1720,9 +1767,9 @@ def after_request(response):
     
     # Log request duration
     if hasattr(g, 'start_time'):
-        duration = (datetime.utcnow() - g.start_time).total_seconds()
+        duration = time.perf_counter() - g.start_time
         if duration > 5:  # Log slow requests
-            logging.warning(f"Slow request: {request.endpoint} took {duration:.2f}s")
+            logging.warning("Slow request: %s took %.2fs", request.endpoint, duration)
     
     return response
 
@@ -1738,7 +1785,7 @@ def not_found(error):
 def internal_error(error):
     """Handle 500 errors"""
     db.session.rollback()
-    logging.error(f"Internal server error: {str(error)}")
+    logging.error("Internal server error: %s", error)
     if request.path.startswith('/api/') or request.is_json:
         return jsonify({"error": "An internal error occurred"}), 500
     return render_template('index.html'), 500
@@ -1768,20 +1815,31 @@ def flow_platform():
 def activate_operatoros():
     """Activate OperatorOS Master Agent system"""
     try:
-        activation_message = operatoros_master.activate_operatoros()
+        activation_message = get_master().activate_operatoros()
         
         return jsonify({
             "success": True,
             "message": activation_message,
             "system_status": "activated",
-            "available_agents": list(operatoros_master.agents.keys()),
-            "metrics": operatoros_master.get_autonomy_metrics()
+            "available_agents": list(get_master().agents.keys()),
+            "metrics": get_master().get_autonomy_metrics()
         })
         
     except Exception as e:
-        logging.error(f"Error activating OperatorOS: {str(e)}")
+        logging.error("Error activating OperatorOS: %s", e)
         return jsonify({"error": f"OperatorOS activation failed: {str(e)}"}), 500
 
+def save_operatoros_conversation(conversation_id, initial_input, is_complete=True):
+    """Insert or update the Conversation row an OperatorOS response is recorded under"""
+    db.session.merge(Conversation(
+        id=conversation_id,
+        initial_input=initial_input,
+        current_agent_index=0,
+        is_complete=is_complete,
+        session_id=session.get('session_id'),
+        user_ip=get_remote_address()
+    ))
+
 @app.route('/api/operatoros/daily-briefing', methods=['POST'])
 @limiter.limit("10 per minute")
 @csrf.exempt
@@ -1790,54 +1848,56 @@ def daily_autonomy_briefing():
     try:
         data = request.get_json() or {}
         user_input = data.get('input', '')
+        conversation_id = new_uuid()
         
-        # Generate daily briefing
-        result = operatoros_master.daily_autonomy_briefing(user_input)
-        
-        if result['success']:
-            # Create conversation record
-            conversation_id = str(uuid.uuid4())
-            conversation = Conversation(
-                id=conversation_id,
-                initial_input=user_input or "Daily autonomy briefing",
-                current_agent_index=0,
-                is_complete=True,
-                session_id=session.get('session_id'),
-                user_ip=get_remote_address()
-            )
-            db.session.add(conversation)
+        def build_payload(result):
+            # Create conversation record, or complete the one a stream started
+            save_operatoros_conversation(conversation_id, user_input or "Daily autonomy briefing")
             
             entry = ConversationEntry(
                 conversation_id=conversation_id,
                 agent_name="OperatorOS Master",
                 agent_role="Master Life Operating System Agent",
                 input_text=user_input or "Daily briefing request",
-                response_text=result['response'],
+                response_text=result.response,
                 processing_time_seconds=0.5,
-                tokens_used=result.get('tokens_used', 0),
-                model_used="gpt-3.5-turbo",
+                tokens_used=result.tokens_used,
+                model_used=get_master().call_model('briefing'),
                 api_provider="openai",
-                response_length=len(result['response']),
                 error_occurred=False
             )
             db.session.add(entry)
             db.session.commit()
             
-            session['current_conversation_id'] = conversation_id
-            
-            return jsonify({
+            return {
                 "success": True,
                 "conversation_id": conversation_id,
-                "briefing": result['response'],
-                "tokens_used": result.get('tokens_used', 0),
+                "briefing": result.response,
+                "tokens_used": result.tokens_used,
                 "type": "daily_briefing",
-                "metrics": operatoros_master.get_autonomy_metrics()
-            })
+                "metrics": get_master().get_autonomy_metrics()
+            }
+        
+        if wants_ndjson_stream():
+            # The session is saved before a streamed body is generated, so record the id up front
+            # against a row that exists even if the stream fails
+            save_operatoros_conversation(conversation_id, user_input or "Daily autonomy briefing", is_complete=False)
+            db.session.commit()
+            session['current_conversation_id'] = conversation_id
+            return stream_events_response(get_master().stream_daily_autonomy_briefing(user_input), build_payload)
+        
+        # Generate daily briefing
+        result = get_master().daily_autonomy_briefing(user_input)
+        
+        if result.success:
+            payload = build_payload(result)
+            session['current_conversation_id'] = conversation_id
+            return jsonify(payload)
         else:
-            return jsonify({"error": result.get('error', 'Briefing generation failed')}), 500
+            return jsonify({"error": result.error or 'Briefing generation failed'}), 500
         
     except Exception as e:
-        logging.error(f"Error generating daily briefing: {str(e)}")
+        logging.error("Error generating daily briefing: %s", e)
         return jsonify({"error": f"Daily briefing failed: {str(e)}"}), 500
 
 @app.route('/api/dashboard', methods=['POST'])
@@ -1873,7 +1933,7 @@ def dashboard_endpoint():
             return jsonify({"error": "Use '@all dashboard' command to generate executive dashboard"}), 400
         
     except Exception as e:
-        logging.error(f"Error generating dashboard: {str(e)}")
+        logging.error("Error generating dashboard: %s", e)
         return jsonify({"error": f"Dashboard generation error: {str(e)}"}), 500
 
 @app.route('/api/operatoros/agent', methods=['POST'])
@@ -1891,59 +1951,62 @@ def operatoros_agent_consultation():
         # Get user session for dynamic agents
         user_session = session.get('session_id')
         if not user_session:
-            session['session_id'] = str(uuid.uuid4())
+            session['session_id'] = new_uuid()
             user_session = session['session_id']
         
-        # Route to appropriate agent (now supports dynamic agents)
-        result = operatoros_master.route_to_agent(input_text, user_session)
+        conversation_id = new_uuid()
         
-        if result['success']:
-            # Create conversation record
-            conversation_id = str(uuid.uuid4())
-            conversation = Conversation(
-                id=conversation_id,
-                initial_input=input_text,
-                current_agent_index=0,
-                is_complete=True,
-                session_id=session.get('session_id'),
-                user_ip=get_remote_address()
-            )
-            db.session.add(conversation)
+        def build_payload(result):
+            # Create conversation record, or complete the one a stream started
+            save_operatoros_conversation(conversation_id, input_text)
             
-            agent_name = result.get('agent', 'OperatorOS Agent')
+            agent_name = result.agent or 'OperatorOS Agent'
             entry = ConversationEntry(
                 conversation_id=conversation_id,
                 agent_name=agent_name,
                 agent_role=f"OperatorOS {agent_name}",
                 input_text=input_text,
-                response_text=result['response'],
+                response_text=result.response,
                 processing_time_seconds=0.5,
-                tokens_used=result.get('tokens_used', 0),
-                model_used="gpt-3.5-turbo",
+                tokens_used=result.tokens_used,
+                model_used=get_master().call_model('agent'),
                 api_provider="openai",
-                response_length=len(result['response']),
                 error_occurred=False
             )
             db.session.add(entry)
             db.session.commit()
             
-            session['current_conversation_id'] = conversation_id
-            
-            return jsonify({
+            return {
                 "success": True,
                 "conversation_id": conversation_id,
-                "agent": result.get('agent'),
-                "response": result['response'],
-                "tokens_used": result.get('tokens_used', 0),
-                "type": result.get('type', 'agent_response'),
-                "metrics": operatoros_master.get_autonomy_metrics(),
-                "agent_data": result.get('agent_data', {})  # For dynamic agent creation
-            })
+                "agent": result.agent,
+                "response": result.response,
+                "tokens_used": result.tokens_used,
+                "type": result.type or 'agent_response',
+                "metrics": get_master().get_autonomy_metrics(),
+                "agent_data": result.agent_data or {}  # For dynamic agent creation
+            }
+        
+        if wants_ndjson_stream():
+            # The session is saved before a streamed body is generated, so record the id up front
+            # against a row that exists even if the stream fails
+            save_operatoros_conversation(conversation_id, input_text, is_complete=False)
+            db.session.commit()
+            session['current_conversation_id'] = conversation_id
+            return stream_events_response(get_master().stream_route_to_agent(input_text, user_session), build_payload)
+        
+        # Route to appropriate agent (now supports dynamic agents)
+        result = get_master().route_to_agent(input_text, user_session)
+        
+        if result.success:
+            payload = build_payload(result)
+            session['current_conversation_id'] = conversation_id
+            return jsonify(payload)
         else:
-            return jsonify({"error": result.get('error', 'Agent consultation failed')}), 500
+            return jsonify({"error": result.error or 'Agent consultation failed'}), 500
         
     except Exception as e:
-        logging.error(f"Error in agent consultation: {str(e)}")
+        logging.error("Error in agent consultation: %s", e)
         return jsonify({"error": f"Agent consultation failed: {str(e)}"}), 500
 
 @app.route('/api/operatoros/multi-agent', methods=['POST'])
@@ -1958,53 +2021,56 @@ def operatoros_multi_agent_analysis():
         
         input_text = data['input'].strip()
         
-        # Generate cross-agent analysis
-        result = operatoros_master.cross_agent_analysis(input_text)
+        conversation_id = new_uuid()
         
-        if result['success']:
-            # Create conversation record
-            conversation_id = str(uuid.uuid4())
-            conversation = Conversation(
-                id=conversation_id,
-                initial_input=input_text,
-                current_agent_index=0,
-                is_complete=True,
-                session_id=session.get('session_id'),
-                user_ip=get_remote_address()
-            )
-            db.session.add(conversation)
+        def build_payload(result):
+            # Create conversation record, or complete the one a stream started
+            save_operatoros_conversation(conversation_id, input_text)
             
             entry = ConversationEntry(
                 conversation_id=conversation_id,
                 agent_name="OperatorOS Multi-Agent",
                 agent_role="Collaborative C-Suite Analysis",
                 input_text=input_text,
-                response_text=result['response'],
+                response_text=result.response,
                 processing_time_seconds=1.0,
-                tokens_used=result.get('tokens_used', 0),
-                model_used="gpt-3.5-turbo",
+                tokens_used=result.tokens_used,
+                model_used=get_master().call_model('multi'),
                 api_provider="openai",
-                response_length=len(result['response']),
                 error_occurred=False
             )
             db.session.add(entry)
             db.session.commit()
             
-            session['current_conversation_id'] = conversation_id
-            
-            return jsonify({
+            return {
                 "success": True,
                 "conversation_id": conversation_id,
-                "analysis": result['response'],
-                "tokens_used": result.get('tokens_used', 0),
+                "analysis": result.response,
+                "tokens_used": result.tokens_used,
                 "type": "multi_agent_analysis",
-                "metrics": operatoros_master.get_autonomy_metrics()
-            })
+                "metrics": get_master().get_autonomy_metrics()
+            }
+        
+        if wants_ndjson_stream():
+            # The session is saved before a streamed body is generated, so record the id up front
+            # against a row that exists even if the stream fails
+            save_operatoros_conversation(conversation_id, input_text, is_complete=False)
+            db.session.commit()
+            session['current_conversation_id'] = conversation_id
+            return stream_events_response(get_master().stream_cross_agent_analysis(input_text), build_payload)
+        
+        # Generate cross-agent analysis
+        result = get_master().cross_agent_analysis(input_text)
+        
+        if result.success:
+            payload = build_payload(result)
+            session['current_conversation_id'] = conversation_id
+            return jsonify(payload)
         else:
-            return jsonify({"error": result.get('error', 'Multi-agent analysis failed')}), 500
+            return jsonify({"error": result.error or 'Multi-agent analysis failed'}), 500
         
     except Exception as e:
-        logging.error(f"Error in multi-agent analysis: {str(e)}")
+        logging.error("Error in multi-agent analysis: %s", e)
         return jsonify({"error": f"Multi-agent analysis failed: {str(e)}"}), 500
 
 @app.route('/api/operatoros/metrics', methods=['GET'])
@@ -2012,14 +2078,14 @@ def operatoros_multi_agent_analysis():
 def operatoros_metrics():
     """Get current OperatorOS autonomy metrics"""
     try:
-        metrics = operatoros_master.get_autonomy_metrics()
+        metrics = get_master().get_autonomy_metrics()
         return jsonify({
             "success": True,
             "metrics": metrics
         })
         
     except Exception as e:
-        logging.error(f"Error getting OperatorOS metrics: {str(e)}")
+        logging.error("Error getting OperatorOS metrics: %s", e)
         return jsonify({"error": f"Metrics retrieval failed: {str(e)}"}), 500
 
 # Dynamic Agent Creation API Endpoints
@@ -2033,20 +2099,20 @@ def create_dynamic_agent():
         if not data or 'command' not in data:
             return jsonify({"error": "Agent creation command is required"}), 400
         
-        command = data['command'].strip()
+        command = fast_strip(data['command'])
         
         # Get user session
         user_session = session.get('session_id')
         if not user_session:
-            session['session_id'] = str(uuid.uuid4())
+            session['session_id'] = new_uuid()
             user_session = session['session_id']
         
         # Create dynamic agent
-        result = operatoros_master.create_dynamic_agent(command, user_session)
+        result = get_master().create_dynamic_agent(command, user_session)
         
         # Create conversation record if successful
-        if result['success']:
-            conversation_id = str(uuid.uuid4())
+        if result.success:
+            conversation_id = new_uuid()
             conversation = Conversation(
                 id=conversation_id,
                 initial_input=command,
@@ -2062,12 +2128,11 @@ def create_dynamic_agent():
                 agent_name="Dynamic Agent Creator",
                 agent_role="Agent Creation System",
                 input_text=command,
-                response_text=result['response'],
+                response_text=result.response,
                 processing_time_seconds=0.3,
                 tokens_used=0,
                 model_used="system",
                 api_provider="internal",
-                response_length=len(result['response']),
                 error_occurred=False
             )
             db.session.add(entry)
@@ -2076,17 +2141,45 @@ def create_dynamic_agent():
             session['current_conversation_id'] = conversation_id
         
         return jsonify({
-            "success": result['success'],
-            "response": result['response'],
-            "type": result['type'],
-            "agent_data": result.get('agent_data', {}),
-            "conversation_id": conversation_id if result['success'] else None
+            "success": result.success,
+            "response": result.response,
+            "type": result.type,
+            "agent_data": result.agent_data or {},
+            "conversation_id": conversation_id if result.success else None
         })
         
     except Exception as e:
-        logging.error(f"Error creating dynamic agent: {str(e)}")
+        logging.error("Error creating dynamic agent: %s", e)
         return jsonify({"error": f"Agent creation failed: {str(e)}"}), 500
 
+# Built-in C-Suite roster (static for the lifetime of the process)
+BUILT_IN_AGENTS = [
+    {"code": "CFO", "name": "Chief Financial Officer", "icon": "💰"},
+    {"code": "COO", "name": "Chief Operating Officer", "icon": "⚙️"},
+    {"code": "CSA", "name": "Chief Strategy Agent", "icon": "🎯"},
+    {"code": "CMO", "name": "Chief Marketing Officer", "icon": "🎨"},
+    {"code": "CTO", "name": "Chief Technology Officer", "icon": "💻"},
+    {"code": "CPO", "name": "Chief People Officer", "icon": "🌱"},
+    {"code": "CIO", "name": "Chief Intelligence Officer", "icon": "🧠"}
+]
+
+def cacheable_json(payload, public=False, max_age=60):
+    """
+    Build a JSON response with a strong ETag so repeat requests get a 304
+    
+    Public responses may be cached for max_age seconds by browsers and proxies;
+    per-user responses are private and revalidated on every request.
+    """
+    response = jsonify(payload)
+    response.add_etag()
+    if public:
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+    else:
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
 @app.route('/api/agents/list', methods=['GET'])
 @limiter.limit("20 per minute")
 def list_user_agents():
@@ -2094,19 +2187,11 @@ def list_user_agents():
     try:
         user_session = session.get('session_id')
         if not user_session:
-            return jsonify({
+            return cacheable_json({
                 "success": True,
                 "agents": [],
-                "built_in_agents": [
-                    {"code": "CFO", "name": "Chief Financial Officer", "icon": "💰"},
-                    {"code": "COO", "name": "Chief Operating Officer", "icon": "⚙️"},
-                    {"code": "CSA", "name": "Chief Strategy Agent", "icon": "🎯"},
-                    {"code": "CMO", "name": "Chief Marketing Officer", "icon": "🎨"},
-                    {"code": "CTO", "name": "Chief Technology Officer", "icon": "💻"},
-                    {"code": "CPO", "name": "Chief People Officer", "icon": "🌱"},
-                    {"code": "CIO", "name": "Chief Intelligence Officer", "icon": "🧠"}
-                ]
-            })
+                "built_in_agents": BUILT_IN_AGENTS
+            }, public=True)
         
         # Get user's dynamic agents
         from models import DynamicAgent
@@ -2117,22 +2202,14 @@ def list_user_agents():
         
         agent_list = [agent.to_dict() for agent in agents]
         
-        return jsonify({
+        return cacheable_json({
             "success": True,
             "agents": agent_list,
-            "built_in_agents": [
-                {"code": "CFO", "name": "Chief Financial Officer", "icon": "💰"},
-                {"code": "COO", "name": "Chief Operating Officer", "icon": "⚙️"},
-                {"code": "CSA", "name": "Chief Strategy Agent", "icon": "🎯"},
-                {"code": "CMO", "name": "Chief Marketing Officer", "icon": "🎨"},
-                {"code": "CTO", "name": "Chief Technology Officer", "icon": "💻"},
-                {"code": "CPO", "name": "Chief People Officer", "icon": "🌱"},
-                {"code": "CIO", "name": "Chief Intelligence Officer", "icon": "🧠"}
-            ]
+            "built_in_agents": BUILT_IN_AGENTS
         })
         
     except Exception as e:
-        logging.error(f"Error listing agents: {str(e)}")
+        logging.error("Error listing agents: %s", e)
         return jsonify({"error": f"Failed to list agents: {str(e)}"}), 500
 
 @app.route('/api/agents/retire/<agent_code>', methods=['POST'])
@@ -2146,8 +2223,7 @@ def retire_dynamic_agent(agent_code):
             return jsonify({"error": "User session not found"}), 400
         
         # Retire the agent
-        from dynamic_agent_creator import DynamicAgentCreator
-        creator = DynamicAgentCreator()
+        creator = get_agent_creator()
         result = creator.retire_agent(user_session, agent_code)
         
         return jsonify({
@@ -2156,7 +2232,7 @@ def retire_dynamic_agent(agent_code):
         })
         
     except Exception as e:
-        logging.error(f"Error retiring agent: {str(e)}")
+        logging.error("Error retiring agent: %s", e)
         return jsonify({"error": f"Agent retirement failed: {str(e)}"}), 500
 
 @app.route('/api/agents/modify/<agent_code>', methods=['POST'])
@@ -2173,11 +2249,10 @@ def modify_dynamic_agent(agent_code):
         if not user_session:
             return jsonify({"error": "User session not found"}), 400
         
-        new_function = data['new_function'].strip()
+        new_function = fast_strip(data['new_function'])
         
         # Modify the agent
-        from dynamic_agent_creator import DynamicAgentCreator
-        creator = DynamicAgentCreator()
+        creator = get_agent_creator()
         result = creator.modify_agent(user_session, agent_code, new_function)
         
         return jsonify({
@@ -2186,7 +2261,7 @@ def modify_dynamic_agent(agent_code):
         })
         
     except Exception as e:
-        logging.error(f"Error modifying agent: {str(e)}")
+        logging.error("Error modifying agent: %s", e)
         return jsonify({"error": f"Agent modification failed: {str(e)}"}), 500
 
 @app.route('/operatoros')
@@ -2203,28 +2278,28 @@ def generate_personal_flow():
         
         # Validate input
         energy = data.get('energy')
-        priority = data.get('priority', '').strip()
-        open_loops = data.get('open_loops', '').strip()
+        priority = fast_strip(data.get('priority', ''))
+        open_loops = fast_strip(data.get('open_loops', ''))
         
         if not energy or not priority:
             return jsonify({"success": False, "error": "Energy level and priority are required"}), 400
         
         # Generate user ID if not in session
         if 'user_id' not in session:
-            session['user_id'] = str(uuid.uuid4())
+            session['user_id'] = new_uuid()
         
         user_id = session['user_id']
-        start_time = datetime.utcnow()
+        start_time = time.perf_counter()
         
         # Generate flow plan using Flow Agent
         result = flow_agent_manager.generate_personal_flow(energy, priority, open_loops)
         
-        processing_time = (datetime.utcnow() - start_time).total_seconds()
+        processing_time = time.perf_counter() - start_time
         
         # Save session to database
         from models import FlowSession
         flow_session = FlowSession(
-            id=str(uuid.uuid4()),
+            id=new_uuid(),
             user_id=user_id,
             mode='personal',
             input_data={
@@ -2240,22 +2315,39 @@ def generate_personal_flow():
             processing_time=processing_time,
             success=result.get('success', True)
         )
+        flow_session_id = flow_session.id
         
-        db.session.add(flow_session)
-        db.session.commit()
+        # Analytics only: committed in the background off the response path
+        analytics_writer.submit(flow_session)
         
         return jsonify({
             "success": True,
             "response": result.get('response'),
             "processing_time": processing_time,
             "tokens_used": result.get('tokens_used', 0),
-            "session_id": flow_session.id
+            "session_id": flow_session_id
         })
         
     except Exception as e:
-        logging.error(f"Error generating personal flow: {str(e)}")
+        logging.error("Error generating personal flow: %s", e)
         return jsonify({"success": False, "error": str(e)}), 500
 
+@app.route('/api/flow/stats', methods=['GET'])
+@limiter.limit("30 per minute")
+def get_flow_stats():
+    """Get the current user's per-day flow statistics"""
+    try:
+        days = min(request.args.get('days', 30, type=int), 365)
+        user_id = session.get('user_id')
+        
+        stats = DatabaseManager.get_user_daily_stats(user_id, days) if user_id else []
+        
+        return jsonify({"success": True, "days": days, "stats": stats})
+        
+    except Exception as e:
+        logging.error("Error getting flow stats: %s", e)
+        return jsonify({"success": False, "error": "Failed to get flow stats"}), 500
+
 @app.route('/api/flow/project/build', methods=['POST'])
 @limiter.limit("5 per minute")
 def build_project_strategy():
@@ -2264,28 +2356,28 @@ def build_project_strategy():
         data = request.get_json()
         
         # Validate input
-        vision = data.get('vision', '').strip()
-        project_type = data.get('type', '').strip()
+        vision = fast_strip(data.get('vision', ''))
+        project_type = fast_strip(data.get('type', ''))
         
         if not vision or not project_type:
             return jsonify({"success": False, "error": "Project vision and type are required"}), 400
         
         # Generate user ID if not in session
         if 'user_id' not in session:
-            session['user_id'] = str(uuid.uuid4())
+            session['user_id'] = new_uuid()
         
         user_id = session['user_id']
-        start_time = datetime.utcnow()
+        start_time = time.perf_counter()
         
         # Build project strategy using Project Agent pipeline
         result = flow_agent_manager.build_project_strategy(vision, project_type)
         
-        processing_time = (datetime.utcnow() - start_time).total_seconds()
+        processing_time = time.perf_counter() - start_time
         
         # Save session to database
         from models import FlowSession, Project
         flow_session = FlowSession(
-            id=str(uuid.uuid4()),
+            id=new_uuid(),
             user_id=user_id,
             mode='project',
             input_data={
@@ -2302,10 +2394,12 @@ def build_project_strategy():
             processing_time=processing_time,
             success=result.get('success', True)
         )
+        flow_session_id = flow_session.id
         
-        db.session.add(flow_session)
+        # Analytics only: committed in the background off the response path
+        analytics_writer.submit(flow_session)
         
-        # Save as project record
+        # Save as project record (stays synchronous; the client needs its id)
         project = Project(
             user_id=user_id,
             project_name=vision[:100] + '...' if len(vision) > 100 else vision,
@@ -2322,17 +2416,50 @@ def build_project_strategy():
             "strategy": result.get('strategy'),
             "processing_time": processing_time,
             "tokens_used": result.get('tokens_used', 0),
-            "session_id": flow_session.id,
+            "session_id": flow_session_id,
             "project_id": project.id
         })
         
     except Exception as e:
-        logging.error(f"Error building project strategy: {str(e)}")
+        logging.error("Error building project strategy: %s", e)
         return jsonify({"success": False, "error": str(e)}), 500
 
 
 
 # Universal Business Intelligence API Endpoints
+def wants_ndjson_stream():
+    """Check whether the client asked for incremental NDJSON progress instead of one JSON body"""
+    return request.accept_mimetypes.best == 'application/x-ndjson'
+
+def stream_pipeline_response(chain, input_text, build_payload):
+    """
+    Stream pipeline progress as NDJSON, one line per finished agent
+    
+    The final line carries the same payload the buffered endpoint returns.
+    """
+    return stream_events_response(chain.stream_pipeline(input_text), build_payload)
+
+def stream_events_response(events, build_payload):
+    """
+    Stream (event_type, dict) progress events as NDJSON, one line per event
+    
+    The final "result" event (a pipeline dict or an OperatorOS AgentResult) is turned into
+    the same payload the buffered endpoint returns.
+    """
+    def generate():
+        for event_type, event in events:
+            if event_type != "result":
+                line = {"event": event_type, **event}
+            elif isinstance(event, dict) and not event["success"]:
+                line = {"event": "result", "success": False, "error": event.get("error", "Unknown error")}
+            elif isinstance(event, AgentResult) and not event.success:
+                line = {"event": "result", "success": False, "error": event.error or "Unknown error"}
+            else:
+                line = {"event": "result", **build_payload(event)}
+            yield app.json.dumps(line) + "\n"
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 @app.route('/api/business_intelligence', methods=['POST'])
 @limiter.limit("5 per minute")
 @csrf.exempt
@@ -2347,7 +2474,7 @@ def api_business_intelligence():
         if not data or 'prompt' not in data:
             return jsonify({"error": "Business prompt is required"}), 400
         
-        prompt = data['prompt'].strip()
+        prompt = fast_strip(data['prompt'])
         
         # Validate input
         is_valid, error_msg = InputValidator.validate_conversation_input(prompt)
@@ -2358,7 +2485,7 @@ def api_business_intelligence():
         prompt = InputValidator.sanitize_html(prompt)
         
         # Create temporary session for API calls
-        temp_session_id = str(uuid.uuid4())
+        temp_session_id = new_uuid()
         
         # Execute Enhanced 11-Agent Pipeline
         chain = Enhanced11AgentChain.create_new(
@@ -2367,14 +2494,11 @@ def api_business_intelligence():
             user_ip=request.remote_addr
         )
         
-        # Execute complete C-Suite pipeline
-        result = chain.execute_complete_pipeline(prompt)
-        
-        if result["success"]:
+        def build_payload(result):
             business_package = result["business_package"]
-            logging.info(f"Business Intelligence package generated: {business_package.get('package_id', 'Unknown')}")
+            logging.info("Business Intelligence package generated: %s", business_package.get('package_id', 'Unknown'))
             
-            return jsonify({
+            return {
                 "success": True,
                 "package_id": business_package.get("package_id"),
                 "download_url": business_package.get("download_url"),
@@ -2385,12 +2509,21 @@ def api_business_intelligence():
                 "conversation_id": result.get("conversation_id"),
                 "business_context": business_package.get("business_context", {}),
                 "package_size": business_package.get("package_size_bytes", 0)
-            })
+            }
+        
+        if wants_ndjson_stream():
+            return stream_pipeline_response(chain, prompt, build_payload)
+        
+        # Execute complete C-Suite pipeline
+        result = chain.execute_complete_pipeline(prompt)
+        
+        if result["success"]:
+            return jsonify(build_payload(result))
         else:
             return jsonify({"success": False, "error": result.get("error", "Unknown error")}), 500
         
     except Exception as e:
-        logging.error(f"Error in business intelligence API: {str(e)}")
+        logging.error("Error in business intelligence API: %s", e)
         return jsonify({"error": f"Business intelligence processing failed: {str(e)}"}), 500
 
 @app.route('/api/executive_advisory', methods=['POST'])
@@ -2407,7 +2540,7 @@ def api_executive_advisory():
         if not data or 'business_challenge' not in data:
             return jsonify({"error": "Business challenge description is required"}), 400
         
-        business_challenge = data['business_challenge'].strip()
+        business_challenge = fast_strip(data['business_challenge'])
         priority_level = data.get('priority_level', 'standard')  # standard, urgent, strategic
         
         # Validate input
@@ -2419,7 +2552,7 @@ def api_executive_advisory():
         business_challenge = InputValidator.sanitize_html(business_challenge)
         
         # Create session for tracking
-        session_id = str(uuid.uuid4())
+        session_id = new_uuid()
         
         # Execute Enhanced 11-Agent Pipeline with executive focus
         chain = Enhanced11AgentChain.create_new(
@@ -2428,10 +2561,7 @@ def api_executive_advisory():
             user_ip=request.remote_addr
         )
         
-        # Execute complete C-Suite pipeline
-        result = chain.execute_complete_pipeline(business_challenge)
-        
-        if result["success"]:
+        def build_payload(result):
             business_package = result["business_package"]
             
             # Add executive-specific metadata
@@ -2443,9 +2573,9 @@ def api_executive_advisory():
                 "enterprise_ready": True
             }
             
-            logging.info(f"Executive Advisory package generated: {business_package.get('package_id', 'Unknown')}")
+            logging.info("Executive Advisory package generated: %s", business_package.get('package_id', 'Unknown'))
             
-            return jsonify({
+            return {
                 "success": True,
                 "package_id": business_package.get("package_id"),
                 "download_url": business_package.get("download_url"),
@@ -2457,12 +2587,21 @@ def api_executive_advisory():
                 "business_value": "Strategic Intelligence Package",
                 "metadata": executive_metadata,
                 "conversation_id": result.get("conversation_id")
-            })
+            }
+        
+        if wants_ndjson_stream():
+            return stream_pipeline_response(chain, business_challenge, build_payload)
+        
+        # Execute complete C-Suite pipeline
+        result = chain.execute_complete_pipeline(business_challenge)
+        
+        if result["success"]:
+            return jsonify(build_payload(result))
         else:
             return jsonify({"success": False, "error": result.get("error", "Unknown error")}), 500
         
     except Exception as e:
-        logging.error(f"Error in executive advisory API: {str(e)}")
+        logging.error("Error in executive advisory API: %s", e)
         return jsonify({"error": f"Executive advisory processing failed: {str(e)}"}), 500
 
 # Multi-LLM Testing Routes
@@ -2483,9 +2622,9 @@ def llm_status():
     """Get status of all LLM providers"""
     try:
         status = multi_llm.get_provider_status()
-        return jsonify(status)
+        return cacheable_json(status, public=True)
     except Exception as e:
-        logging.error(f"Error getting LLM status: {str(e)}")
+        logging.error("Error getting LLM status: %s", e)
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/llm/test-all', methods=['POST'])
@@ -2511,7 +2650,7 @@ def test_all_llm_providers():
         return jsonify(json_results)
         
     except Exception as e:
-        logging.error(f"Error testing LLM providers: {str(e)}")
+        logging.error("Error testing LLM providers: %s", e)
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/llm/custom-test', methods=['POST'])
@@ -2528,12 +2667,9 @@ def custom_llm_test():
             return jsonify({"error": "Prompt cannot be empty"}), 400
         
         # Convert provider name to enum
-        provider = None
-        if provider_name:
-            try:
-                provider = LLMProvider(provider_name)
-            except ValueError:
-                return jsonify({"error": f"Invalid provider: {provider_name}"}), 400
+        provider = PROVIDER_BY_NAME.get(provider_name) if isinstance(provider_name, str) else None
+        if provider_name and provider is None:
+            return jsonify({"error": f"Invalid provider: {provider_name}"}), 400
         
         # Create messages from prompt
         messages = [
@@ -2565,39 +2701,63 @@ def custom_llm_test():
         })
         
     except Exception as e:
-        logging.error(f"Error in custom LLM test: {str(e)}")
+        logging.error("Error in custom LLM test: %s", e)
         return jsonify({"error": str(e)}), 500
 
+# Roles every provider adapter understands
+LLM_CHAT_ROLES = frozenset({'system', 'user', 'assistant'})
+
+def parse_llm_chat_request(data):
+    """
+    Validate an /api/llm/chat body in one pass
+    
+    Returns:
+        Tuple of (generate_response kwargs, None) or (None, error message)
+    """
+    if not isinstance(data, dict):
+        return None, "Request data must be a valid JSON object"
+    
+    messages = data.get('messages')
+    if not messages:
+        return None, "Messages cannot be empty"
+    if not isinstance(messages, list) or not all(
+        isinstance(msg, dict) and msg.get('role') in LLM_CHAT_ROLES and isinstance(msg.get('content'), str)
+        for msg in messages
+    ):
+        return None, "Messages must be objects with a role of system, user or assistant and string content"
+    
+    provider_name = data.get('provider')
+    provider = PROVIDER_BY_NAME.get(provider_name) if isinstance(provider_name, str) else None
+    if provider_name and provider is None:
+        return None, f"Invalid provider: {provider_name}"
+    
+    max_tokens = data.get('max_tokens', 1000)
+    if type(max_tokens) is not int or max_tokens <= 0:
+        return None, "max_tokens must be a positive integer"
+    
+    temperature = data.get('temperature', 0.7)
+    if type(temperature) not in (int, float) or not 0 <= temperature <= 2:
+        return None, "temperature must be a number between 0 and 2"
+    
+    return {
+        "messages": messages,
+        "provider": provider,
+        "max_tokens": max_tokens,
+        "temperature": temperature
+    }, None
+
 @app.route('/api/llm/chat', methods=['POST'])
 @limiter.limit("30 per minute")
 @csrf.exempt  # API endpoint
 def llm_chat():
     """General LLM chat endpoint with provider selection"""
     try:
-        data = request.get_json()
-        messages = data.get('messages', [])
-        provider_name = data.get('provider')
-        max_tokens = data.get('max_tokens', 1000)
-        temperature = data.get('temperature', 0.7)
-        
-        if not messages:
-            return jsonify({"error": "Messages cannot be empty"}), 400
-        
-        # Convert provider name to enum if specified
-        provider = None
-        if provider_name:
-            try:
-                provider = LLMProvider(provider_name)
-            except ValueError:
-                return jsonify({"error": f"Invalid provider: {provider_name}"}), 400
+        chat_kwargs, error = parse_llm_chat_request(request.get_json(silent=True))
+        if error:
+            return jsonify({"error": error}), 400
         
         # Generate response
-        response = multi_llm.generate_response(
-            messages=messages,
-            provider=provider,
-            max_tokens=max_tokens,
-            temperature=temperature
-        )
+        response = multi_llm.generate_response(**chat_kwargs)
         
         return jsonify({
             "content": response.content,
@@ -2609,7 +2769,7 @@ def llm_chat():
         })
         
     except Exception as e:
-        logging.error(f"Error in LLM chat: {str(e)}")
+        logging.error("Error in LLM chat: %s", e)
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/agents/intelligent-test', methods=['POST'])
@@ -2641,7 +2801,7 @@ def test_intelligent_agents():
         })
         
     except Exception as e:
-        logging.error(f"Error in intelligent agent test: {str(e)}")
+        logging.error("Error in intelligent agent test: %s", e)
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/routing/stats')
@@ -2662,7 +2822,7 @@ def routing_stats():
         })
         
     except Exception as e:
-        logging.error(f"Error getting routing stats: {str(e)}")
+        logging.error("Error getting routing stats: %s", e)
         return jsonify({"error": str(e)}), 500
 
 # Spreadsheet Transformer Routes
@@ -2694,13 +2854,13 @@ def api_transform_spreadsheet():
         result = spreadsheet_transformer.transform_file(file_path, file.filename)
         
         if result['success']:
-            logging.info(f"Spreadsheet transformation successful: {result['transformation_id']}")
+            logging.info("Spreadsheet transformation successful: %s", result['transformation_id'])
             return jsonify(result)
         else:
             return jsonify({'error': result['error']}), 500
             
     except Exception as e:
-        logging.error(f"Error in spreadsheet transformation API: {str(e)}")
+        logging.error("Error in spreadsheet transformation API: %s", e)
         return jsonify({'error': f"Transformation failed: {str(e)}"}), 500
 
 @app.route('/download/excel/<transformation_id>')
@@ -2717,7 +2877,7 @@ def download_excel(transformation_id):
             download_name=f'cleaned_data_{transformation_id}.xlsx'
         )
     except Exception as e:
-        logging.error(f"Error downloading Excel file: {str(e)}")
+        logging.error("Error downloading Excel file: %s", e)
         return "Download failed", 500
 
 @app.route('/download/config/<transformation_id>')
@@ -2734,7 +2894,7 @@ def download_config(transformation_id):
             download_name=f'powerbi_config_{transformation_id}.json'
         )
     except Exception as e:
-        logging.error(f"Error downloading config file: {str(e)}")
+        logging.error("Error downloading config file: %s", e)
         return "Download failed", 500
 
 if __name__ == '__main__':
@@ -1,6 +1,9 @@
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy.orm import DeclarativeBase
-from sqlalchemy import event, Index
+from sqlalchemy import Computed, event, Index, insert, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import object_session
+from sqlalchemy.orm.attributes import set_committed_value
 from datetime import datetime
 import json
 
@@ -9,16 +12,23 @@ class Base(DeclarativeBase):
 
 db = SQLAlchemy(model_class=Base)
 
+# JSON on SQLite, binary JSONB (parsed once on write, GIN-indexable) on PostgreSQL
+JSONType = db.JSON().with_variant(JSONB(), 'postgresql')
+
+# Native 16-byte uuid on PostgreSQL, text elsewhere; ids are str in Python either way
+UUIDType = db.String(36).with_variant(db.Uuid(as_uuid=False), 'postgresql')
+
 class Conversation(db.Model):
     """Model for storing conversation metadata with enhanced persistence features"""
     __tablename__ = 'conversations'
     
-    id = db.Column(db.String(36), primary_key=True)  # UUID string
+    id = db.Column(UUIDType, primary_key=True)  # UUID string
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, index=True)
     is_complete = db.Column(db.Boolean, default=False, nullable=False, index=True)
     current_agent_index = db.Column(db.Integer, default=0, nullable=False)
     initial_input = db.Column(db.Text, nullable=False)
+    initial_preview = db.Column(db.String(103), nullable=False, server_default='')  # First 100 chars of initial_input for list views
     
     # Enhanced fields for better conversation tracking
     session_id = db.Column(db.String(128), nullable=True, index=True)  # Track user sessions
@@ -26,29 +36,33 @@ class Conversation(db.Model):
     completion_time = db.Column(db.DateTime, nullable=True)  # Track when conversation completed
     total_tokens_used = db.Column(db.Integer, default=0)  # Track token usage
     error_count = db.Column(db.Integer, default=0)  # Track errors during conversation
+    entry_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)  # Maintained by ConversationEntry events
     
     # Relationship to conversation entries
-    entries = db.relationship('ConversationEntry', backref='conversation', lazy='dynamic', cascade='all, delete-orphan')
+    # Plain list loaded on access (or eagerly via selectinload on list queries), kept in time order
+    entries = db.relationship('ConversationEntry', back_populates='conversation', order_by='ConversationEntry.created_at', cascade='all, delete-orphan')
     
     # Database indexes for performance
     __table_args__ = (
-        Index('idx_conversation_status_time', 'is_complete', 'created_at'),
+        # Newest-first listing filtered by status; INCLUDE lets summary reads skip the heap (PostgreSQL)
+        Index('idx_conv_status_time_desc', 'is_complete', created_at.desc(), 'id',
+              postgresql_include=['total_tokens_used', 'error_count']),
         Index('idx_conversation_session', 'session_id', 'created_at'),
     )
     
     def to_dict(self):
         return {
             'id': self.id,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat(),
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
             'is_complete': self.is_complete,
             'current_agent_index': self.current_agent_index,
             'initial_input': self.initial_input,
             'session_id': self.session_id,
-            'completion_time': self.completion_time.isoformat() if self.completion_time else None,
+            'completion_time': self.completion_time,
             'total_tokens_used': self.total_tokens_used,
             'error_count': self.error_count,
-            'entries': [entry.to_dict() for entry in self.entries.order_by(ConversationEntry.created_at)]
+            'entries': [entry.to_dict() for entry in self.entries]
         }
     
     def get_duration(self):
@@ -59,15 +73,15 @@ class Conversation(db.Model):
     
     def get_entry_count(self):
         """Get total number of entries in this conversation"""
-        return self.entries.count()
+        return self.entry_count
     
     def get_summary(self):
         """Get a summary of the conversation for display"""
         return {
             'id': self.id,
-            'created_at': self.created_at.isoformat(),
+            'created_at': self.created_at,
             'is_complete': self.is_complete,
-            'initial_input': self.initial_input[:100] + '...' if len(self.initial_input) > 100 else self.initial_input,
+            'initial_input': self.initial_preview,
             'entry_count': self.get_entry_count(),
             'duration_seconds': self.get_duration(),
             'current_agent_index': self.current_agent_index,
@@ -75,32 +89,46 @@ class Conversation(db.Model):
             'error_count': self.error_count
         }
 
+@event.listens_for(Conversation, 'before_insert')
+def set_initial_preview(mapper, connection, target):
+    """Store the truncated initial input so list queries can defer the full TEXT column"""
+    if target.initial_input is not None:
+        target.initial_preview = target.initial_input[:100] + '...' if len(target.initial_input) > 100 else target.initial_input
+
 class ConversationEntry(db.Model):
     """Model for storing individual agent responses in conversations with enhanced persistence"""
     __tablename__ = 'conversation_entries'
     
     id = db.Column(db.Integer, primary_key=True)
-    conversation_id = db.Column(db.String(36), db.ForeignKey('conversations.id'), nullable=False, index=True)
-    agent_name = db.Column(db.String(50), nullable=False, index=True)
+    # Indexed through the composite indexes below, where each is the leading column
+    conversation_id = db.Column(UUIDType, db.ForeignKey('conversations.id'), nullable=False)
+    agent_name = db.Column(db.String(50), nullable=False)
     agent_role = db.Column(db.String(50), nullable=False)
     input_text = db.Column(db.Text, nullable=False)
     response_text = db.Column(db.Text, nullable=False)
     next_question = db.Column(db.Text)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     
     # Enhanced fields for better tracking and analysis
     processing_time_seconds = db.Column(db.Float, default=0.0)  # Time taken to generate response
     tokens_used = db.Column(db.Integer, default=0)  # Tokens used for this response
     model_used = db.Column(db.String(50), default='gpt-3.5-turbo')  # Model used for response
     api_provider = db.Column(db.String(20), default='openai')  # API provider used (openai, claude, gemini)
-    response_length = db.Column(db.Integer, default=0)  # Length of response in characters
+    response_length = db.Column(db.Integer, Computed('length(response_text)', persisted=True))  # Length of response in characters, computed by the database
     error_occurred = db.Column(db.Boolean, default=False)  # Whether an error occurred
     error_message = db.Column(db.Text, nullable=True)  # Error message if any
     
+    conversation = db.relationship('Conversation', back_populates='entries')
+    # Batch-loaded with one IN query per result set instead of one query per entry
+    feedback = db.relationship('UserFeedback', back_populates='entry', lazy='selectin')
+    
     # Database indexes for performance
     __table_args__ = (
         Index('idx_entry_conversation_time', 'conversation_id', 'created_at'),
         Index('idx_entry_agent_time', 'agent_name', 'created_at'),
+        # Rows arrive in created_at order, so a BRIN index prunes time-range scans at a fraction
+        # of a B-tree's size (PostgreSQL); other databases get a regular index
+        Index('idx_entry_created_brin', 'created_at', postgresql_using='brin'),
     )
     
     def to_dict(self):
@@ -112,7 +140,7 @@ class ConversationEntry(db.Model):
             'input_text': self.input_text,
             'response_text': self.response_text,
             'next_question': self.next_question,
-            'created_at': self.created_at.isoformat(),
+            'created_at': self.created_at,
             'processing_time_seconds': self.processing_time_seconds,
             'tokens_used': self.tokens_used,
             'model_used': self.model_used,
@@ -127,11 +155,11 @@ class FlowSession(db.Model):
     """Model for storing Flow Platform sessions"""
     __tablename__ = 'flow_sessions'
     
-    id = db.Column(db.String(36), primary_key=True)  # UUID string
+    id = db.Column(UUIDType, primary_key=True)  # UUID string
     user_id = db.Column(db.String(128), nullable=False, index=True)
     mode = db.Column(db.String(20), nullable=False, index=True)  # 'personal' or 'project'
-    input_data = db.Column(db.JSON)
-    output_data = db.Column(db.JSON)
+    input_data = db.Column(JSONType)
+    output_data = db.Column(JSONType)
     tokens_used = db.Column(db.Integer, default=0)
     processing_time = db.Column(db.Float, default=0.0)
     success = db.Column(db.Boolean, default=True)
@@ -141,6 +169,7 @@ class FlowSession(db.Model):
     __table_args__ = (
         Index('idx_flow_user_mode_time', 'user_id', 'mode', 'created_at'),
         Index('idx_flow_mode_time', 'mode', 'created_at'),
+        Index('idx_flow_output_gin', 'output_data', postgresql_using='gin').ddl_if(dialect='postgresql'),
     )
     
     def to_dict(self):
@@ -153,7 +182,7 @@ class FlowSession(db.Model):
             'tokens_used': self.tokens_used,
             'processing_time': self.processing_time,
             'success': self.success,
-            'created_at': self.created_at.isoformat()
+            'created_at': self.created_at
         }
 
 class UserPreferences(db.Model):
@@ -162,9 +191,9 @@ class UserPreferences(db.Model):
     
     user_id = db.Column(db.String(128), primary_key=True)
     preferred_mode = db.Column(db.String(20), default='personal')
-    energy_patterns = db.Column(db.JSON, default=dict)
-    project_history = db.Column(db.JSON, default=list)
-    notification_settings = db.Column(db.JSON, default=dict)
+    energy_patterns = db.Column(JSONType, default=dict)
+    project_history = db.Column(JSONType, default=list)
+    notification_settings = db.Column(JSONType, default=dict)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
@@ -175,8 +204,8 @@ class UserPreferences(db.Model):
             'energy_patterns': self.energy_patterns,
             'project_history': self.project_history,
             'notification_settings': self.notification_settings,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         }
 
 class DailyPattern(db.Model):
@@ -204,14 +233,14 @@ class DailyPattern(db.Model):
         return {
             'id': self.id,
             'user_id': self.user_id,
-            'date': self.date.isoformat(),
+            'date': self.date,
             'energy_level': self.energy_level,
             'completed_priority': self.completed_priority,
             'open_loops_count': self.open_loops_count,
             'satisfaction_score': self.satisfaction_score,
             'flow_quality': self.flow_quality,
             'notes': self.notes,
-            'created_at': self.created_at.isoformat()
+            'created_at': self.created_at
         }
 
 class Project(db.Model):
@@ -224,7 +253,7 @@ class Project(db.Model):
     project_type = db.Column(db.String(50))  # 'business', 'creative', etc.
     status = db.Column(db.String(50), default='active', index=True)
     vision_text = db.Column(db.Text)
-    strategy_output = db.Column(db.JSON)
+    strategy_output = db.Column(JSONType)
     download_count = db.Column(db.Integer, default=0)
     last_accessed = db.Column(db.DateTime, default=datetime.utcnow)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
@@ -246,30 +275,80 @@ class Project(db.Model):
             'vision_text': self.vision_text,
             'strategy_output': self.strategy_output,
             'download_count': self.download_count,
-            'last_accessed': self.last_accessed.isoformat() if self.last_accessed else None,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
+            'last_accessed': self.last_accessed,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         }
 
 # Database event listeners for automatic field updates
-@event.listens_for(ConversationEntry, 'before_insert')
-def set_response_length(mapper, connection, target):
-    """Automatically set response length before insert"""
-    if target.response_text:
-        target.response_length = len(target.response_text)
+def _adjust_entry_count(connection, target, delta):
+    """Apply delta to the parent conversation's denormalized entry_count"""
+    conversations = Conversation.__table__
+    connection.execute(
+        update(conversations)
+        .where(conversations.c.id == target.conversation_id)
+        .values(entry_count=conversations.c.entry_count + delta)
+    )
+    
+    # Keep an already-loaded parent in the same session in step without marking it dirty
+    conversation = _loaded_conversation(target)
+    if conversation is not None and 'entry_count' in conversation.__dict__:
+        set_committed_value(conversation, 'entry_count', conversation.entry_count + delta)
+
+def _loaded_conversation(target):
+    """The entry's parent conversation if it is already in the entry's session, else None"""
+    session = object_session(target)
+    if session is None:
+        return None
+    return session.identity_map.get(session.identity_key(Conversation, target.conversation_id))
+
+@event.listens_for(ConversationEntry, 'after_insert')
+def increment_entry_count(mapper, connection, target):
+    """Count a new entry against its conversation"""
+    _adjust_entry_count(connection, target, 1)
+
+@event.listens_for(ConversationEntry, 'after_delete')
+def decrement_entry_count(mapper, connection, target):
+    """Remove a deleted entry from its conversation's count"""
+    _adjust_entry_count(connection, target, -1)
+
+@event.listens_for(ConversationEntry, 'after_update')
+def touch_conversation(mapper, connection, target):
+    """Bump the parent's updated_at on entry edits (feedback, clarity data) so caches keyed on it refresh"""
+    now = datetime.utcnow()
+    conversations = Conversation.__table__
+    connection.execute(
+        update(conversations)
+        .where(conversations.c.id == target.conversation_id)
+        .values(updated_at=now)
+    )
+    
+    conversation = _loaded_conversation(target)
+    if conversation is not None and 'updated_at' in conversation.__dict__:
+        set_committed_value(conversation, 'updated_at', now)
+
+def bulk_insert_entries(conversation_id, rows):
+    """
+    Insert several entries for one conversation with a single executemany
 
-@event.listens_for(ConversationEntry, 'before_update')
-def update_response_length(mapper, connection, target):
-    """Automatically update response length before update"""
-    if target.response_text:
-        target.response_length = len(target.response_text)
+    Skips the per-row unit-of-work and after_insert events, so entry_count is
+    adjusted here in one UPDATE. The caller commits.
+    """
+    if not rows:
+        return
+    db.session.execute(insert(ConversationEntry), [dict(row, conversation_id=conversation_id) for row in rows])
+    db.session.execute(
+        update(Conversation)
+        .where(Conversation.id == conversation_id)
+        .values(entry_count=Conversation.entry_count + len(rows))
+    )
 
 class UserFeedback(db.Model):
     """Model for storing user feedback on agent responses"""
     __tablename__ = 'user_feedback'
     
     id = db.Column(db.Integer, primary_key=True)
-    conversation_entry_id = db.Column(db.Integer, db.ForeignKey('conversation_entries.id'), nullable=False)
+    conversation_entry_id = db.Column(db.Integer, db.ForeignKey('conversation_entries.id'), nullable=False, index=True)
     feedback_type = db.Column(db.String(20), nullable=False)  # clarity, empathy, actionability, overall
     rating = db.Column(db.Integer, nullable=False)  # 1-5 scale
     comment = db.Column(db.Text, nullable=True)
@@ -277,7 +356,7 @@ class UserFeedback(db.Model):
     user_session = db.Column(db.String(128), nullable=True)
     
     # Relationship to conversation entry
-    entry = db.relationship('ConversationEntry', backref='feedback')
+    entry = db.relationship('ConversationEntry', back_populates='feedback')
     
     def to_dict(self):
         return {
@@ -286,7 +365,7 @@ class UserFeedback(db.Model):
             'feedback_type': self.feedback_type,
             'rating': self.rating,
             'comment': self.comment,
-            'created_at': self.created_at.isoformat(),
+            'created_at': self.created_at,
             'user_session': self.user_session
         }
 
@@ -313,6 +392,9 @@ class DynamicAgent(db.Model):
     __table_args__ = (
         Index('idx_dynamic_agent_user_code', 'user_session', 'agent_code'),
         Index('idx_dynamic_agent_user_active', 'user_session', 'is_active'),
+        # Partial index serving the active-agent list already ordered by newest first
+        Index('idx_dynamic_agent_active_user_time', user_session, created_at.desc(),
+              postgresql_where=is_active.is_(True), sqlite_where=is_active.is_(True)),
     )
     
     def to_dict(self):
@@ -328,8 +410,23 @@ class DynamicAgent(db.Model):
             'icon': self.icon,
             'is_active': self.is_active,
             'usage_count': self.usage_count,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
+        }
+
+class OperatorOSContext(db.Model):
+    """Model for persisting the OperatorOS Master Agent's user context, one row per context key"""
+    __tablename__ = 'operatoros_context'
+    
+    key = db.Column(db.String(64), primary_key=True)
+    value = db.Column(JSONType)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    
+    def to_dict(self):
+        return {
+            'key': self.key,
+            'value': self.value,
+            'updated_at': self.updated_at
         }
 
 class PaymentStatus:
@@ -339,6 +436,14 @@ class PaymentStatus:
     FAILED = "failed"
     CANCELLED = "cancelled"
 
+# Bootstrap badge class for each payment status
+_STATUS_BADGE = {
+    PaymentStatus.PENDING: 'warning',
+    PaymentStatus.PAID: 'success',
+    PaymentStatus.FAILED: 'danger',
+    PaymentStatus.CANCELLED: 'secondary'
+}
+
 class Payment(db.Model):
     """Model for storing Stripe payment records"""
     __tablename__ = 'payments'
@@ -353,7 +458,11 @@ class Payment(db.Model):
     currency = db.Column(db.String(3), default='usd', nullable=False)
     description = db.Column(db.Text, nullable=True)
     payment_type = db.Column(db.String(20), nullable=False)  # 'link' or 'invoice'
-    status = db.Column(db.String(20), default=PaymentStatus.PENDING, nullable=False)
+    status = db.Column(
+        db.Enum(PaymentStatus.PENDING, PaymentStatus.PAID, PaymentStatus.FAILED, PaymentStatus.CANCELLED, name='payment_status'),
+        default=PaymentStatus.PENDING,
+        nullable=False
+    )
     payment_url = db.Column(db.String(500), nullable=True)  # Stripe payment/invoice URL
     due_date = db.Column(db.DateTime, nullable=True)  # For invoices
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
@@ -381,18 +490,12 @@ class Payment(db.Model):
             'payment_type': self.payment_type,
             'status': self.status,
             'payment_url': self.payment_url,
-            'due_date': self.due_date.isoformat() if self.due_date else None,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat(),
-            'paid_at': self.paid_at.isoformat() if self.paid_at else None
+            'due_date': self.due_date,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
+            'paid_at': self.paid_at
         }
     
     def get_status_badge(self):
         """Get Bootstrap badge class for status display"""
-        status_classes = {
-            PaymentStatus.PENDING: 'warning',
-            PaymentStatus.PAID: 'success',
-            PaymentStatus.FAILED: 'danger',
-            PaymentStatus.CANCELLED: 'secondary'
-        }
-        return status_classes.get(self.status, 'secondary')
\ No newline at end of file
+        return _STATUS_BADGE.get(self.status, 'secondary')
\ No newline at end of file
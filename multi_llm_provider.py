@@ -5,25 +5,62 @@ Unified interface for OpenAI, Anthropic, and Gemini APIs with automatic failover
 
 import os
 import json
+import time
+import hashlib
+import asyncio
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Callable, AsyncIterator
 from enum import Enum
 from dataclasses import dataclass
+from functools import cached_property, lru_cache
+
+import numpy as np
 
 # API clients
+import httpx
 import openai
-from openai import OpenAI
+from openai import AsyncOpenAI
 import anthropic
-from anthropic import Anthropic
+from anthropic import AsyncAnthropic
 from google import genai
 from google.genai import types
+from google.genai import errors as genai_errors
+
+from utils.async_runtime import run_sync, shared_http_for
+
+# Optional exact tokenizer for context trimming; without it token counts use a chars/4 estimate
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
 
 class LLMProvider(Enum):
     OPENAI = "openai"
     ANTHROPIC = "anthropic"
     GEMINI = "gemini"
 
-@dataclass
+# Prompt-cache invariant: every provider call sends static content first (system prompt, then
+# earlier turns, verbatim and in order) and the new user turn last. OpenAI's automatic prefix
+# caching, Anthropic cache_control breakpoints and Gemini cached content only hit when that prefix
+# is byte-identical across calls, so never interpolate timestamps or per-request data into it.
+
+# Errors raised by a provider call itself; anything else (e.g. a malformed message) goes straight back to the caller
+_TRANSPORT_ERRORS = (httpx.TransportError, asyncio.TimeoutError, openai.APIConnectionError, anthropic.APIConnectionError)
+_STATUS_ERRORS = (openai.APIStatusError, anthropic.APIStatusError, genai_errors.APIError)
+_PROVIDER_ERRORS = _TRANSPORT_ERRORS + _STATUS_ERRORS
+
+# Name -> provider lookup so request validation doesn't go through Enum's raising constructor
+PROVIDER_BY_NAME = {provider.value: provider for provider in LLMProvider}
+
+# Environment variable holding each provider's API key
+PROVIDER_KEY_ENV = {
+    LLMProvider.OPENAI: 'OPENAI_API_KEY',
+    LLMProvider.ANTHROPIC: 'ANTHROPIC_API_KEY',
+    LLMProvider.GEMINI: 'GEMINI_API_KEY'
+}
+
+# Frozen because cached responses are shared between callers
+@dataclass(slots=True, frozen=True)
 class LLMResponse:
     content: str
     provider: LLMProvider
@@ -42,16 +79,32 @@ class MultiLLMProvider:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         
-        # Initialize clients
-        self.openai_client = None
-        self.anthropic_client = None
-        self.gemini_client = None
-        
-        # Provider availability
+        # Provider availability; SDK clients are created lazily from these keys
         self.available_providers = []
+        self._api_keys: Dict[LLMProvider, str] = {}
+        
+        # Deterministic (temperature == 0) responses keyed by request hash -> (expires_at, LLMResponse)
+        self._cache: Dict[str, tuple] = {}
+        self.cache_ttl = 3600
+        self.cache_max_entries = 1024
+        self.cache_stats = {"hits": 0, "misses": 0}
+        
+        # Gemini context caches per system prompt hash -> (cache name or None if uncacheable, expires_at)
+        self._gemini_cache_by_system: Dict[str, tuple] = {}
+        self.gemini_cache_ttl = 3600
         
         self._initialize_providers()
         
+        # Circuit breaker per provider: trip after repeated 429/5xx/connection failures within a window
+        self.circuit_failure_threshold = 3
+        self.circuit_window = 60
+        self.circuit_cooldown = 30
+        self._provider_health = {
+            p: {"failures": 0, "first_failure": 0.0, "open_until": 0.0} for p in self.available_providers
+        }
+        # Provider that last succeeded on failover; selected traffic stays on it while the primary's circuit is open
+        self._sticky_provider = None
+        
         # Default model mappings following blueprint guidelines
         self.model_mappings = {
             LLMProvider.OPENAI: "gpt-4o",  # Latest model per blueprint
@@ -59,6 +112,16 @@ class MultiLLMProvider:
             LLMProvider.GEMINI: "gemini-2.5-flash"  # Latest model per blueprint
         }
         
+        # Prompt budget (input + max_tokens); the oldest non-system turns are dropped to fit
+        self.max_context_tokens = 120000
+        
+        # Provider -> coroutine generating a response; new providers plug in here
+        self._dispatch: Dict[LLMProvider, Callable] = {
+            LLMProvider.OPENAI: self._agenerate_openai_response,
+            LLMProvider.ANTHROPIC: self._agenerate_anthropic_response,
+            LLMProvider.GEMINI: self._agenerate_gemini_response
+        }
+        
         # Provider strengths for intelligent selection
         self.provider_strengths = {
             LLMProvider.OPENAI: {
@@ -110,42 +173,49 @@ class MultiLLMProvider:
             "research": ["research", "find", "investigate", "explore", "study", "examine", "discover"],
             "concise": ["brief", "short", "quick", "summary", "concise", "bullet", "list"]
         }
+        
+        # Each distinct pattern -> the task types it counts toward, so shared patterns are scanned once
+        self._pattern_tasks: Dict[str, List[str]] = {}
+        for task_type, patterns in self.task_patterns.items():
+            for pattern in patterns:
+                self._pattern_tasks.setdefault(pattern, []).append(task_type)
+        self._pattern_counts = {task_type: len(patterns) for task_type, patterns in self.task_patterns.items()}
+        
+        # Provider x task strength matrix so fitness scoring is one matrix-vector product
+        self._task_names = sorted({task for strengths in self.provider_strengths.values() for task in strengths})
+        self._task_index = {task: i for i, task in enumerate(self._task_names)}
+        self._strength_matrix = np.array(
+            [[self.provider_strengths[p].get(task, 0.5) for task in self._task_names] for p in self.available_providers],
+            dtype=np.float32
+        ).reshape(len(self.available_providers), len(self._task_names))
+        self._speed_bonus = self._strength_matrix[:, self._task_index["speed"]] * 0.1
+        
+        # Per-instance memo of selections; identical prompts repeat within a session
+        self._select_for_content = lru_cache(maxsize=256)(self._score_content)
     
     def _initialize_providers(self):
-        """Initialize available LLM providers based on API keys"""
-        
-        # OpenAI initialization
-        openai_key = os.environ.get('OPENAI_API_KEY')
-        if openai_key:
-            try:
-                self.openai_client = OpenAI(api_key=openai_key)
-                self.available_providers.append(LLMProvider.OPENAI)
-                self.logger.info("OpenAI provider initialized successfully")
-            except Exception as e:
-                self.logger.error(f"Failed to initialize OpenAI: {e}")
-        
-        # Anthropic initialization
-        anthropic_key = os.environ.get('ANTHROPIC_API_KEY')
-        if anthropic_key:
-            try:
-                self.anthropic_client = Anthropic(api_key=anthropic_key)
-                self.available_providers.append(LLMProvider.ANTHROPIC)
-                self.logger.info("Anthropic provider initialized successfully")
-            except Exception as e:
-                self.logger.error(f"Failed to initialize Anthropic: {e}")
-        
-        # Gemini initialization
-        gemini_key = os.environ.get('GEMINI_API_KEY')
-        if gemini_key:
-            try:
-                self.gemini_client = genai.Client(api_key=gemini_key)
-                self.available_providers.append(LLMProvider.GEMINI)
-                self.logger.info("Gemini provider initialized successfully")
-            except Exception as e:
-                self.logger.error(f"Failed to initialize Gemini: {e}")
+        """Register providers that have API keys configured"""
+        for provider, env_var in PROVIDER_KEY_ENV.items():
+            api_key = os.environ.get(env_var)
+            if api_key:
+                self._api_keys[provider] = api_key
+                self.available_providers.append(provider)
         
         self.logger.info(f"Initialized {len(self.available_providers)} LLM providers: {[p.value for p in self.available_providers]}")
     
+    # SDK clients are built on first use, so a process only loads the transports it actually calls
+    @cached_property
+    def openai_client(self) -> AsyncOpenAI:
+        return AsyncOpenAI(api_key=self._api_keys[LLMProvider.OPENAI], http_client=shared_http_for(openai))
+    
+    @cached_property
+    def anthropic_client(self) -> AsyncAnthropic:
+        return AsyncAnthropic(api_key=self._api_keys[LLMProvider.ANTHROPIC], http_client=shared_http_for(anthropic))
+    
+    @cached_property
+    def gemini_client(self) -> genai.Client:
+        return genai.Client(api_key=self._api_keys[LLMProvider.GEMINI])
+    
     def select_optimal_provider(
         self, 
         messages: List[Dict[str, str]], 
@@ -164,15 +234,27 @@ class MultiLLMProvider:
         if not self.available_providers:
             return None
         
+        # Nothing to choose between in single-provider deployments
+        if len(self.available_providers) == 1:
+            return self.available_providers[0]
+        
         # Combine all message content for analysis
         full_content = " ".join([msg.get("content", "") for msg in messages]).lower()
         
+        return self._select_for_content(full_content, agent_type)
+    
+    def _score_content(self, full_content: str, agent_type: Optional[str]) -> LLMProvider:
+        """Score providers against lower-cased message content; memoized as _select_for_content"""
         # Calculate task scores based on content patterns
-        task_scores = {}
-        for task_type, patterns in self.task_patterns.items():
-            score = sum(1 for pattern in patterns if pattern in full_content)
-            if score > 0:
-                task_scores[task_type] = score / len(patterns)  # Normalize
+        task_hits = {}
+        for pattern, task_types in self._pattern_tasks.items():
+            if pattern in full_content:
+                for task_type in task_types:
+                    task_hits[task_type] = task_hits.get(task_type, 0) + 1
+        task_scores = {
+            task_type: hits / self._pattern_counts[task_type]  # Normalize
+            for task_type, hits in task_hits.items()
+        }
         
         # Add agent-specific scoring
         if agent_type:
@@ -192,24 +274,20 @@ class MultiLLMProvider:
             task_scores = {"analysis": 0.5, "reasoning": 0.5}
         
         # Calculate provider fitness scores
-        provider_scores = {}
-        for provider in self.available_providers:
-            total_score = 0
-            for task_type, task_weight in task_scores.items():
-                provider_strength = self.provider_strengths[provider].get(task_type, 0.5)
-                total_score += task_weight * provider_strength
-            
-            # Add availability bonus for speed when multiple tasks
-            if len(task_scores) > 2:
-                speed_bonus = self.provider_strengths[provider]["speed"] * 0.1
-                total_score += speed_bonus
-            
-            provider_scores[provider] = total_score
+        weights = np.zeros(len(self._task_names), dtype=np.float32)
+        for task_type, task_weight in task_scores.items():
+            weights[self._task_index[task_type]] = task_weight
+        provider_scores = self._strength_matrix @ weights
+        
+        # Add availability bonus for speed when multiple tasks
+        if len(task_scores) > 2:
+            provider_scores = provider_scores + self._speed_bonus
         
         # Select provider with highest fitness score
-        optimal_provider = max(provider_scores.items(), key=lambda x: x[1])[0]
+        best = int(np.argmax(provider_scores))
+        optimal_provider = self.available_providers[best]
         
-        self.logger.info(f"Intelligent selection: {optimal_provider.value} (score: {provider_scores[optimal_provider]:.3f}) for tasks: {list(task_scores.keys())}")
+        self.logger.info(f"Intelligent selection: {optimal_provider.value} (score: {provider_scores[best]:.3f}) for tasks: {list(task_scores.keys())}")
         
         return optimal_provider
 
@@ -220,6 +298,17 @@ class MultiLLMProvider:
         agent_type: Optional[str] = None,
         max_tokens: int = 1000,
         temperature: float = 0.7
+    ) -> LLMResponse:
+        """Synchronous wrapper around agenerate_response for existing callers"""
+        return run_sync(self.agenerate_response(messages, provider, agent_type, max_tokens, temperature))
+    
+    async def agenerate_response(
+        self, 
+        messages: List[Dict[str, str]], 
+        provider: Optional[LLMProvider] = None,
+        agent_type: Optional[str] = None,
+        max_tokens: int = 1000,
+        temperature: float = 0.7
     ) -> LLMResponse:
         """
         Generate response using intelligent provider selection or specified provider
@@ -245,32 +334,240 @@ class MultiLLMProvider:
                 error="No providers initialized"
             )
         
+        messages = self._trim_to_context(messages, max_tokens)
+        target_provider = self._resolve_provider(messages, provider, agent_type)
+        
+        # Only temperature 0 is deterministic enough to replay a stored answer
+        cache_key = None
+        if temperature == 0:
+            cache_key = self._cache_key(self.model_mappings[target_provider], messages, temperature, max_tokens)
+            cached = self._cache.get(cache_key)
+            if cached and cached[0] > time.monotonic():
+                self.cache_stats["hits"] += 1
+                return cached[1]
+            self.cache_stats["misses"] += 1
+        
+        response = await self._dispatch_with_failover(target_provider, messages, max_tokens, temperature)
+        if cache_key and response.success:
+            # Re-inserting at the end keeps insertion order == expiry order, so the first key is the oldest
+            self._cache.pop(cache_key, None)
+            if len(self._cache) >= self.cache_max_entries:
+                self._cache.pop(next(iter(self._cache)))
+            self._cache[cache_key] = (time.monotonic() + self.cache_ttl, response)
+        return response
+    
+    @cached_property
+    def _encoding(self):
+        """gpt-4o tokenizer, used as the token estimate for every provider; None if tiktoken is unavailable"""
+        if tiktoken is None:
+            return None
+        try:
+            return tiktoken.encoding_for_model(self.model_mappings[LLMProvider.OPENAI])
+        except Exception as e:
+            self.logger.warning(f"tiktoken encoding unavailable, estimating tokens from length: {e}")
+            return None
+    
+    def _count_tokens(self, text: str) -> int:
+        """Token count for text, exact for OpenAI and an estimate for the other providers"""
+        if self._encoding is None:
+            return len(text) // 4  # Rough estimate
+        return len(self._encoding.encode(text))
+    
+    def _trim_to_context(self, messages: List[Dict[str, str]], max_tokens: int) -> List[Dict[str, str]]:
+        """Drop the oldest non-system messages until the prompt fits max_context_tokens - max_tokens"""
+        budget = self.max_context_tokens - max_tokens
+        counts = [self._count_tokens(msg.get("content", "")) for msg in messages]
+        total = sum(counts)
+        if total <= budget:
+            return messages
+        
+        keep = [True] * len(messages)
+        # Never drop the final message: it is the turn being answered
+        for i, msg in enumerate(messages[:-1]):
+            if total <= budget:
+                break
+            if msg["role"] != "system":
+                keep[i] = False
+                total -= counts[i]
+        
+        # Don't leave the history opening on an orphaned assistant turn
+        for i, msg in enumerate(messages[:-1]):
+            if not keep[i] or msg["role"] == "system":
+                continue
+            if msg["role"] != "assistant":
+                break
+            keep[i] = False
+        
+        dropped = keep.count(False)
+        self.logger.warning(f"Trimmed {dropped} oldest messages to fit {budget} prompt tokens")
+        return [msg for msg, kept in zip(messages, keep) if kept]
+    
+    def _resolve_provider(self, messages: List[Dict], provider: Optional[LLMProvider], agent_type: Optional[str]) -> LLMProvider:
+        """Use the requested provider if available, otherwise the selected one, routed around open circuits"""
         # Intelligent provider selection or fallback
         if provider and provider in self.available_providers:
-            target_provider = provider
-        else:
-            target_provider = self.select_optimal_provider(messages, agent_type)
-            if not target_provider:
-                target_provider = self.available_providers[0]
+            return provider
+        target_provider = self.select_optimal_provider(messages, agent_type)
+        if not target_provider:
+            target_provider = self.available_providers[0]
+        return self._route_around_open_circuits(target_provider)
+    
+    async def stream_response(
+        self,
+        messages: List[Dict[str, str]],
+        provider: Optional[LLMProvider] = None,
+        agent_type: Optional[str] = None,
+        max_tokens: int = 1000,
+        temperature: float = 0.7
+    ) -> AsyncIterator[str]:
+        """
+        Yield response text incrementally as the provider generates it
+        
+        Provider selection matches agenerate_response. There is no failover once
+        streaming starts, since the caller may already have consumed partial output;
+        errors are raised to the caller.
+        """
+        if not self.available_providers:
+            raise RuntimeError("No LLM providers available. Please check API keys.")
+        
+        messages = self._trim_to_context(messages, max_tokens)
+        target_provider = self._resolve_provider(messages, provider, agent_type)
+        model = self.model_mappings[target_provider]
         
         try:
             if target_provider == LLMProvider.OPENAI:
-                return self._generate_openai_response(messages, max_tokens, temperature)
+                stream = await self.openai_client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    stream=True
+                )
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            
             elif target_provider == LLMProvider.ANTHROPIC:
-                return self._generate_anthropic_response(messages, max_tokens, temperature)
+                params = self._anthropic_params(messages, model, max_tokens, temperature)
+                async with self.anthropic_client.messages.stream(**params) as stream:
+                    async for text in stream.text_stream:
+                        yield text
+            
             elif target_provider == LLMProvider.GEMINI:
-                return self._generate_gemini_response(messages, max_tokens, temperature)
+                system_prompt, contents = self._gemini_prompt_parts(messages)
+                stream = await self.gemini_client.aio.models.generate_content_stream(
+                    model=model,
+                    contents=contents,
+                    config=types.GenerateContentConfig(
+                        max_output_tokens=max_tokens,
+                        temperature=temperature,
+                        system_instruction=system_prompt or None
+                    )
+                )
+                async for chunk in stream:
+                    if chunk.text:
+                        yield chunk.text
         except Exception as e:
-            self.logger.error(f"Primary provider {target_provider.value} failed: {e}")
+            self.logger.error(f"Streaming from {target_provider.value} failed: {e}")
+            self._record_failure(target_provider, e)
+            raise
+        
+        self._record_success(target_provider)
+    
+    def _cache_key(self, model: str, messages: List[Dict], temperature: float, max_tokens: int) -> str:
+        """Hash everything that determines a deterministic response"""
+        payload = json.dumps(
+            {"model": model, "messages": messages, "temperature": temperature, "max_tokens": max_tokens},
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+    
+    async def _dispatch_with_failover(self, target_provider: LLMProvider, messages: List[Dict], max_tokens: int, temperature: float) -> LLMResponse:
+        """Call the target provider, then each healthy alternative in turn, until one succeeds"""
+        errors = []
+        for provider in self._failover_chain(target_provider):
+            if provider != target_provider:
+                self.logger.info(f"Attempting failover to {provider.value}")
+            try:
+                response = await self._dispatch[provider](messages, max_tokens, temperature)
+            except _PROVIDER_ERRORS as e:
+                label = "Primary provider" if provider == target_provider else "Failover to"
+                self.logger.error(f"{label} {provider.value} failed: {e}")
+                self._record_failure(provider, e)
+                errors.append(f"{provider.value}: {e}")
+                continue
             
-            # Attempt failover to next available provider
-            return self._attempt_failover(messages, target_provider, max_tokens, temperature)
+            self._record_success(provider)
+            if provider != target_provider:
+                self._sticky_provider = provider
+            return response
+        
+        # All providers failed
+        return LLMResponse(
+            content="All LLM providers failed. Please check your API keys and try again.",
+            provider=target_provider,
+            model="failed",
+            usage={},
+            success=False,
+            error="All providers failed: " + "; ".join(errors)
+        )
+    
+    def _failover_chain(self, target_provider: LLMProvider) -> List[LLMProvider]:
+        """Target first, then the other providers with closed circuits, fewest recent failures first"""
+        alternatives = [
+            p for p in self.available_providers if p != target_provider and not self._circuit_open(p)
+        ]
+        alternatives.sort(key=lambda p: self._provider_health[p]["failures"])
+        return [target_provider] + alternatives
+    
+    def _circuit_open(self, provider: LLMProvider) -> bool:
+        """True while the provider is cooling down after repeated failures"""
+        return time.monotonic() < self._provider_health[provider]["open_until"]
+    
+    def _route_around_open_circuits(self, provider: LLMProvider) -> LLMProvider:
+        """Swap a selected provider whose circuit is open for the sticky failover provider or the next healthy one"""
+        if not self._circuit_open(provider):
+            return provider
+        if self._sticky_provider and not self._circuit_open(self._sticky_provider):
+            return self._sticky_provider
+        for candidate in self.available_providers:
+            if not self._circuit_open(candidate):
+                return candidate
+        # Everything is tripped; try the selection anyway rather than failing without a request
+        return provider
     
-    def _generate_openai_response(self, messages: List[Dict], max_tokens: int, temperature: float) -> LLMResponse:
+    def _record_failure(self, provider: LLMProvider, error: Exception):
+        """Count a provider-side failure and open the circuit once the threshold is hit inside the window"""
+        # Only unreachable, overloaded or failing providers count; client errors (bad request, auth)
+        # and our own exceptions say nothing about provider health
+        if isinstance(error, _STATUS_ERRORS):
+            status = getattr(error, "status_code", None) or getattr(error, "code", None)
+            if not isinstance(status, int) or (status != 429 and status < 500):
+                return
+        elif not isinstance(error, _TRANSPORT_ERRORS):
+            return
+        
+        health = self._provider_health[provider]
+        now = time.monotonic()
+        if now - health["first_failure"] > self.circuit_window:
+            health["failures"] = 0
+            health["first_failure"] = now
+        health["failures"] += 1
+        if health["failures"] >= self.circuit_failure_threshold:
+            health["open_until"] = now + self.circuit_cooldown
+            self.logger.warning(f"Circuit open for {provider.value} for {self.circuit_cooldown}s after {health['failures']} failures")
+    
+    def _record_success(self, provider: LLMProvider):
+        """Close the provider's circuit after a successful call"""
+        health = self._provider_health[provider]
+        health["failures"] = 0
+        health["open_until"] = 0.0
+    
+    async def _agenerate_openai_response(self, messages: List[Dict], max_tokens: int, temperature: float) -> LLMResponse:
         """Generate response using OpenAI API"""
         model = self.model_mappings[LLMProvider.OPENAI]
         
-        response = self.openai_client.chat.completions.create(
+        response = await self.openai_client.chat.completions.create(
             model=model,
             messages=messages,
             max_tokens=max_tokens,
@@ -289,10 +586,18 @@ class MultiLLMProvider:
             success=True
         )
     
-    def _generate_anthropic_response(self, messages: List[Dict], max_tokens: int, temperature: float) -> LLMResponse:
+    async def _agenerate_anthropic_response(self, messages: List[Dict], max_tokens: int, temperature: float) -> LLMResponse:
         """Generate response using Anthropic API"""
         model = self.model_mappings[LLMProvider.ANTHROPIC]
         
+        response = await self.anthropic_client.messages.create(
+            **self._anthropic_params(messages, model, max_tokens, temperature)
+        )
+        
+        return self._anthropic_to_llm_response(response, model)
+    
+    def _anthropic_params(self, messages: List[Dict], model: str, max_tokens: int, temperature: float) -> Dict[str, Any]:
+        """Build Anthropic messages.create parameters from OpenAI-format messages"""
         # Convert OpenAI format to Anthropic format
         system_message = ""
         claude_messages = []
@@ -303,14 +608,27 @@ class MultiLLMProvider:
             else:
                 claude_messages.append(msg)
         
-        response = self.anthropic_client.messages.create(
-            model=model,
-            max_tokens=max_tokens,
-            temperature=temperature,
-            system=system_message,
-            messages=claude_messages
-        )
+        # Cache breakpoints: the system prompt, and the history up to the new user turn
+        system = system_message
+        if system_message:
+            system = [{"type": "text", "text": system_message, "cache_control": {"type": "ephemeral"}}]
+        if len(claude_messages) > 1 and isinstance(claude_messages[-2]["content"], str):
+            prior = claude_messages[-2]
+            claude_messages[-2] = {
+                "role": prior["role"],
+                "content": [{"type": "text", "text": prior["content"], "cache_control": {"type": "ephemeral"}}]
+            }
         
+        return {
+            "model": model,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "system": system,
+            "messages": claude_messages
+        }
+    
+    def _anthropic_to_llm_response(self, response, model: str) -> LLMResponse:
+        """Wrap an Anthropic Message as an LLMResponse"""
         return LLMResponse(
             content=response.content[0].text,
             provider=LLMProvider.ANTHROPIC,
@@ -318,38 +636,66 @@ class MultiLLMProvider:
             usage={
                 "prompt_tokens": response.usage.input_tokens,
                 "completion_tokens": response.usage.output_tokens,
-                "total_tokens": response.usage.input_tokens + response.usage.output_tokens
+                "total_tokens": response.usage.input_tokens + response.usage.output_tokens,
+                "cache_creation_input_tokens": response.usage.cache_creation_input_tokens or 0,
+                "cache_read_input_tokens": response.usage.cache_read_input_tokens or 0
             },
             success=True
         )
     
-    def _generate_gemini_response(self, messages: List[Dict], max_tokens: int, temperature: float) -> LLMResponse:
-        """Generate response using Gemini API"""
-        model = self.model_mappings[LLMProvider.GEMINI]
-        
+    def _gemini_prompt_parts(self, messages: List[Dict]) -> tuple:
+        """Split OpenAI-format messages into Gemini's system instruction and role-tagged turns"""
         # Convert messages to Gemini format
         system_prompt = ""
-        user_content = ""
+        contents = []
         
         for msg in messages:
             if msg["role"] == "system":
                 system_prompt = msg["content"]
-            elif msg["role"] == "user":
-                user_content += msg["content"] + "\n"
-            elif msg["role"] == "assistant":
-                user_content += f"Previous response: {msg['content']}\n"
+            elif msg["role"] in ("user", "assistant"):
+                role = "user" if msg["role"] == "user" else "model"
+                contents.append(types.Content(role=role, parts=[types.Part(text=msg["content"])]))
+        
+        # A system-only request still needs a turn to answer
+        if not contents:
+            return "", system_prompt
+        return system_prompt, contents
+    
+    async def _agenerate_gemini_response(self, messages: List[Dict], max_tokens: int, temperature: float) -> LLMResponse:
+        """Generate response using Gemini API"""
+        model = self.model_mappings[LLMProvider.GEMINI]
         
-        # Combine system prompt with user content
-        full_prompt = f"{system_prompt}\n\n{user_content}".strip()
+        system_prompt, contents = self._gemini_prompt_parts(messages)
         
-        response = self.gemini_client.models.generate_content(
-            model=model,
-            contents=full_prompt,
-            config=types.GenerateContentConfig(
-                max_output_tokens=max_tokens,
-                temperature=temperature
+        cache_name = await self._gemini_system_cache(model, system_prompt) if system_prompt else None
+        
+        if cache_name:
+            try:
+                response = await self.gemini_client.aio.models.generate_content(
+                    model=model,
+                    contents=contents,
+                    config=types.GenerateContentConfig(
+                        max_output_tokens=max_tokens,
+                        temperature=temperature,
+                        cached_content=cache_name
+                    )
+                )
+            except Exception as e:
+                # Most likely the cache expired server-side; drop it and send the prompt inline
+                self.logger.warning(f"Gemini cached content {cache_name} failed, retrying without cache: {e}")
+                self._gemini_cache_by_system.pop(self._system_hash(system_prompt), None)
+                cache_name = None
+        
+        if not cache_name:
+            response = await self.gemini_client.aio.models.generate_content(
+                model=model,
+                contents=contents,
+                config=types.GenerateContentConfig(
+                    max_output_tokens=max_tokens,
+                    temperature=temperature,
+                    system_instruction=system_prompt or None
+                )
             )
-        )
         
         return LLMResponse(
             content=response.text or "No response generated",
@@ -363,31 +709,235 @@ class MultiLLMProvider:
             success=True
         )
     
-    def _attempt_failover(self, messages: List[Dict], failed_provider: LLMProvider, max_tokens: int, temperature: float) -> LLMResponse:
-        """Attempt failover to alternative providers"""
+    def _system_hash(self, system_prompt: str) -> str:
+        """Key for per-system-prompt caches"""
+        return hashlib.sha256(system_prompt.encode()).hexdigest()
+    
+    async def _gemini_system_cache(self, model: str, system_prompt: str) -> Optional[str]:
+        """
+        Return a Gemini cached-content name holding system_prompt, creating it on first use
         
-        remaining_providers = [p for p in self.available_providers if p != failed_provider]
+        Prompts Gemini refuses to cache (e.g. below the minimum token count) are remembered
+        as uncacheable until the TTL passes, so they aren't retried on every call.
+        """
+        key = self._system_hash(system_prompt)
+        entry = self._gemini_cache_by_system.get(key)
+        now = time.monotonic()
+        if entry and entry[1] > now:
+            return entry[0]
+        
+        # Expire locally a minute early so requests never race the server-side TTL
+        expires_at = now + self.gemini_cache_ttl - 60
+        try:
+            cache = await self.gemini_client.aio.caches.create(
+                model=model,
+                config=types.CreateCachedContentConfig(
+                    system_instruction=system_prompt,
+                    ttl=f"{self.gemini_cache_ttl}s"
+                )
+            )
+            self._gemini_cache_by_system[key] = (cache.name, expires_at)
+            return cache.name
+        except Exception as e:
+            self.logger.info(f"Gemini system prompt not cacheable, sending inline: {e}")
+            self._gemini_cache_by_system[key] = (None, expires_at)
+            return None
+    
+    async def generate_batch(
+        self,
+        batches: List[List[Dict[str, str]]],
+        provider: Optional[LLMProvider] = None,
+        agent_type: Optional[str] = None,
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        max_concurrency: int = 16,
+        rate_limit_per_minute: Optional[int] = None,
+        on_progress: Optional[Callable[[int, int], None]] = None
+    ) -> List[Any]:
+        """
+        Generate responses for many message lists with bounded concurrency
         
-        for provider in remaining_providers:
-            try:
-                self.logger.info(f"Attempting failover to {provider.value}")
-                return self.generate_response(messages, provider, max_tokens, temperature)
-            except Exception as e:
-                self.logger.error(f"Failover to {provider.value} failed: {e}")
-                continue
+        Args:
+            batches: One message list per prompt
+            max_concurrency: Maximum number of requests in flight at once
+            rate_limit_per_minute: Optional cap on request starts per minute, to stay under provider 429s
+            on_progress: Called as on_progress(completed, total) after each response
+            
+        Returns:
+            Results in input order; a failed prompt yields its exception instead of an LLMResponse
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        interval = 60.0 / rate_limit_per_minute if rate_limit_per_minute else 0
+        schedule = {"next_start": 0.0, "completed": 0}
+        loop = asyncio.get_running_loop()
+        
+        async def one(messages):
+            async with semaphore:
+                if interval:
+                    # Reserve the next start slot, then wait for it
+                    now = loop.time()
+                    start = max(now, schedule["next_start"])
+                    schedule["next_start"] = start + interval
+                    await asyncio.sleep(start - now)
+                try:
+                    return await self.agenerate_response(messages, provider, agent_type, max_tokens, temperature)
+                finally:
+                    schedule["completed"] += 1
+                    if on_progress:
+                        on_progress(schedule["completed"], len(batches))
+        
+        return await asyncio.gather(*(one(messages) for messages in batches), return_exceptions=True)
+    
+    async def generate_bulk(
+        self,
+        batches: List[List[Dict[str, str]]],
+        provider: Optional[LLMProvider] = None,
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        mode: str = "offline",
+        poll_interval: float = 30.0,
+        max_poll_interval: float = 600.0
+    ) -> List[LLMResponse]:
+        """
+        Generate responses for a non-interactive prompt set
         
-        # All providers failed
-        return LLMResponse(
-            content="All LLM providers failed. Please check your API keys and try again.",
-            provider=failed_provider,
-            model="failed",
-            usage={},
-            success=False,
-            error="All providers failed"
+        mode="offline" submits the whole set to the provider's batch endpoint (OpenAI Batch API
+        or Anthropic Message Batches): half the token price, but results can take up to 24h.
+        mode="online" runs the set through generate_batch. Gemini has no batch path and always runs online.
+        
+        Returns:
+            One LLMResponse per prompt, in input order
+        """
+        if provider not in self.available_providers:
+            provider = self.available_providers[0] if self.available_providers else None
+        
+        if mode == "offline" and provider == LLMProvider.OPENAI:
+            return await self._openai_bulk(batches, max_tokens, temperature, poll_interval, max_poll_interval)
+        if mode == "offline" and provider == LLMProvider.ANTHROPIC:
+            return await self._anthropic_bulk(batches, max_tokens, temperature, poll_interval, max_poll_interval)
+        
+        results = await self.generate_batch(batches, provider, max_tokens=max_tokens, temperature=temperature)
+        return [
+            result if isinstance(result, LLMResponse) else LLMResponse(
+                content=f"Request failed: {result}",
+                provider=provider or LLMProvider.OPENAI,
+                model="failed",
+                usage={},
+                success=False,
+                error=str(result)
+            )
+            for result in results
+        ]
+    
+    async def _wait_for_batch(self, retrieve, is_done, poll_interval: float, max_poll_interval: float):
+        """Poll a batch job with exponential backoff until is_done(job)"""
+        delay = poll_interval
+        while True:
+            job = await retrieve()
+            if is_done(job):
+                return job
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, max_poll_interval)
+    
+    async def _openai_bulk(self, batches, max_tokens: int, temperature: float, poll_interval: float, max_poll_interval: float) -> List[LLMResponse]:
+        """Run a prompt set through the OpenAI Batch API"""
+        model = self.model_mappings[LLMProvider.OPENAI]
+        
+        lines = [
+            json.dumps({
+                "custom_id": str(i),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {"model": model, "messages": messages, "max_tokens": max_tokens, "temperature": temperature}
+            })
+            for i, messages in enumerate(batches)
+        ]
+        batch_file = await self.openai_client.files.create(
+            file=("batch.jsonl", "\n".join(lines).encode()),
+            purpose="batch"
+        )
+        job = await self.openai_client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
         )
+        self.logger.info(f"Submitted OpenAI batch {job.id} with {len(batches)} requests")
+        
+        job = await self._wait_for_batch(
+            lambda: self.openai_client.batches.retrieve(job.id),
+            lambda j: j.status in ("completed", "failed", "expired", "cancelled"),
+            poll_interval, max_poll_interval
+        )
+        
+        results = [None] * len(batches)
+        # Expired batches still return whatever finished before the window closed
+        if job.output_file_id:
+            output = await self.openai_client.files.content(job.output_file_id)
+            for line in output.text.splitlines():
+                if not line:
+                    continue
+                item = json.loads(line)
+                body = (item.get("response") or {}).get("body") or {}
+                if not body.get("choices"):
+                    continue
+                usage = body.get("usage") or {}
+                results[int(item["custom_id"])] = LLMResponse(
+                    content=body["choices"][0]["message"]["content"],
+                    provider=LLMProvider.OPENAI,
+                    model=model,
+                    usage={
+                        "prompt_tokens": usage.get("prompt_tokens", 0),
+                        "completion_tokens": usage.get("completion_tokens", 0),
+                        "total_tokens": usage.get("total_tokens", 0)
+                    },
+                    success=True
+                )
+        
+        return self._fill_bulk_failures(results, LLMProvider.OPENAI, f"OpenAI batch {job.id} {job.status}")
+    
+    async def _anthropic_bulk(self, batches, max_tokens: int, temperature: float, poll_interval: float, max_poll_interval: float) -> List[LLMResponse]:
+        """Run a prompt set through Anthropic Message Batches"""
+        model = self.model_mappings[LLMProvider.ANTHROPIC]
+        
+        job = await self.anthropic_client.messages.batches.create(requests=[
+            {"custom_id": str(i), "params": self._anthropic_params(messages, model, max_tokens, temperature)}
+            for i, messages in enumerate(batches)
+        ])
+        self.logger.info(f"Submitted Anthropic batch {job.id} with {len(batches)} requests")
+        
+        job = await self._wait_for_batch(
+            lambda: self.anthropic_client.messages.batches.retrieve(job.id),
+            lambda j: j.processing_status == "ended",
+            poll_interval, max_poll_interval
+        )
+        
+        results = [None] * len(batches)
+        async for item in await self.anthropic_client.messages.batches.results(job.id):
+            if item.result.type == "succeeded":
+                results[int(item.custom_id)] = self._anthropic_to_llm_response(item.result.message, model)
+        
+        return self._fill_bulk_failures(results, LLMProvider.ANTHROPIC, f"Anthropic batch {job.id} request did not succeed")
+    
+    def _fill_bulk_failures(self, results: List[Optional[LLMResponse]], provider: LLMProvider, error: str) -> List[LLMResponse]:
+        """Replace prompts missing from a batch's output with failed responses"""
+        return [
+            result or LLMResponse(
+                content="Batch request failed",
+                provider=provider,
+                model="failed",
+                usage={},
+                success=False,
+                error=error
+            )
+            for result in results
+        ]
     
     def test_all_providers(self) -> Dict[str, LLMResponse]:
-        """Test all available providers with a simple prompt"""
+        """Synchronous wrapper around atest_all_providers"""
+        return run_sync(self.atest_all_providers())
+    
+    async def atest_all_providers(self) -> Dict[str, LLMResponse]:
+        """Test all available providers with a simple prompt, calling them concurrently"""
         
         test_messages = [
             {
@@ -400,24 +950,28 @@ class MultiLLMProvider:
             }
         ]
         
-        results = {}
+        # Provider calls are network-bound, so wall-clock is the slowest provider rather than the sum
+        responses = await asyncio.gather(
+            *(self.agenerate_response(test_messages, provider, max_tokens=100, temperature=0.3)
+              for provider in self.available_providers),
+            return_exceptions=True
+        )
         
-        for provider in self.available_providers:
-            try:
-                response = self.generate_response(test_messages, provider, max_tokens=100, temperature=0.3)
-                results[provider.value] = response
-                self.logger.info(f"Test successful for {provider.value}: {response.success}")
-            except Exception as e:
-                results[provider.value] = LLMResponse(
-                    content=f"Test failed: {str(e)}",
+        results = {}
+        for provider, response in zip(self.available_providers, responses):
+            if isinstance(response, Exception):
+                self.logger.error(f"Test failed for {provider.value}: {response}")
+                response = LLMResponse(
+                    content=f"Test failed: {str(response)}",
                     provider=provider,
                     model="test_failed",
                     usage={},
                     success=False,
-                    error=str(e)
+                    error=str(response)
                 )
-                self.logger.error(f"Test failed for {provider.value}: {e}")
-        
+            else:
+                self.logger.info(f"Test successful for {provider.value}: {response.success}")
+            results[provider.value] = response
         return results
     
     def get_provider_status(self) -> Dict[str, Any]:
@@ -427,9 +981,7 @@ class MultiLLMProvider:
             "total_providers": len(self.available_providers),
             "model_mappings": {p.value: self.model_mappings[p] for p in self.available_providers},
             "initialization_status": {
-                "openai": self.openai_client is not None,
-                "anthropic": self.anthropic_client is not None,
-                "gemini": self.gemini_client is not None
+                provider.value: provider in self._api_keys for provider in LLMProvider
             }
         }
 
@@ -3,19 +3,27 @@ Real-time notification system for admin monitoring
 """
 
 import os
+import time
+import atexit
 import logging
 import smtplib
+import threading
 from datetime import datetime, timedelta
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+from email.message import EmailMessage
+from typing import List, Dict, Any, Optional, Deque
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 import json
+from collections import deque, namedtuple
+from itertools import count, islice
 
 from flask_socketio import SocketIO, emit
-from sqlalchemy import func, and_
-from main import db, Conversation, ConversationEntry
+from sqlalchemy import func, and_, or_, case, select, text
+from models import db, Conversation
+
+# Connectivity probe, built once so its compiled form is reused from the statement cache
+SELECT_ONE = text('SELECT 1')
 
 
 class NotificationLevel(Enum):
@@ -34,17 +42,60 @@ class Notification:
     timestamp: datetime
     data: Optional[Dict] = None
     acknowledged: bool = False
+    # Wire form built once; the dashboard polls the same notifications repeatedly
+    _json: Dict = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self._json = {
+            'id': self.id,
+            'title': self.title,
+            'message': self.message,
+            'level': self.level.value,
+            'timestamp': self.timestamp.isoformat(),
+            'data': self.data
+        }
 
 
 class NotificationManager:
     """Manages real-time notifications and alerts"""
     
+    _LOG_LEVELS = {
+        NotificationLevel.INFO: logging.INFO,
+        NotificationLevel.WARNING: logging.WARNING,
+        NotificationLevel.ERROR: logging.ERROR,
+        NotificationLevel.CRITICAL: logging.CRITICAL
+    }
+    
+    # Levels that may trigger an email alert
+    _ALERT_LEVELS = frozenset({NotificationLevel.ERROR, NotificationLevel.CRITICAL})
+    
     def __init__(self, socketio: SocketIO = None):
         self.socketio = socketio
-        self.notifications: List[Notification] = []
         self.max_notifications = 100
+        # Newest first; the deque drops the oldest once max_notifications is reached
+        self.notifications: Deque[Notification] = deque(maxlen=self.max_notifications)
+        self._by_id: Dict[str, Notification] = {}
+        # Ids are a per-process counter plus a random per-process suffix, so ids stay unique
+        # within a process and ids from before a restart can't match new notifications
+        self._id_seq = count()
+        self._id_suffix = os.urandom(3).hex()
+        # (title, level) -> monotonic time last raised, for notifications added with dedupe=True
+        self._recent_alerts: Dict[tuple, float] = {}
+        self.dedupe_ttl = 600
         self.email_enabled = bool(os.environ.get('SMTP_SERVER'))
+        # WebSocket payloads waiting to go out as one batched emit
+        self._pending = deque()
+        self._pending_lock = threading.Lock()
+        self._flush_scheduled = False
+        self.emit_interval = 0.05
+        self.emit_batch_size = 32
+        # Persistent SMTP connection reused across alerts; guarded since alerts fire from any request thread
+        self._smtp = None
+        self._smtp_lock = threading.Lock()
+        # Alerts are sent off the caller's thread; one worker keeps sends ordered on the shared session
+        self._mail_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='notif-smtp')
         self.setup_email()
+        atexit.register(self.close_smtp)
     
     def setup_email(self):
         """Setup email configuration"""
@@ -56,12 +107,42 @@ class NotificationManager:
             self.from_email = os.environ.get('FROM_EMAIL', self.smtp_username)
             self.admin_emails = os.environ.get('ADMIN_EMAILS', '').split(',')
             self.admin_emails = [email.strip() for email in self.admin_emails if email.strip()]
+        self._email_configured = self.email_enabled and bool(self.admin_emails)
+    
+    def warm_smtp(self):
+        """
+        Open the SMTP session ahead of the first alert, on the mail worker so the caller doesn't wait
+        
+        Only the app-wide manager is warmed; other instances connect on their first alert.
+        """
+        if self._email_configured:
+            self._mail_pool.submit(self._warm_smtp)
+    
+    def _warm_smtp(self):
+        """Open the SMTP session unless one is already open; on failure the first send retries"""
+        with self._smtp_lock:
+            if self._smtp is not None:
+                return
+            try:
+                self._smtp = self._open_smtp()
+            except (smtplib.SMTPException, OSError) as e:
+                logging.warning(f"Could not pre-open SMTP session: {str(e)}")
+                self._smtp = None
     
     def add_notification(self, title: str, message: str, level: NotificationLevel, 
-                        data: Optional[Dict] = None, send_email: bool = False):
-        """Add a new notification"""
+                        data: Optional[Dict] = None, send_email: bool = False, dedupe: bool = False):
+        """
+        Add a new notification
+        
+        With dedupe=True, a repeat of the same title and level within dedupe_ttl seconds
+        is dropped and None is returned; a higher level is a different key, so escalations
+        still go out.
+        """
+        if dedupe and self._seen_recently(title, level):
+            return None
+        
         notification = Notification(
-            id=f"notif_{datetime.utcnow().timestamp()}",
+            id=f"notif_{next(self._id_seq):x}_{self._id_suffix}",
             title=title,
             message=message,
             level=level,
@@ -69,46 +150,84 @@ class NotificationManager:
             data=data or {}
         )
         
-        self.notifications.insert(0, notification)
-        
-        # Keep only latest notifications
-        if len(self.notifications) > self.max_notifications:
-            self.notifications = self.notifications[:self.max_notifications]
+        if len(self.notifications) == self.max_notifications:
+            # appendleft is about to evict the oldest; drop it from the id index too
+            self._by_id.pop(self.notifications[-1].id, None)
+        self.notifications.appendleft(notification)
+        self._by_id[notification.id] = notification
         
         # Send real-time notification via WebSocket
         if self.socketio:
-            self.socketio.emit('admin_notification', {
-                'id': notification.id,
-                'title': notification.title,
-                'message': notification.message,
-                'level': notification.level.value,
-                'timestamp': notification.timestamp.isoformat(),
-                'data': notification.data
-            }, namespace='/admin')
+            self._queue_emit(notification._json)
         
         # Send email for critical/error notifications
-        if send_email and level in [NotificationLevel.ERROR, NotificationLevel.CRITICAL]:
-            self.send_email_alert(notification)
-        
-        # Log notification
-        log_level = {
-            NotificationLevel.INFO: logging.info,
-            NotificationLevel.WARNING: logging.warning,
-            NotificationLevel.ERROR: logging.error,
-            NotificationLevel.CRITICAL: logging.critical
-        }[level]
+        if send_email and self._email_configured and level in self._ALERT_LEVELS:
+            self._mail_pool.submit(self.send_email_alert, notification)
         
-        log_level(f"Admin notification: {title} - {message}")
+        # Log notification, skipping the message formatting when the level is filtered out
+        log_level = self._LOG_LEVELS[level]
+        if logging.getLogger().isEnabledFor(log_level):
+            logging.log(log_level, f"Admin notification: {title} - {message}")
         
         return notification
     
+    def _seen_recently(self, title: str, level: NotificationLevel) -> bool:
+        """Record a (title, level) alert, reporting whether it already fired within dedupe_ttl"""
+        now = time.monotonic()
+        expired = [key for key, seen in self._recent_alerts.items() if now - seen >= self.dedupe_ttl]
+        for key in expired:
+            del self._recent_alerts[key]
+        
+        key = (title, level)
+        if key in self._recent_alerts:
+            return True
+        self._recent_alerts[key] = now
+        return False
+    
+    def _queue_emit(self, payload: Dict):
+        """Queue a WebSocket payload; bursts go out together after emit_interval or once emit_batch_size is reached"""
+        batch = None
+        schedule = False
+        with self._pending_lock:
+            self._pending.append(payload)
+            if len(self._pending) >= self.emit_batch_size:
+                batch = list(self._pending)
+                self._pending.clear()
+            elif not self._flush_scheduled:
+                self._flush_scheduled = schedule = True
+        
+        if batch:
+            self._emit_batch(batch)
+        elif schedule:
+            self.socketio.start_background_task(self._flush_pending)
+    
+    def _flush_pending(self):
+        """Background task: wait out the batching window, then emit everything queued"""
+        self.socketio.sleep(self.emit_interval)
+        with self._pending_lock:
+            batch = list(self._pending)
+            self._pending.clear()
+            self._flush_scheduled = False
+        if batch:
+            self._emit_batch(batch)
+    
+    def _emit_batch(self, batch: List[Dict]):
+        """Emit queued payloads, keeping the single-notification event for lone notifications"""
+        try:
+            if len(batch) == 1:
+                self.socketio.emit('admin_notification', batch[0], namespace='/admin', to='admin')
+            else:
+                self.socketio.emit('admin_notifications_batch', batch, namespace='/admin', to='admin')
+        except Exception as e:
+            logging.error(f"Failed to emit admin notifications: {str(e)}")
+    
     def send_email_alert(self, notification: Notification):
         """Send email alert for critical notifications"""
         if not self.email_enabled or not self.admin_emails:
             return
         
         try:
-            msg = MIMEMultipart()
+            msg = EmailMessage()
             msg['From'] = self.from_email
             msg['To'] = ', '.join(self.admin_emails)
             msg['Subject'] = f"[{notification.level.value.upper()}] Multi-Agent AI System Alert: {notification.title}"
@@ -124,60 +243,106 @@ Message:
 {notification.message}
 
 Additional Data:
-{json.dumps(notification.data, indent=2) if notification.data else 'None'}
+{self._fmt_data(notification.data)}
 
 Please check the admin dashboard for more details: /admin/dashboard
 
 This is an automated message from the Multi-Agent AI System monitoring.
             """
             
-            msg.attach(MIMEText(body, 'plain'))
+            msg.set_content(body)
             
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-            server.starttls()
-            server.login(self.smtp_username, self.smtp_password)
-            server.send_message(msg)
-            server.quit()
+            with self._smtp_lock:
+                try:
+                    self._get_smtp().send_message(msg)
+                except smtplib.SMTPServerDisconnected:
+                    # Dropped between the health check and the send; reconnect once
+                    self._smtp = None
+                    self._get_smtp().send_message(msg)
             
             logging.info(f"Email alert sent for notification: {notification.title}")
             
         except Exception as e:
             logging.error(f"Failed to send email alert: {str(e)}")
     
+    @staticmethod
+    def _fmt_data(data: Optional[Dict]) -> str:
+        """Format notification data for an email body, pretty-printing only larger payloads"""
+        if not data:
+            return 'None'
+        if len(data) <= 3:
+            return ', '.join(f'{key}={value!r}' for key, value in data.items())
+        # default=str so datetimes and other non-JSON values don't abort the alert
+        return json.dumps(data, indent=2, default=str)
+    
+    def _open_smtp(self) -> smtplib.SMTP:
+        """Connect, STARTTLS and authenticate a new SMTP session"""
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=10)
+        server.starttls()
+        server.login(self.smtp_username, self.smtp_password)
+        return server
+    
+    def _get_smtp(self) -> smtplib.SMTP:
+        """Return the cached SMTP session, reconnecting if the server has dropped it"""
+        if self._smtp is not None:
+            try:
+                self._smtp.noop()
+                return self._smtp
+            except (smtplib.SMTPException, OSError):
+                self._smtp = None
+        
+        self._smtp = self._open_smtp()
+        return self._smtp
+    
+    def close_smtp(self):
+        """Close the cached SMTP session"""
+        with self._smtp_lock:
+            if self._smtp is not None:
+                try:
+                    self._smtp.quit()
+                except (smtplib.SMTPException, OSError):
+                    pass
+                self._smtp = None
+    
     def get_notifications(self, limit: int = 50, level: Optional[NotificationLevel] = None) -> List[Dict]:
         """Get recent notifications"""
-        notifications = self.notifications[:limit]
+        notifications = list(islice(self.notifications, limit))
         
         if level:
             notifications = [n for n in notifications if n.level == level]
         
-        return [
-            {
-                'id': n.id,
-                'title': n.title,
-                'message': n.message,
-                'level': n.level.value,
-                'timestamp': n.timestamp.isoformat(),
-                'data': n.data,
-                'acknowledged': n.acknowledged
-            }
-            for n in notifications
-        ]
+        return [{**n._json, 'acknowledged': n.acknowledged} for n in notifications]
     
     def acknowledge_notification(self, notification_id: str) -> bool:
         """Mark notification as acknowledged"""
-        for notification in self.notifications:
-            if notification.id == notification_id:
-                notification.acknowledged = True
-                return True
+        notification = self._by_id.get(notification_id)
+        if notification:
+            notification.acknowledged = True
+            return True
         return False
     
     def clear_notifications(self, level: Optional[NotificationLevel] = None):
         """Clear notifications"""
         if level:
-            self.notifications = [n for n in self.notifications if n.level != level]
+            self.notifications = deque(
+                (n for n in self.notifications if n.level != level), maxlen=self.max_notifications
+            )
+            self._by_id = {n.id: n for n in self.notifications}
         else:
-            self.notifications = []
+            self.notifications.clear()
+            self._by_id.clear()
+
+
+# Every count the health checks need, gathered by one query
+HealthMetrics = namedtuple('HealthMetrics', [
+    'stale',                   # incomplete and not updated in 2h
+    'recent_24h',              # created in the last 24h
+    'completed_24h',           # ... of which complete
+    'completed_1h',            # completed (updated) in the last hour
+    'avg_completion_seconds',  # ... their average created -> updated time
+    'recent_1h',               # created in the last hour
+    'stuck_1h',                # ... of which still at the first agent
+])
 
 
 class SystemMonitor:
@@ -196,24 +361,25 @@ class SystemMonitor:
     def check_system_health(self):
         """Perform comprehensive system health check"""
         try:
-            current_time = datetime.utcnow()
+            now = datetime.utcnow()
+            metrics = self._collect_health_metrics(now)
             
             # Check for stale conversations
-            self.check_stale_conversations()
+            self.check_stale_conversations(metrics)
             
             # Check completion rates
-            self.check_completion_rates()
+            self.check_completion_rates(metrics)
             
             # Check response times
-            self.check_response_times()
+            self.check_response_times(metrics)
             
             # Check database connectivity
             self.check_database_health()
             
             # Check recent errors
-            self.check_error_patterns()
+            self.check_error_patterns(metrics)
             
-            self.last_check = current_time
+            self.last_check = now
             
         except Exception as e:
             self.notification_manager.add_notification(
@@ -221,19 +387,52 @@ class SystemMonitor:
                 f"Failed to perform system health check: {str(e)}",
                 NotificationLevel.ERROR,
                 {"error": str(e)},
-                send_email=True
+                send_email=True,
+                dedupe=True
             )
     
-    def check_stale_conversations(self):
-        """Check for conversations that have been stuck"""
-        cutoff_time = datetime.utcnow() - timedelta(hours=2)
+    def _duration_seconds(self):
+        """SQL expression for a conversation's created -> updated time in seconds"""
+        if db.engine.dialect.name == 'postgresql':
+            return func.extract('epoch', Conversation.updated_at - Conversation.created_at)
+        return (func.julianday(Conversation.updated_at) - func.julianday(Conversation.created_at)) * 86400
+    
+    def _collect_health_metrics(self, now: datetime) -> HealthMetrics:
+        """Compute every health-check count as of now with conditional aggregates in a single query"""
+        stale_cutoff = now - timedelta(hours=2)
+        day_cutoff = now - timedelta(hours=24)
+        hour_cutoff = now - timedelta(hours=1)
         
-        stale_count = Conversation.query.filter(
-            and_(
-                Conversation.is_complete == False,
-                Conversation.updated_at < cutoff_time
-            )
-        ).count()
+        is_stale = and_(Conversation.is_complete == False, Conversation.updated_at < stale_cutoff)
+        in_day = Conversation.created_at >= day_cutoff
+        in_hour = Conversation.created_at >= hour_cutoff
+        completed_in_hour = and_(Conversation.updated_at >= hour_cutoff, Conversation.is_complete == True)
+        
+        row = db.session.execute(select(
+            func.count(case((is_stale, 1))).label('stale'),
+            func.count(case((in_day, 1))).label('recent_24h'),
+            func.count(case((and_(in_day, Conversation.is_complete == True), 1))).label('completed_24h'),
+            func.count(case((completed_in_hour, 1))).label('completed_1h'),
+            func.avg(case((completed_in_hour, self._duration_seconds()))).label('avg_completion_seconds'),
+            func.count(case((in_hour, 1))).label('recent_1h'),
+            func.count(case((
+                and_(in_hour, Conversation.current_agent_index == 0, Conversation.is_complete == False), 1
+            ))).label('stuck_1h')
+        ).where(
+            # Only rows some check looks at, so the indexes on created_at/updated_at can bound the scan
+            or_(is_stale, in_day, Conversation.updated_at >= hour_cutoff)
+        )).one()
+        
+        # AVG comes back as Decimal on PostgreSQL, which the notification JSON can't encode
+        avg_seconds = float(row.avg_completion_seconds) if row.avg_completion_seconds is not None else 0.0
+        return HealthMetrics(
+            row.stale, row.recent_24h, row.completed_24h, row.completed_1h,
+            avg_seconds, row.recent_1h, row.stuck_1h
+        )
+    
+    def check_stale_conversations(self, metrics: HealthMetrics):
+        """Check for conversations that have been stuck"""
+        stale_count = metrics.stale
         
         if stale_count > self.thresholds['max_stale_conversations']:
             self.notification_manager.add_notification(
@@ -241,24 +440,16 @@ class SystemMonitor:
                 f"Found {stale_count} conversations that haven't been updated in over 2 hours",
                 NotificationLevel.WARNING,
                 {"stale_count": stale_count, "threshold": self.thresholds['max_stale_conversations']},
-                send_email=True
+                send_email=True,
+                dedupe=True
             )
     
-    def check_completion_rates(self):
+    def check_completion_rates(self, metrics: HealthMetrics):
         """Check conversation completion rates"""
-        recent_cutoff = datetime.utcnow() - timedelta(hours=24)
-        
-        total_recent = Conversation.query.filter(
-            Conversation.created_at >= recent_cutoff
-        ).count()
+        total_recent = metrics.recent_24h
         
         if total_recent > 5:  # Only check if we have sufficient data
-            completed_recent = Conversation.query.filter(
-                and_(
-                    Conversation.created_at >= recent_cutoff,
-                    Conversation.is_complete == True
-                )
-            ).count()
+            completed_recent = metrics.completed_24h
             
             completion_rate = completed_recent / total_recent if total_recent > 0 else 0
             
@@ -273,28 +464,16 @@ class SystemMonitor:
                         "total": total_recent,
                         "threshold": self.thresholds['min_completion_rate']
                     },
-                    send_email=True
+                    send_email=True,
+                    dedupe=True
                 )
     
-    def check_response_times(self):
+    def check_response_times(self, metrics: HealthMetrics):
         """Check average response times"""
-        recent_cutoff = datetime.utcnow() - timedelta(hours=1)
+        sample_size = metrics.completed_1h
         
-        # Get recent completed conversations
-        recent_conversations = Conversation.query.filter(
-            and_(
-                Conversation.updated_at >= recent_cutoff,
-                Conversation.is_complete == True
-            )
-        ).all()
-        
-        if len(recent_conversations) > 3:  # Only check if we have sufficient data
-            total_time = 0
-            for conv in recent_conversations:
-                completion_time = (conv.updated_at - conv.created_at).total_seconds()
-                total_time += completion_time
-            
-            avg_response_time = total_time / len(recent_conversations)
+        if sample_size > 3:  # Only check if we have sufficient data
+            avg_response_time = metrics.avg_completion_seconds
             
             if avg_response_time > self.thresholds['max_avg_response_time']:
                 self.notification_manager.add_notification(
@@ -304,27 +483,29 @@ class SystemMonitor:
                     {
                         "avg_response_time": avg_response_time,
                         "threshold": self.thresholds['max_avg_response_time'],
-                        "sample_size": len(recent_conversations)
-                    }
+                        "sample_size": sample_size
+                    },
+                    dedupe=True
                 )
     
     def check_database_health(self):
         """Check database connectivity and performance"""
         try:
             # Test basic query
-            from sqlalchemy import text
-            db.session.execute(text('SELECT 1'))
+            db.session.execute(SELECT_ONE)
             
             # Check for connection pool issues
-            pool_size = db.engine.pool.size()
-            checked_out = db.engine.pool.checkedout()
+            pool = db.engine.pool
+            pool_size = pool.size()
+            checked_out = pool.checkedout()
             
             if checked_out > pool_size * 0.8:  # 80% of pool used
                 self.notification_manager.add_notification(
                     "Database Connection Pool Warning",
                     f"High database connection usage: {checked_out}/{pool_size} connections in use",
                     NotificationLevel.WARNING,
-                    {"checked_out": checked_out, "pool_size": pool_size}
+                    {"checked_out": checked_out, "pool_size": pool_size},
+                    dedupe=True
                 )
                 
         except Exception as e:
@@ -333,37 +514,36 @@ class SystemMonitor:
                 f"Database connectivity issue: {str(e)}",
                 NotificationLevel.CRITICAL,
                 {"error": str(e)},
-                send_email=True
+                send_email=True,
+                dedupe=True
             )
     
-    def check_error_patterns(self):
+    def check_error_patterns(self, metrics: HealthMetrics):
         """Check for error patterns in recent activity"""
         # This would typically analyze application logs
-        # For now, we'll check for recent failed conversations
-        recent_cutoff = datetime.utcnow() - timedelta(hours=1)
-        
-        # Find conversations that started recently but haven't progressed
-        stuck_conversations = Conversation.query.filter(
-            and_(
-                Conversation.created_at >= recent_cutoff,
-                Conversation.current_agent_index == 0,
-                Conversation.is_complete == False
-            )
-        ).count()
-        
-        total_recent = Conversation.query.filter(
-            Conversation.created_at >= recent_cutoff
-        ).count()
+        # For now, we'll check for recent conversations that started but haven't progressed
+        stuck_conversations = metrics.stuck_1h
+        total_recent = metrics.recent_1h
         
         if total_recent > 5 and stuck_conversations > total_recent * 0.2:  # 20% stuck
             self.notification_manager.add_notification(
                 "High Number of Stuck Conversations",
                 f"{stuck_conversations} of {total_recent} recent conversations appear stuck at the first agent",
                 NotificationLevel.WARNING,
-                {"stuck_count": stuck_conversations, "total_recent": total_recent}
+                {"stuck_count": stuck_conversations, "total_recent": total_recent},
+                dedupe=True
             )
 
 
-# Global notification manager instance
-notification_manager = NotificationManager()
-system_monitor = SystemMonitor(notification_manager)
\ No newline at end of file
+# Global instances, created by init_notifications() once the app and SocketIO exist
+notification_manager: Optional[NotificationManager] = None
+system_monitor: Optional[SystemMonitor] = None
+
+def init_notifications(app, socketio: SocketIO):
+    """Create the notification manager and system monitor for app and register them on it"""
+    global notification_manager, system_monitor
+    notification_manager = NotificationManager(socketio)
+    notification_manager.warm_smtp()
+    system_monitor = SystemMonitor(notification_manager)
+    app.extensions['notifications'] = (notification_manager, system_monitor)
+    return notification_manager, system_monitor
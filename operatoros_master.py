@@ -4,14 +4,71 @@ Coordinates C-Suite of AI agents for complete autonomy and financial independenc
 Enhanced with OperatorOS Production Memory Foundation Layer
 """
 import os
+import re
+import json
+import time
+import asyncio
 import logging
-from typing import Dict, Any, Optional, List
+import threading
+import statistics
+from functools import cached_property
+from dataclasses import dataclass, replace
+from collections import deque
+from typing import Dict, Any, Optional, List, Callable, AsyncIterator
 from datetime import datetime
-from openai import OpenAI
+import openai
+from openai import AsyncOpenAI
 from config import Config
-from models import db, Conversation, ConversationEntry, DynamicAgent
-from dynamic_agent_creator import DynamicAgentCreator
+from models import db, Conversation, ConversationEntry, DynamicAgent, OperatorOSContext
+from dynamic_agent_creator import get_agent_creator
 from operatoros_memory import OperatorOSMemory
+from utils.async_runtime import run_sync, shared_http_for
+
+# Prompts follow the prompt-cache invariant described in multi_llm_provider: the per-agent system
+# prompts are built once in __init__, and the progress snapshot and request follow as user messages.
+
+# User context fields a briefing prompt needs; the rest of user_context stays out of prompts
+_PROMPT_CONTEXT_KEYS = (
+    'autonomy_progress', 'financial_independence_months', 'automation_percentage', 'passive_income_monthly'
+)
+
+# Runs of anything but letters, digits, $ and %, collapsed when normalizing cache keys
+_CACHE_KEY_SEP_RE = re.compile(r'[^\w$%]+')
+
+# Simple keyword-based routing (in production, would use more sophisticated NLP)
+_ROUTING_KEYWORDS = {
+    'CFO': ['money', 'investment', 'financial', 'wealth', 'income', 'budget', 'savings', 'debt'],
+    'COO': ['routine', 'productivity', 'efficiency', 'time', 'schedule', 'operations', 'automation'],
+    'CSA': ['strategy', 'goal', 'plan', 'vision', 'future', 'decision', 'autonomy', 'independence'],
+    'CMO': ['brand', 'network', 'influence', 'marketing', 'content', 'audience', 'social'],
+    'CTO': ['technology', 'automation', 'app', 'tool', 'system', 'digital', 'tech'],
+    'CPO': ['health', 'fitness', 'learning', 'development', 'relationship', 'wellness'],
+    'CIO': ['analysis', 'data', 'pattern', 'insight', 'decision', 'intelligence']
+}
+
+# (keyword, agents it scores for), so a keyword shared by two agents is scanned for once
+_ROUTING_TABLE = tuple(
+    (keyword, tuple(agent for agent, keywords in _ROUTING_KEYWORDS.items() if keyword in keywords))
+    for keyword in dict.fromkeys(k for keywords in _ROUTING_KEYWORDS.values() for k in keywords)
+)
+
+# Fields of an agent's daily briefing reply
+_ACTION_RE = re.compile(r'ACTION:\s*(.+)', re.IGNORECASE)
+_IMPACT_RE = re.compile(r'IMPACT:\s*(\d+)', re.IGNORECASE)
+_URGENCY_RE = re.compile(r'URGENCY:\s*(\d+)', re.IGNORECASE)
+
+# One instance from _response_cache is handed to every request that hits it (hits are derived
+# with dataclasses.replace), so results are frozen rather than copied per request
+@dataclass(slots=True, frozen=True)
+class AgentResult:
+    response: str
+    success: bool
+    type: Optional[str] = None
+    tokens_used: int = 0
+    agent: Optional[str] = None
+    error: Optional[str] = None
+    agent_data: Optional[Dict[str, Any]] = None  # Set for dynamic agent creation
+    cache_hit: bool = False
 
 class OperatorOSMaster:
     """
@@ -19,11 +76,113 @@ class OperatorOSMaster:
     Coordinates 7 specialized C-Suite agents for complete life automation
     """
     
+    # System prompt for multi-agent collaborative analysis
+    _MULTI_AGENT_SYSTEM_PROMPT = """You are the OperatorOS Master Agent facilitating collaboration between C-Suite agents.
+
+Provide comprehensive analysis from multiple agent perspectives:
+- Financial implications and opportunities
+- Operational considerations and efficiency
+- Strategic alignment with autonomy goals
+- Cross-domain impacts and synergies
+
+Synthesize recommendations into coordinated action plans that advance overall autonomy and independence.
+
+Analyze each request from the CFO (financial), COO (operational), CSA (strategic), and CIO (synthesis) perspectives.
+Focus on autonomy and independence implications."""
+    
+    # Reply to the first activation of OperatorOS
+    _ACTIVATION_MSG = """🚀 OPERATOROS ACTIVATED
+
+Your personal life operating system is now online. I'm your Master Agent coordinating your C-Suite of AI executives focused on achieving complete freedom and optimization.
+
+Ready to transform your life across all domains:
+💰 Financial independence and wealth building for any income level
+⚙️ Life automation and peak performance optimization
+🎯 Strategic planning for your unique autonomy goals
+🎨 Personal brand and income generation strategies
+💻 Technology automation and productivity systems
+🌱 Health, wellness, and sustainable performance
+🧠 Intelligence synthesis and better decision-making
+
+Whether you're a student, professional, parent, entrepreneur, or anyone seeking more freedom - your personal AI executive team is ready.
+
+**Universal Options:**
+- Daily optimization briefing for your situation
+- Specific agent consultation (@CFO, @COO, @CSA, etc.)
+- Financial independence planning (any income level)
+- Life automation and productivity setup
+- Career acceleration and transition strategies
+- Location independence and remote optimization
+
+Your path to complete autonomy starts now. What's your first move?"""
+    
+    # NRT specialization per C-Suite agent
+    _NRT_FOCUS = {
+        'CFO': """Financial NRT Focus: Revenue transition from salary to location-independent income
+- Actions that replace salary income fastest
+- Minimize financial risk during transition  
+- Build emergency fund for nomad transition
+- Optimize for tax efficiency and international banking""",
+        
+        'COO': """Operations NRT Focus: Life systems that enable location independence
+- Actions that make you location-agnostic fastest
+- Digitize all necessary life operations
+- Eliminate location-dependent commitments
+- Build remote work capabilities""",
+        
+        'CSA': """Strategy NRT Focus: Fastest path to sustainable nomad lifestyle
+- Actions with highest impact on nomad timeline
+- Risk mitigation for transition period
+- Market validation for nomad income streams
+- Geographic and legal strategy""",
+        
+        'CMO': """Marketing NRT Focus: Personal brand and client acquisition for nomad income
+- Actions that build nomad-compatible client base fastest
+- Online presence that works globally
+- Network building for location-independent opportunities
+- Content strategy for nomad audience""",
+        
+        'CTO': """Technology NRT Focus: Tech stack for nomad lifestyle and income generation
+- Tools that enable work from anywhere
+- Income-generating technology setup
+- Communication and productivity optimization
+- Security and backup systems for nomad life""",
+        
+        'CPO': """People/Personal NRT Focus: Personal optimization for nomad transition
+- Health and wellness systems that travel
+- Relationship management during transition
+- Skill development for nomad success
+- Mental/emotional preparation for lifestyle change""",
+        
+        'CIO': """Intelligence NRT Focus: Data-driven decisions for nomad transition
+- Analyze progress toward nomad readiness
+- Identify bottlenecks in transition timeline
+- Synthesize insights across all domains
+- Predict and mitigate transition risks"""
+    }
+    
     def __init__(self):
-        self.client = OpenAI(api_key=os.environ.get('OPENAI_API_KEY'))
+        # Successful responses keyed by (namespace, normalized input) -> (expires_at, result)
+        self._response_cache: Dict[tuple, tuple] = {}
+        self.response_cache_ttl = 3600
+        self.response_cache_max_entries = 1024
+        self.response_cache_stats = {"hits": 0, "misses": 0}
+        
+        # Model and output budget per call type; max_tokens here is the ceiling for adaptive tuning
+        self._call_profiles = {
+            'briefing': {'model': 'gpt-4o-mini', 'max_tokens': 160},  # one NRT line per agent
+            'agent': {'model': 'gpt-4o-mini', 'max_tokens': 400},
+            'multi': {'model': 'gpt-4o', 'max_tokens': 800}
+        }
+        # Adaptive mode trims each profile's max_tokens to its observed P95 completion length plus headroom
+        self.adaptive_max_tokens = True
+        self.adaptive_min_samples = 50
+        self.adaptive_headroom = 1.25
+        self._max_tokens = {profile: spec['max_tokens'] for profile, spec in self._call_profiles.items()}
+        self._completion_tokens = {profile: deque(maxlen=500) for profile in self._call_profiles}
         
         # Initialize dynamic agent creator
-        self.dynamic_creator = DynamicAgentCreator()
+        self.dynamic_creator = get_agent_creator()
         
         # Initialize C-Suite agent definitions
         self.agents = {
@@ -92,7 +251,11 @@ class OperatorOSMaster:
             }
         }
         
-        # Persistent memory for user context (in production, this would be stored in database)
+        # Prompts depend only on the agent definitions, so they are built once rather than per request
+        self._agent_system_prompts = {code: self._build_agent_system_prompt(code) for code in self.agents}
+        self._briefing_system_prompts = {code: self._build_briefing_system_prompt(code) for code in self.agents}
+        
+        # User context, persisted to operatoros_context; see update_user_context / flush_user_context
         self.user_context = {
             'autonomy_progress': 0,  # Percentage toward complete independence
             'financial_independence_months': 24,  # Estimated months to financial independence
@@ -103,204 +266,572 @@ class OperatorOSMaster:
             'goals': {},
             'timeline': {}
         }
+        # Updated keys not yet written, flushed together in one transaction
+        self._pending_context: Dict[str, Any] = {}
+        self._context_lock = threading.Lock()
+        self.context_flush_threshold = 20
+    
+    @cached_property
+    def aclient(self) -> AsyncOpenAI:
+        """Async OpenAI client shared by every call on this instance, built on first use"""
+        return AsyncOpenAI(api_key=os.environ.get('OPENAI_API_KEY'), http_client=shared_http_for(openai))
     
     def activate_operatoros(self) -> str:
         """Initial activation response when OperatorOS is first started"""
-        return """🚀 OPERATOROS ACTIVATED
+        return self._ACTIVATION_MSG
 
-Your personal life operating system is now online. I'm your Master Agent coordinating your C-Suite of AI executives focused on achieving complete freedom and optimization.
-
-Ready to transform your life across all domains:
-💰 Financial independence and wealth building for any income level
-⚙️ Life automation and peak performance optimization
-🎯 Strategic planning for your unique autonomy goals
-🎨 Personal brand and income generation strategies
-💻 Technology automation and productivity systems
-🌱 Health, wellness, and sustainable performance
-🧠 Intelligence synthesis and better decision-making
-
-Whether you're a student, professional, parent, entrepreneur, or anyone seeking more freedom - your personal AI executive team is ready.
-
-**Universal Options:**
-- Daily optimization briefing for your situation
-- Specific agent consultation (@CFO, @COO, @CSA, etc.)
-- Financial independence planning (any income level)
-- Life automation and productivity setup
-- Career acceleration and transition strategies
-- Location independence and remote optimization
-
-Your path to complete autonomy starts now. What's your first move?"""
-
-    def daily_autonomy_briefing(self, user_input: str = None) -> Dict[str, Any]:
+    def daily_autonomy_briefing(self, user_input: str = None) -> AgentResult:
         """Generate NRT-focused daily briefing for universal life optimization"""
+        result = run_sync(self.adaily_autonomy_briefing(user_input))
+        # End of a briefing is the natural checkpoint for context updates buffered since the last one
+        self.flush_user_context()
+        return result
+    
+    async def adaily_autonomy_briefing(self, user_input: str = None) -> AgentResult:
+        """
+        Async version of daily_autonomy_briefing
         
-        briefing_prompt = f"""
-        Generate a DAILY NRT BRIEFING for universal life optimization and autonomy achievement.
+        Each C-Suite agent produces its own NRT line in a separate concurrent call, so
+        the briefing takes as long as the slowest agent rather than one long completion.
+        """
+        context_message = self._context_message()
+        results = await asyncio.gather(*(
+            self.aclient.chat.completions.create(**self._briefing_request(agent_code, context_message, user_input))
+            for agent_code in self.agents
+        ), return_exceptions=True)
         
-        User context: {user_input if user_input else "Life optimization check-in"}
-        Current autonomy progress: {self.user_context['autonomy_progress']}%
+        return self._assemble_briefing([
+            result if isinstance(result, Exception) else (
+                result.choices[0].message.content or "",
+                self._tokens_used('briefing', result.usage)
+            )
+            for result in results
+        ])
+    
+    def stream_daily_autonomy_briefing(self, user_input: str = None):
+        """
+        Stream the daily briefing one agent at a time
         
-        Use NRT (Next Right Thing) Framework - identify the single most impactful action for each domain:
+        Yields:
+            ("agent", {"agent": code, "line": str}) as each agent's NRT line arrives, then a
+            final ("result", AgentResult) as daily_autonomy_briefing returns
         
-        Format as:
-        🎯 DAILY NRT BRIEFING - Life Optimization & Autonomy
+        Needs an app context for the context flush after the result event.
+        """
+        yield from self._iter_sync(self.astream_daily_autonomy_briefing(user_input))
+        # Same checkpoint as daily_autonomy_briefing, once the result has gone out
+        self.flush_user_context()
+    
+    async def astream_daily_autonomy_briefing(self, user_input: str = None) -> AsyncIterator[tuple]:
+        """Async version of stream_daily_autonomy_briefing"""
+        context_message = self._context_message()
         
-        💰 CFO NRT: [Highest impact financial action today for wealth building]
-        ⚙️ COO NRT: [Highest impact operational action for life optimization]
-        🎯 CSA NRT: [Highest impact strategic action for autonomy timeline]
-        🎨 CMO NRT: [Highest impact personal brand action for income generation]
-        💻 CTO NRT: [Highest impact technology action for automation]
-        🌱 CPO NRT: [Highest impact personal action for peak performance]
-        🧠 CIO NRT: [Data synthesis and bottleneck identification]
+        async def ask(agent_code):
+            try:
+                result = await self.aclient.chat.completions.create(
+                    **self._briefing_request(agent_code, context_message, user_input)
+                )
+            except Exception as e:
+                return agent_code, e
+            return agent_code, (result.choices[0].message.content or "", self._tokens_used('briefing', result.usage))
         
-        🏆 TODAY'S #1 NRT: [Single most important action today]
-        📊 AUTONOMY PROGRESS: [X]% toward complete freedom
-        ⏰ OPTIMIZATION TIMELINE: [X] weeks to next milestone
-        💰 FINANCIAL PROGRESS: [Current progress toward financial independence]
+        tasks = [asyncio.ensure_future(ask(agent_code)) for agent_code in self.agents]
+        replies = {}
+        try:
+            for next_reply in asyncio.as_completed(tasks):
+                agent_code, reply = await next_reply
+                replies[agent_code] = reply
+                if not isinstance(reply, Exception):
+                    agent = self.agents[agent_code]
+                    yield "agent", {
+                        "agent": agent_code,
+                        "line": f"{agent['icon']} {agent_code} NRT: {self._parse_nrt(reply[0])[0]}"
+                    }
+        finally:
+            for task in tasks:
+                task.cancel()
         
-        Focus on actions with highest Impact × Urgency scores for fastest autonomy achievement.
-        Adapt recommendations based on user's unique situation and goals.
+        yield "result", self._assemble_briefing([replies[agent_code] for agent_code in self.agents])
+    
+    def generate_briefings_batch(self, user_inputs: List[Optional[str]], poll_interval: float = 60.0,
+                                 max_poll_interval: float = 600.0) -> List[Dict[str, Any]]:
+        """Synchronous wrapper around agenerate_briefings_batch"""
+        return run_sync(self.agenerate_briefings_batch(user_inputs, poll_interval, max_poll_interval))
+    
+    async def agenerate_briefings_batch(self, user_inputs: List[Optional[str]], poll_interval: float = 60.0,
+                                        max_poll_interval: float = 600.0) -> List[Dict[str, Any]]:
         """
+        Generate daily briefings for many users through the OpenAI Batch API
         
-        try:
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": self._get_briefing_system_prompt()},
-                    {"role": "user", "content": briefing_prompt}
-                ],
-                max_tokens=1000,
-                temperature=0.7
-            )
-            
-            briefing_content = response.choices[0].message.content
-            
-            # Format the response with our standard briefing format
-            formatted_briefing = self._format_daily_briefing(briefing_content)
-            
-            return {
-                'response': formatted_briefing,
-                'tokens_used': response.usage.total_tokens if response.usage else 0,
-                'success': True,
-                'type': 'daily_briefing'
-            }
+        For non-interactive runs such as nightly cohort briefings: batch requests cost half
+        as much, but results can take up to 24h, so this polls until the batch finishes.
+        
+        Returns:
+            One daily_autonomy_briefing-shaped result per input, in input order
+        """
+        context_message = self._context_message()
+        lines = [
+            json.dumps({
+                "custom_id": f"{i}:{agent_code}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": self._briefing_request(agent_code, context_message, user_input)
+            })
+            for i, user_input in enumerate(user_inputs)
+            for agent_code in self.agents
+        ]
+        batch_file = await self.aclient.files.create(
+            file=("briefings.jsonl", "\n".join(lines).encode()),
+            purpose="batch"
+        )
+        job = await self.aclient.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        logging.info(f"Submitted briefing batch {job.id} for {len(user_inputs)} users")
+        
+        delay = poll_interval
+        while job.status not in ("completed", "failed", "expired", "cancelled"):
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, max_poll_interval)
+            job = await self.aclient.batches.retrieve(job.id)
+        
+        # custom_id -> (content, tokens); expired batches still return whatever finished in the window
+        replies = {}
+        if job.output_file_id:
+            output = await self.aclient.files.content(job.output_file_id)
+            for line in output.text.splitlines():
+                if not line:
+                    continue
+                item = json.loads(line)
+                body = (item.get("response") or {}).get("body") or {}
+                if body.get("choices"):
+                    usage = body.get("usage") or {}
+                    if usage:
+                        self._observe_completion('briefing', usage.get("completion_tokens", 0))
+                    replies[item["custom_id"]] = (
+                        body["choices"][0]["message"]["content"] or "",
+                        usage.get("total_tokens", 0)
+                    )
+        
+        missing = RuntimeError(f"Briefing batch {job.id} {job.status}")
+        return [
+            self._assemble_briefing([replies.get(f"{i}:{agent_code}", missing) for agent_code in self.agents])
+            for i in range(len(user_inputs))
+        ]
+    
+    def _briefing_request(self, agent_code: str, context_message: Dict[str, str],
+                          user_input: Optional[str]) -> Dict[str, Any]:
+        """Chat completion parameters for one agent's line of the daily briefing"""
+        return {
+            **self._call_params('briefing'),
+            "messages": [
+                {"role": "system", "content": self._briefing_system_prompts[agent_code]},
+                context_message,
+                {"role": "user", "content": f"User context: {user_input if user_input else 'Life optimization check-in'}"}
+            ],
+            "temperature": 0.7
+        }
+    
+    def _context_message(self) -> Dict[str, str]:
+        """
+        The user's progress as a standalone message, built once per briefing
+        
+        It sits between the static system prompt and the request, so progress changes never
+        touch the cached system prefix and the request text stays last.
+        """
+        snapshot = {key: self.user_context[key] for key in _PROMPT_CONTEXT_KEYS}
+        return {"role": "user", "content": f"Current progress: {json.dumps(snapshot)}"}
+    
+    def _assemble_briefing(self, replies: List[Any]) -> AgentResult:
+        """
+        Build the daily briefing result from per-agent replies
+        
+        replies holds one (content, tokens_used) tuple or Exception per agent, in self.agents order.
+        """
+        lines = []
+        top_score, top_nrt = -1, None
+        tokens_used = 0
+        errors = []
+        for agent_code, reply in zip(self.agents, replies):
+            agent = self.agents[agent_code]
+            if isinstance(reply, Exception):
+                logging.error(f"Error in {agent_code} briefing: {str(reply)}")
+                errors.append(f"{agent_code}: {str(reply)}")
+                lines.append(f"{agent['icon']} {agent_code} NRT: Unavailable right now")
+                continue
             
-        except Exception as e:
-            logging.error(f"Error generating daily briefing: {str(e)}")
-            return {
-                'response': "I apologize, but I encountered an error generating your daily briefing. Please try again.",
-                'tokens_used': 0,
-                'success': False,
-                'error': str(e)
-            }
+            content, tokens = reply
+            tokens_used += tokens
+            action, score = self._parse_nrt(content)
+            lines.append(f"{agent['icon']} {agent_code} NRT: {action}")
+            if score > top_score:
+                top_score, top_nrt = score, f"{agent_code} - {action}"
+        
+        if top_nrt is None:
+            return AgentResult(
+                response="I apologize, but I encountered an error generating your daily briefing. Please try again.",
+                success=False,
+                error='; '.join(errors)
+            )
+        
+        briefing_content = (
+            "🎯 DAILY NRT BRIEFING - Life Optimization & Autonomy\n\n"
+            + "\n".join(lines)
+            + f"\n\n🏆 TODAY'S #1 NRT: {top_nrt}"
+        )
+        
+        # Format the response with our standard briefing format
+        formatted_briefing = self._format_daily_briefing(briefing_content)
+        
+        return AgentResult(
+            response=formatted_briefing,
+            success=True,
+            type='daily_briefing',
+            tokens_used=tokens_used
+        )
     
-    def route_to_agent(self, input_text: str, user_session: str = None) -> Dict[str, Any]:
+    @staticmethod
+    def _parse_nrt(content: str) -> tuple:
+        """Split an agent's briefing reply into its action text and Impact × Urgency score"""
+        impact = _IMPACT_RE.search(content)
+        urgency = _URGENCY_RE.search(content)
+        action = _ACTION_RE.search(content)
+        score = int(impact.group(1)) * int(urgency.group(1)) if impact and urgency else 0
+        text = action.group(1).strip() if action else content.strip()
+        return (f"{text} (Impact {impact.group(1)} × Urgency {urgency.group(1)})" if score else text), score
+    
+    def route_to_agent(self, input_text: str, user_session: str = None) -> AgentResult:
         """Route request to specific C-Suite agent or dynamic agent"""
+        result, agent_code, clean_input = self._resolve_route(input_text, user_session)
+        if result is not None:
+            return result
+        return self._generate_agent_response(agent_code, clean_input)
+    
+    def stream_route_to_agent(self, input_text: str, user_session: str = None):
+        """
+        Route like route_to_agent, streaming C-Suite agent output as it is generated
+        
+        Yields:
+            ("delta", {"text": str}) per chunk of a C-Suite agent's reply, then a final
+            ("result", AgentResult) as route_to_agent returns. Commands, dashboards
+            and dynamic agents yield only the final result.
+        """
+        result, agent_code, clean_input = self._resolve_route(input_text, user_session)
+        if result is not None:
+            yield "result", result
+            return
+        yield from self._iter_sync(self._astream_agent_response(agent_code, clean_input))
+    
+    def _resolve_route(self, input_text: str, user_session: Optional[str]) -> tuple:
+        """
+        Decide how to answer input_text
         
+        Returns (result, None, None) when the request is answered without a C-Suite agent call,
+        otherwise (None, agent_code, clean_input) for the C-Suite agent that should respond.
+        """
         # Check for dashboard command first
-        if '@all dashboard' in input_text.lower() or input_text.lower().strip() == '@all dashboard':
+        if '@all dashboard' in input_text.lower():
             from dashboard_automation import ExecutiveDashboardGenerator
             generator = ExecutiveDashboardGenerator()
             dashboard_content = generator.generate_executive_dashboard()
-            return {
-                'response': dashboard_content,
-                'success': True,
-                'agent': 'Executive Dashboard',
-                'type': 'dashboard',
-                'tokens_used': 0
-            }
+            return AgentResult(
+                response=dashboard_content,
+                success=True,
+                type='dashboard',
+                agent='Executive Dashboard'
+            ), None, None
         
         # Check for agent creation commands first
         if self._is_agent_creation_command(input_text):
-            return self.create_dynamic_agent(input_text, user_session)
+            return self.create_dynamic_agent(input_text, user_session), None, None
         
         # Check for agent management commands
         management_result = self._handle_agent_management(input_text, user_session)
         if management_result:
-            return management_result
+            return management_result, None, None
         
         # Parse agent code from input (e.g., "@CFO: What should I invest in?")
-        agent_code = None
-        clean_input = input_text
-        
-        if input_text.startswith('@'):
-            parts = input_text.split(':', 1)
-            if len(parts) == 2:
-                agent_code = parts[0][1:].upper()  # Remove @ and uppercase
-                clean_input = parts[1].strip()
-        
-        # Check if it's a built-in C-Suite agent
-        if agent_code and agent_code in self.agents:
-            return self._generate_agent_response(agent_code, clean_input)
-        
-        # Check if it's a dynamic agent
-        if agent_code and user_session:
-            dynamic_agent = self.dynamic_creator.get_agent_by_code(user_session, agent_code)
-            if dynamic_agent:
-                return self._generate_dynamic_agent_response(dynamic_agent, clean_input)
+        if input_text[:1] == '@':
+            prefix, sep, rest = input_text.partition(':')
+            if sep and (agent_code := prefix[1:].upper()):  # Remove @ and uppercase
+                # Check if it's a built-in C-Suite agent
+                if agent_code in self.agents:
+                    return None, agent_code, rest.strip()
+                
+                # Check if it's a dynamic agent
+                if user_session:
+                    dynamic_agent = self.dynamic_creator.get_agent_by_code(user_session, agent_code)
+                    if dynamic_agent:
+                        return self._generate_dynamic_agent_response(dynamic_agent, rest.strip()), None, None
         
         # Route to most appropriate agent based on content
-        return self._intelligent_routing(input_text)
+        return None, self._route_by_keywords(input_text), input_text
     
-    def cross_agent_analysis(self, input_text: str) -> Dict[str, Any]:
+    def cross_agent_analysis(self, input_text: str) -> AgentResult:
         """Generate multi-agent collaborative analysis for complex decisions"""
+        return run_sync(self.across_agent_analysis(input_text))
+    
+    async def across_agent_analysis(self, input_text: str) -> AgentResult:
+        """Async version of cross_agent_analysis"""
         
-        analysis_prompt = f"""
-        Analyze this request from multiple C-Suite perspectives for comprehensive guidance:
+        cached = self._cached_response("multi", input_text)
+        if cached:
+            return cached
         
-        Request: {input_text}
+        try:
+            response = await self.aclient.chat.completions.create(**self._multi_agent_request(input_text))
+        except Exception as e:
+            return self._multi_agent_error(e)
         
-        Provide analysis from CFO (financial), COO (operational), CSA (strategic), and CIO (synthesis) perspectives.
-        Focus on autonomy and independence implications.
+        return self._store_response("multi", input_text, self._multi_agent_result(
+            response.choices[0].message.content,
+            self._tokens_used('multi', response.usage)
+        ))
+    
+    def stream_cross_agent_analysis(self, input_text: str):
         """
+        Stream cross_agent_analysis output as it is generated
         
-        try:
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": self._get_multi_agent_system_prompt()},
-                    {"role": "user", "content": analysis_prompt}
-                ],
-                max_tokens=1200,
-                temperature=0.7
-            )
-            
-            return {
-                'response': self._format_multi_agent_response(response.choices[0].message.content),
-                'tokens_used': response.usage.total_tokens if response.usage else 0,
-                'success': True,
-                'type': 'multi_agent_analysis'
-            }
-            
-        except Exception as e:
-            logging.error(f"Error in cross-agent analysis: {str(e)}")
-            return {
-                'response': "I apologize, but I encountered an error in the cross-agent analysis. Please try again.",
-                'tokens_used': 0,
-                'success': False,
-                'error': str(e)
-            }
+        Yields:
+            ("delta", {"text": str}) per chunk, then a final ("result", AgentResult)
+            as cross_agent_analysis returns
+        """
+        yield from self._iter_sync(self.astream_cross_agent_analysis(input_text))
+    
+    def astream_cross_agent_analysis(self, input_text: str) -> AsyncIterator[tuple]:
+        """Async version of stream_cross_agent_analysis"""
+        return self._astream_completion(
+            'multi', "multi", input_text, self._multi_agent_request(input_text),
+            self._multi_agent_result, self._multi_agent_error
+        )
     
-    def _generate_agent_response(self, agent_code: str, input_text: str) -> Dict[str, Any]:
+    def _multi_agent_request(self, input_text: str) -> Dict[str, Any]:
+        """Chat completion parameters for a cross-agent analysis"""
+        return {
+            **self._call_params('multi'),
+            "messages": [
+                {"role": "system", "content": self._MULTI_AGENT_SYSTEM_PROMPT},
+                {"role": "user", "content": f"Request: {input_text}"}
+            ],
+            "temperature": 0.7
+        }
+    
+    def _multi_agent_result(self, content: str, tokens_used: int) -> AgentResult:
+        """Build the cross_agent_analysis result for a completed reply"""
+        return AgentResult(
+            response=self._format_multi_agent_response(content),
+            success=True,
+            type='multi_agent_analysis',
+            tokens_used=tokens_used
+        )
+    
+    def _multi_agent_error(self, error: Exception) -> AgentResult:
+        """Log a failed cross-agent analysis and build its error result"""
+        logging.error(f"Error in cross-agent analysis: {str(error)}")
+        return AgentResult(
+            response="I apologize, but I encountered an error in the cross-agent analysis. Please try again.",
+            success=False,
+            error=str(error)
+        )
+    
+    def _generate_agent_response(self, agent_code: str, input_text: str) -> AgentResult:
         """Generate response from specific C-Suite agent"""
+        return run_sync(self._agenerate_agent_response(agent_code, input_text))
+    
+    async def _agenerate_agent_response(self, agent_code: str, input_text: str) -> AgentResult:
+        """Async version of _generate_agent_response"""
+        
+        cached = self._cached_response(agent_code, input_text)
+        if cached:
+            return cached
+        
+        try:
+            response = await self.aclient.chat.completions.create(**self._agent_request(agent_code, input_text))
+        except Exception as e:
+            return self._agent_error(agent_code, e)
         
+        return self._store_response(agent_code, input_text, self._agent_result(
+            agent_code,
+            response.choices[0].message.content,
+            self._tokens_used('agent', response.usage)
+        ))
+    
+    def _astream_agent_response(self, agent_code: str, input_text: str) -> AsyncIterator[tuple]:
+        """Streaming version of _agenerate_agent_response; see _astream_completion"""
+        return self._astream_completion(
+            'agent', agent_code, input_text, self._agent_request(agent_code, input_text),
+            lambda content, tokens_used: self._agent_result(agent_code, content, tokens_used),
+            lambda error: self._agent_error(agent_code, error)
+        )
+    
+    def _agent_request(self, agent_code: str, input_text: str) -> Dict[str, Any]:
+        """Chat completion parameters for a C-Suite agent response"""
+        return {
+            **self._call_params('agent'),
+            "messages": [
+                {"role": "system", "content": self._agent_system_prompts[agent_code]},
+                {"role": "user", "content": f"Request: {input_text}"}
+            ],
+            "temperature": 0.7
+        }
+    
+    def _agent_result(self, agent_code: str, content: str, tokens_used: int) -> AgentResult:
+        """Build the _generate_agent_response result for a completed reply"""
         agent = self.agents[agent_code]
+        formatted_response = f"""{agent['icon']} **{agent['name']} Response**
+
+{content}
+
+---
+*Domain: {agent['domain']}*
+*Integration: {agent['integration']}*"""
         
-        agent_prompt = f"""
-        As the {agent['name']} of OperatorOS, respond to this request:
+        return AgentResult(
+            response=formatted_response,
+            success=True,
+            type='agent_response',
+            tokens_used=tokens_used,
+            agent=agent_code
+        )
+    
+    def _agent_error(self, agent_code: str, error: Exception) -> AgentResult:
+        """Log a failed C-Suite agent call and build its error result"""
+        logging.error(f"Error in {agent_code} agent response: {str(error)}")
+        return AgentResult(
+            response=f"I apologize, but the {self.agents[agent_code]['name']} encountered an error. Please try again.",
+            success=False,
+            error=str(error)
+        )
+    
+    async def _astream_completion(self, profile: str, namespace: str, input_text: str, request: Dict[str, Any],
+                                  build_result: Callable, build_error: Callable) -> AsyncIterator[tuple]:
+        """
+        Stream one chat completion made with the given call profile
         
-        Request: {input_text}
+        Yields ("delta", {"text": str}) as chunks arrive, then ("result", AgentResult) built by
+        build_result(content, tokens_used) or, if the call fails, by build_error(exception).
+        A cached response is yielded as the result directly.
+        """
+        cached = self._cached_response(namespace, input_text)
+        if cached:
+            yield "result", cached
+            return
         
-        Your domain: {agent['domain']}
-        Your focus: {agent['focus']}
-        Your goal: {agent['goal']}
-        Your personality: {agent['personality']}
+        parts = []
+        tokens_used = 0
+        try:
+            stream = await self.aclient.chat.completions.create(
+                **request, stream=True, stream_options={"include_usage": True}
+            )
+            async for chunk in stream:
+                if chunk.usage:
+                    tokens_used = self._tokens_used(profile, chunk.usage)
+                if chunk.choices and chunk.choices[0].delta.content:
+                    parts.append(chunk.choices[0].delta.content)
+                    yield "delta", {"text": parts[-1]}
+        except Exception as e:
+            yield "result", build_error(e)
+            return
         
-        Provide specific, actionable advice that moves the user toward autonomy and independence.
-        Include integration opportunities and progress toward your goal.
+        yield "result", self._store_response(namespace, input_text, build_result("".join(parts), tokens_used))
+    
+    def call_model(self, profile: str) -> str:
+        """Model used for a call profile ('briefing', 'agent' or 'multi')"""
+        return self._call_profiles[profile]['model']
+    
+    def _call_params(self, profile: str) -> Dict[str, Any]:
+        """Model and current max_tokens for a call profile"""
+        return {"model": self._call_profiles[profile]['model'], "max_tokens": self._max_tokens[profile]}
+    
+    def _tokens_used(self, profile: str, usage) -> int:
+        """Total tokens billed for a call, recording its completion length for the profile"""
+        if not usage:
+            return 0
+        self._observe_completion(profile, usage.completion_tokens)
+        return usage.total_tokens
+    
+    def _observe_completion(self, profile: str, completion_tokens: int):
+        """
+        Record one completion length and, in adaptive mode, retune the profile's max_tokens
+        
+        The budget follows the P95 of recent completions plus headroom, capped by the profile's
+        ceiling. Headroom lets a truncated reply (which reports the old cap) push the budget back up.
+        """
+        samples = self._completion_tokens[profile]
+        samples.append(completion_tokens)
+        if not self.adaptive_max_tokens or len(samples) < self.adaptive_min_samples:
+            return
+        p95 = statistics.quantiles(samples, n=20)[-1]
+        self._max_tokens[profile] = min(
+            self._call_profiles[profile]['max_tokens'],
+            max(16, int(p95 * self.adaptive_headroom))
+        )
+    
+    def _iter_sync(self, agen):
+        """Iterate an async generator from synchronous code, one step at a time on the background loop"""
+        try:
+            while True:
+                try:
+                    yield run_sync(agen.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            # Runs the generator's cleanup if the consumer stops early (e.g. the client disconnected)
+            run_sync(agen.aclose())
+    
+    def _cached_response(self, namespace: str, input_text: str) -> Optional[AgentResult]:
+        """
+        Return a stored response for input_text under namespace, or None
+        
+        Keys are normalized (case, punctuation and spacing folded), so trivially different
+        phrasings of the same question share an entry; each agent has its own namespace.
         """
+        cached = self._response_cache.get((namespace, self._normalize_cache_input(input_text)))
+        if cached and cached[0] > time.monotonic():
+            self.response_cache_stats["hits"] += 1
+            return replace(cached[1], tokens_used=0, cache_hit=True)
+        self.response_cache_stats["misses"] += 1
+        return None
+    
+    def _store_response(self, namespace: str, input_text: str, result: AgentResult) -> AgentResult:
+        """Remember a successful response for input_text under namespace and return it"""
+        key = (namespace, self._normalize_cache_input(input_text))
+        # Re-inserting at the end keeps insertion order == expiry order, so the first key is the oldest
+        self._response_cache.pop(key, None)
+        if len(self._response_cache) >= self.response_cache_max_entries:
+            self._response_cache.pop(next(iter(self._response_cache)))
+        self._response_cache[key] = (time.monotonic() + self.response_cache_ttl, result)
+        return result
+    
+    @staticmethod
+    def _normalize_cache_input(input_text: str) -> str:
+        """Fold case, punctuation and whitespace out of input_text"""
+        return _CACHE_KEY_SEP_RE.sub(' ', input_text.lower()).strip()
+    
+    def _intelligent_routing(self, input_text: str) -> Dict[str, Any]:
+        """Intelligently route request to most appropriate agent"""
+        return self._generate_agent_response(self._route_by_keywords(input_text), input_text)
+    
+    def _route_by_keywords(self, input_text: str) -> str:
+        """Pick the C-Suite agent whose routing keywords best match input_text"""
+        input_lower = input_text.lower()
+        scores = dict.fromkeys(_ROUTING_KEYWORDS, 0)
         
-        system_prompt = f"""You are the {agent['name']} ({agent_code}) in the OperatorOS C-Suite, using the NRT (Next Right Thing) Framework for digital nomad transition.
+        for keyword, agents in _ROUTING_TABLE:
+            if keyword in input_lower:
+                for agent in agents:
+                    scores[agent] += 1
+        
+        # Route to highest scoring agent (first in agent order on a tie), or CSA if nothing matched
+        best_agent = max(scores, key=scores.__getitem__)
+        return best_agent if scores[best_agent] else 'CSA'
+    
+    def _build_agent_system_prompt(self, agent_code: str) -> str:
+        """System prompt for a C-Suite agent's direct responses"""
+        agent = self.agents[agent_code]
+        return f"""You are the {agent['name']} ({agent_code}) in the OperatorOS C-Suite, using the NRT (Next Right Thing) Framework for digital nomad transition.
 
 GOAL: Help user transition to digital nomad making $7,400+ monthly location-independent income ASAP.
 Current income: $7,400/month salary (needs to be replaced with location-independent income)
@@ -308,6 +839,9 @@ Current income: $7,400/month salary (needs to be replaced with location-independ
 Your NRT specialization:
 {self._get_agent_nrt_focus(agent_code)}
 
+Your domain: {agent['domain']}
+Your focus: {agent['focus']}
+Your goal: {agent['goal']}
 Your personality is {agent['personality']}. Calculate Impact × Urgency scores for all recommendations.
 
 NRT Response Format:
@@ -318,106 +852,26 @@ NRT Response Format:
 5. **How this advances nomad goal** - Direct connection to location independence
 6. **Next NRT after completion** - What comes after this action?
 
+Provide specific, actionable advice that moves the user toward autonomy and independence.
+Include integration opportunities and progress toward your goal.
 Focus on actions that replace salary income fastest while enabling location independence."""
-        
-        try:
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": agent_prompt}
-                ],
-                max_tokens=800,
-                temperature=0.7
-            )
-            
-            formatted_response = f"""{agent['icon']} **{agent['name']} Response**
-
-{response.choices[0].message.content}
-
----
-*Domain: {agent['domain']}*
-*Integration: {agent['integration']}*"""
-            
-            return {
-                'response': formatted_response,
-                'tokens_used': response.usage.total_tokens if response.usage else 0,
-                'success': True,
-                'agent': agent_code,
-                'type': 'agent_response'
-            }
-            
-        except Exception as e:
-            logging.error(f"Error in {agent_code} agent response: {str(e)}")
-            return {
-                'response': f"I apologize, but the {agent['name']} encountered an error. Please try again.",
-                'tokens_used': 0,
-                'success': False,
-                'error': str(e)
-            }
-    
-    def _intelligent_routing(self, input_text: str) -> Dict[str, Any]:
-        """Intelligently route request to most appropriate agent"""
-        
-        # Simple keyword-based routing (in production, would use more sophisticated NLP)
-        routing_keywords = {
-            'CFO': ['money', 'investment', 'financial', 'wealth', 'income', 'budget', 'savings', 'debt'],
-            'COO': ['routine', 'productivity', 'efficiency', 'time', 'schedule', 'operations', 'automation'],
-            'CSA': ['strategy', 'goal', 'plan', 'vision', 'future', 'decision', 'autonomy', 'independence'],
-            'CMO': ['brand', 'network', 'influence', 'marketing', 'content', 'audience', 'social'],
-            'CTO': ['technology', 'automation', 'app', 'tool', 'system', 'digital', 'tech'],
-            'CPO': ['health', 'fitness', 'learning', 'development', 'relationship', 'wellness'],
-            'CIO': ['analysis', 'data', 'pattern', 'insight', 'decision', 'intelligence']
-        }
-        
-        input_lower = input_text.lower()
-        scores = {}
-        
-        for agent, keywords in routing_keywords.items():
-            scores[agent] = sum(1 for keyword in keywords if keyword in input_lower)
-        
-        # Route to highest scoring agent, or CSA if tie
-        best_agent = max(scores.keys(), key=lambda k: scores[k]) if max(scores.values()) > 0 else 'CSA'
-        
-        return self._generate_agent_response(best_agent, input_text)
     
-    def _get_briefing_system_prompt(self) -> str:
-        """System prompt for NRT-focused daily briefings"""
-        return """You are the Master Agent for OperatorOS using the NRT (Next Right Thing) Framework for digital nomad transition.
-
-GOAL: Generate daily NRT briefings targeting $7,400+ monthly location-independent income transition.
-Current situation: User has $7,400/month salary that needs to be replaced with nomad-compatible income.
-
-Generate briefings using this EXACT format:
-
-🎯 DAILY NRT BRIEFING - Digital Nomad Transition
-
-💰 CFO NRT: [Highest impact financial action for income replacement]
-⚙️ COO NRT: [Highest impact operational action for location independence]  
-🎯 CSA NRT: [Highest impact strategic action for nomad timeline]
-🎨 CMO NRT: [Highest impact marketing action for remote client acquisition]
-💻 CTO NRT: [Highest impact technology action for nomad infrastructure]
-🌱 CPO NRT: [Highest impact personal action for nomad readiness]
-🧠 CIO NRT: [Data synthesis and bottleneck identification]
-
-🏆 TODAY'S #1 NRT: [Single most important action today]
-📊 NOMAD READINESS: [X]% ready for transition
-⏰ ESTIMATED TIMELINE: [X] weeks to nomad launch
-💰 INCOME PROGRESS: $[X] toward $7,400 nomad income goal
+    def _build_briefing_system_prompt(self, agent_code: str) -> str:
+        """System prompt for one agent's line of the NRT-focused daily briefing"""
+        agent = self.agents[agent_code]
+        return f"""You are the {agent['name']} ({agent_code}) in the OperatorOS C-Suite, using the NRT (Next Right Thing) Framework for digital nomad transition.
 
-Focus on highest Impact × Urgency scores for fastest nomad transition."""
+GOAL: Help the user replace a $7,400/month salary with location-independent income as fast as possible.
 
-    def _get_multi_agent_system_prompt(self) -> str:
-        """System prompt for multi-agent collaborative analysis"""
-        return """You are the OperatorOS Master Agent facilitating collaboration between C-Suite agents.
+Your NRT specialization:
+{self._get_agent_nrt_focus(agent_code)}
 
-Provide comprehensive analysis from multiple agent perspectives:
-- Financial implications and opportunities
-- Operational considerations and efficiency
-- Strategic alignment with autonomy goals
-- Cross-domain impacts and synergies
+Identify today's single Next Right Thing in your domain: the highest Impact × Urgency action.
+Reply in EXACTLY this format:
 
-Synthesize recommendations into coordinated action plans that advance overall autonomy and independence."""
+ACTION: [one sentence describing today's action]
+IMPACT: [1-10]
+URGENCY: [1-10]"""
 
     def _format_daily_briefing(self, content: str) -> str:
         """Format daily briefing with standard OperatorOS template"""
@@ -442,7 +896,7 @@ Synthesize recommendations into coordinated action plans that advance overall au
         """Check if input is an agent creation command"""
         return self.dynamic_creator.parse_agent_command(input_text) is not None
     
-    def _handle_agent_management(self, input_text: str, user_session: str) -> Optional[Dict[str, Any]]:
+    def _handle_agent_management(self, input_text: str, user_session: str) -> Optional[AgentResult]:
         """Handle agent management commands"""
         if not user_session:
             return None
@@ -458,11 +912,11 @@ Synthesize recommendations into coordinated action plans that advance overall au
             agent_code = self._extract_agent_code_from_command(input_text)
             if agent_code:
                 result = self.dynamic_creator.retire_agent(user_session, agent_code)
-                return {
-                    'response': result['message'] if result['success'] else result['error'],
-                    'success': result['success'],
-                    'type': 'agent_management'
-                }
+                return AgentResult(
+                    response=result['message'] if result['success'] else result['error'],
+                    success=result['success'],
+                    type='agent_management'
+                )
         
         # Modify agent command
         if 'modify' in input_lower and 'agent' in input_lower:
@@ -473,21 +927,20 @@ Synthesize recommendations into coordinated action plans that advance overall au
                 new_function = parts[1].strip()
                 if agent_code:
                     result = self.dynamic_creator.modify_agent(user_session, agent_code, new_function)
-                    return {
-                        'response': result['message'] if result['success'] else result['error'],
-                        'success': result['success'],
-                        'type': 'agent_management'
-                    }
+                    return AgentResult(
+                        response=result['message'] if result['success'] else result['error'],
+                        success=result['success'],
+                        type='agent_management'
+                    )
         
         return None
     
     def _extract_agent_code_from_command(self, command: str) -> Optional[str]:
         """Extract agent code from management command"""
-        import re
         match = re.search(r'\b([A-Z]{2,4})\b', command.upper())
         return match.group(1) if match else None
     
-    def _list_user_agents(self, user_session: str) -> Dict[str, Any]:
+    def _list_user_agents(self, user_session: str) -> AgentResult:
         """List all agents for a user"""
         agents = self.dynamic_creator.get_user_agents(user_session)
         
@@ -529,31 +982,27 @@ Create your first custom agent with: "OperatorOS, spin up [AGENT_NAME] who will
 Total custom agents: {len(agents)}
 """
         
-        return {
-            'response': response,
-            'success': True,
-            'type': 'agent_list'
-        }
+        return AgentResult(response=response, success=True, type='agent_list')
     
-    def create_dynamic_agent(self, command: str, user_session: str) -> Dict[str, Any]:
+    def create_dynamic_agent(self, command: str, user_session: str) -> AgentResult:
         """Create a dynamic agent from user command"""
         if not user_session:
-            return {
-                'response': 'Unable to create agent without user session',
-                'success': False,
-                'type': 'agent_creation'
-            }
+            return AgentResult(
+                response='Unable to create agent without user session',
+                success=False,
+                type='agent_creation'
+            )
         
         result = self.dynamic_creator.create_dynamic_agent(command, user_session)
         
-        return {
-            'response': result['message'] if result['success'] else result['error'],
-            'success': result['success'],
-            'type': 'agent_creation',
-            'agent_data': result.get('agent', {})
-        }
+        return AgentResult(
+            response=result['message'] if result['success'] else result['error'],
+            success=result['success'],
+            type='agent_creation',
+            agent_data=result.get('agent', {})
+        )
     
-    def _generate_dynamic_agent_response(self, agent: DynamicAgent, input_text: str) -> Dict[str, Any]:
+    def _generate_dynamic_agent_response(self, agent: DynamicAgent, input_text: str) -> AgentResult:
         """Generate response from a dynamic agent"""
         result = self.dynamic_creator.generate_agent_response(agent, input_text)
         
@@ -566,67 +1015,23 @@ Total custom agents: {len(agents)}
 *Domain: {agent.domain}*
 *Usage Count: {agent.usage_count}*"""
             
-            return {
-                'response': formatted_response,
-                'tokens_used': result['tokens_used'],
-                'success': True,
-                'agent': result['agent_code'],
-                'type': 'dynamic_agent_response'
-            }
+            return AgentResult(
+                response=formatted_response,
+                success=True,
+                type='dynamic_agent_response',
+                tokens_used=result['tokens_used'],
+                agent=result['agent_code']
+            )
         else:
-            return {
-                'response': result['error'],
-                'success': False,
-                'type': 'dynamic_agent_response'
-            }
+            return AgentResult(
+                response=result['error'],
+                success=False,
+                type='dynamic_agent_response'
+            )
     
     def _get_agent_nrt_focus(self, agent_code: str) -> str:
         """Get NRT specialization for each agent"""
-        nrt_specializations = {
-            'CFO': """Financial NRT Focus: Revenue transition from salary to location-independent income
-- Actions that replace salary income fastest
-- Minimize financial risk during transition  
-- Build emergency fund for nomad transition
-- Optimize for tax efficiency and international banking""",
-            
-            'COO': """Operations NRT Focus: Life systems that enable location independence
-- Actions that make you location-agnostic fastest
-- Digitize all necessary life operations
-- Eliminate location-dependent commitments
-- Build remote work capabilities""",
-            
-            'CSA': """Strategy NRT Focus: Fastest path to sustainable nomad lifestyle
-- Actions with highest impact on nomad timeline
-- Risk mitigation for transition period
-- Market validation for nomad income streams
-- Geographic and legal strategy""",
-            
-            'CMO': """Marketing NRT Focus: Personal brand and client acquisition for nomad income
-- Actions that build nomad-compatible client base fastest
-- Online presence that works globally
-- Network building for location-independent opportunities
-- Content strategy for nomad audience""",
-            
-            'CTO': """Technology NRT Focus: Tech stack for nomad lifestyle and income generation
-- Tools that enable work from anywhere
-- Income-generating technology setup
-- Communication and productivity optimization
-- Security and backup systems for nomad life""",
-            
-            'CPO': """People/Personal NRT Focus: Personal optimization for nomad transition
-- Health and wellness systems that travel
-- Relationship management during transition
-- Skill development for nomad success
-- Mental/emotional preparation for lifestyle change""",
-            
-            'CIO': """Intelligence NRT Focus: Data-driven decisions for nomad transition
-- Analyze progress toward nomad readiness
-- Identify bottlenecks in transition timeline
-- Synthesize insights across all domains
-- Predict and mitigate transition risks"""
-        }
-        
-        return nrt_specializations.get(agent_code, "General NRT guidance")
+        return self._NRT_FOCUS.get(agent_code, "General NRT guidance")
     
     def _format_multi_agent_response(self, content: str) -> str:
         """Format multi-agent collaborative analysis"""
@@ -638,10 +1043,62 @@ Total custom agents: {len(agents)}
 *Coordinated recommendation from your OperatorOS C-Suite executive team*"""
 
     def update_user_context(self, context_updates: Dict[str, Any]):
-        """Update persistent user context and progress tracking"""
-        self.user_context.update(context_updates)
-        # In production, this would save to database
+        """
+        Update persistent user context and progress tracking
+        
+        Updates apply in memory immediately and are written in batches: once
+        context_flush_threshold keys are pending, or at the next flush_user_context().
+        Needs an app context when a flush is triggered.
+        """
+        with self._context_lock:
+            self.user_context.update(context_updates)
+            self._pending_context.update(context_updates)
+            should_flush = len(self._pending_context) >= self.context_flush_threshold
+        if should_flush:
+            self.flush_user_context()
+    
+    def flush_user_context(self):
+        """Write pending context updates in a single transaction"""
+        with self._context_lock:
+            if not self._pending_context:
+                return
+            pending, self._pending_context = self._pending_context, {}
         
+        try:
+            rows = {
+                row.key: row
+                for row in db.session.scalars(
+                    db.select(OperatorOSContext).where(OperatorOSContext.key.in_(pending))
+                )
+            }
+            new_rows = []
+            for key, value in pending.items():
+                if key in rows:
+                    rows[key].value = value
+                else:
+                    new_rows.append(OperatorOSContext(key=key, value=value))
+            db.session.add_all(new_rows)
+            db.session.commit()
+        except Exception as e:
+            logging.error(f"Error saving OperatorOS user context: {str(e)}")
+            db.session.rollback()
+            # Keep the updates for the next flush, without overwriting anything newer
+            with self._context_lock:
+                self._pending_context = {**pending, **self._pending_context}
+    
+    def load_user_context(self):
+        """Load persisted context over the defaults; needs an app context"""
+        try:
+            persisted = {row.key: row.value for row in db.session.scalars(db.select(OperatorOSContext))}
+        except Exception as e:
+            logging.error(f"Error loading OperatorOS user context: {str(e)}")
+            db.session.rollback()
+            return
+        with self._context_lock:
+            self.user_context.update(persisted)
+            self.user_context.update(self._pending_context)
+    
+
     def get_autonomy_metrics(self) -> Dict[str, Any]:
         """Get current autonomy progress metrics"""
         return {
@@ -652,5 +1109,18 @@ Total custom agents: {len(agents)}
             'last_updated': datetime.now().isoformat()
         }
 
-# Global instance
-operatoros_master = OperatorOSMaster()
\ No newline at end of file
+# Shared master instance (holds the HTTP pool and prompt tables, so only processes that use it build it)
+_master = None
+_master_lock = threading.Lock()
+
+def get_master() -> OperatorOSMaster:
+    """Return the process-wide OperatorOSMaster, creating it and loading user context on first use"""
+    global _master
+    if _master is None:
+        with _master_lock:
+            if _master is None:
+                master = OperatorOSMaster()
+                # Loads from the database, so the first call must run inside an app context
+                master.load_user_context()
+                _master = master
+    return _master
@@ -0,0 +1,55 @@
+import atexit
+import asyncio
+import threading
+import importlib.util
+from typing import Optional
+
+import httpx
+
+# The async SDK clients keep connection pools tied to the loop they first ran on, so every
+# synchronous caller in the process goes through one long-lived background loop
+_loop = None
+_loop_lock = threading.Lock()
+
+# One keep-alive pool for every OpenAI and Anthropic client so requests skip repeat DNS/TLS handshakes
+_http = None
+_http_lock = threading.Lock()
+
+def run_sync(coro):
+    """Run a coroutine to completion on the shared background loop and return its result"""
+    global _loop
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="llm-async-loop", daemon=True).start()
+                _loop = loop
+    return asyncio.run_coroutine_threadsafe(coro, _loop).result()
+
+def shared_http_client() -> httpx.AsyncClient:
+    """Return the process-wide httpx pool, creating it on first use"""
+    global _http
+    if _http is None:
+        with _http_lock:
+            if _http is None:
+                # Sized for concurrent briefings, agent calls and multi-provider requests together
+                _http = httpx.AsyncClient(
+                    http2=importlib.util.find_spec("h2") is not None,
+                    timeout=httpx.Timeout(60.0, connect=5.0),
+                    limits=httpx.Limits(max_connections=500, max_keepalive_connections=200, keepalive_expiry=30.0)
+                )
+    return _http
+
+def shared_http_for(sdk) -> Optional[httpx.AsyncClient]:
+    """Return the shared pool if the SDK is built on this httpx package, else None so it uses its own client"""
+    # Newer SDK builds ship their own httpx; handing them our client would fail their type check
+    if issubclass(sdk.DefaultAsyncHttpxClient, httpx.AsyncClient):
+        return shared_http_client()
+    return None
+
+def close():
+    """Close the shared pool at exit, on the loop its connections belong to"""
+    if _loop is not None and _http is not None and not _http.is_closed:
+        run_sync(_http.aclose())
+
+atexit.register(close)
@@ -0,0 +1,39 @@
+import os
+import uuid
+import queue
+import threading
+
+# UUID4 strings generated in bulk from a single urandom read
+_POOL_SIZE = 4096
+_uuid_pool = queue.SimpleQueue()
+_refill_lock = threading.Lock()
+
+def _refill_pool():
+    """Fill the pool with _POOL_SIZE UUID4 strings from one urandom call"""
+    raw = os.urandom(16 * _POOL_SIZE)
+    for offset in range(0, len(raw), 16):
+        _uuid_pool.put(str(uuid.UUID(bytes=raw[offset:offset + 16], version=4)))
+
+def _reset_pool_after_fork():
+    """Give each forked worker its own pool so processes never hand out the same ids"""
+    global _uuid_pool
+    _uuid_pool = queue.SimpleQueue()
+
+os.register_at_fork(after_in_child=_reset_pool_after_fork)
+
+def new_uuid() -> str:
+    """
+    Return a random UUID4 string
+
+    Draws from a pool refilled in bulk; while another thread is refilling,
+    callers fall back to uuid.uuid4() rather than waiting.
+    """
+    try:
+        return _uuid_pool.get_nowait()
+    except queue.Empty:
+        if _refill_lock.acquire(blocking=False):
+            try:
+                _refill_pool()
+            finally:
+                _refill_lock.release()
+        return str(uuid.uuid4())
@@ -3,6 +3,26 @@ import validators
 from flask import current_app
 from typing import Optional, Tuple, Union
 
+# Patterns compiled once at import; harmful-content checks are combined into a single scan
+_HARMFUL_CONTENT_PATTERN = re.compile('|'.join([
+    r'<script[^>]*>',  # Script tags
+    r'javascript:',     # JavaScript URLs
+    r'data:text/html',  # Data URLs
+    r'vbscript:',      # VBScript URLs
+]), re.IGNORECASE)
+_UUID4_PATTERN = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-4[0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12}$', re.IGNORECASE)
+_UNSAFE_KEY_CHARS_PATTERN = re.compile(r'[^a-zA-Z0-9.:_-]')
+
+def fast_strip(text: str) -> str:
+    """
+    Strip surrounding whitespace, returning the original string when there is none
+    
+    Avoids copying large prompts that are already clean.
+    """
+    if text and not (text[0].isspace() or text[-1].isspace()):
+        return text
+    return text.strip()
+
 class InputValidator:
     """Utility class for validating user inputs"""
     
@@ -17,7 +37,7 @@ class InputValidator:
         if not input_text:
             return False, "Input text is required"
         
-        input_text = input_text.strip()
+        input_text = fast_strip(input_text)
         
         if not input_text:
             return False, "Input text cannot be empty"
@@ -30,16 +50,8 @@ class InputValidator:
             return False, f"Input text cannot exceed {max_length} characters"
         
         # Check for potentially harmful content
-        harmful_patterns = [
-            r'<script[^>]*>',  # Script tags
-            r'javascript:',     # JavaScript URLs
-            r'data:text/html',  # Data URLs
-            r'vbscript:',      # VBScript URLs
-        ]
-        
-        for pattern in harmful_patterns:
-            if re.search(pattern, input_text, re.IGNORECASE):
-                return False, "Input contains potentially harmful content"
+        if _HARMFUL_CONTENT_PATTERN.search(input_text):
+            return False, "Input contains potentially harmful content"
         
         # Check for excessive repetition (potential spam)
         words = input_text.split()
@@ -62,8 +74,7 @@ class InputValidator:
             return False, "Conversation ID is required"
         
         # UUID v4 format validation
-        uuid_pattern = r'^[0-9a-f]{8}-[0-9a-f]{4}-4[0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12}$'
-        if not re.match(uuid_pattern, conversation_id, re.IGNORECASE):
+        if not _UUID4_PATTERN.match(conversation_id):
             return False, "Invalid conversation ID format"
         
         return True, None
@@ -154,7 +165,7 @@ class SecurityValidator:
             str: Sanitized key for rate limiting
         """
         # Remove any non-alphanumeric characters except dots, colons, and dashes
-        safe_key = re.sub(r'[^a-zA-Z0-9.:_-]', '', key)
+        safe_key = _UNSAFE_KEY_CHARS_PATTERN.sub('', key)
         return safe_key[:64]  # Limit length
     
     @staticmethod
@@ -174,7 +185,8 @@ class SecurityValidator:
         # Check for session size (prevent session overflow attacks)
         try:
             import pickle
-            session_size = len(pickle.dumps(session_data))
+            # Server-side sessions carry an unpicklable on_update callback, so size the plain contents
+            session_size = len(pickle.dumps(dict(session_data)))
             if session_size > 4096:  # 4KB limit
                 return False
         except Exception: